@@ -13,10 +13,14 @@ appears in URL paths; the timestamp does not.
 
 The app is deliberately tiny:
 
-- No database: discovery is ``os.listdir`` of the root on every request.
+- No database: discovery is ``os.listdir`` of the root, kept in memory by
+  ``RoundIndex`` and redone whenever the root changes (inotify, or the
+  root's mtime where inotify isn't available). Requests look a slug up in
+  a dict instead of walking and re-parsing the directory.
 - No cron: comparing ``datetime.now()`` to the parsed timestamp is the only
   scheduling logic.
-- No state: a restart, redeploy, or reboot doesn't change anything observable.
+- No state: the index is only ever a copy of the directory listing, so a
+  restart, redeploy, or reboot doesn't change anything observable.
 - ``FileResponse`` (Starlette) supports HTTP ``Range`` requests so MP3 seek
   and resumable downloads work without extra effort.
 
@@ -42,13 +46,17 @@ extra wrapper.
 
 from __future__ import annotations
 
+import bisect
+import ctypes
 import logging
 import os
 import re
+import struct
+import threading
 from datetime import datetime
 from html import escape
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, NamedTuple, Optional
 
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import FileResponse, HTMLResponse
@@ -64,6 +72,25 @@ DIR_RE = re.compile(
 )
 FILENAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,255}$")
 
+# inotify(7) flags. Entries created, deleted or renamed in the root (and
+# attribute changes, e.g. a chmod that hides a round) mean a rescan; the
+# root itself going away means re-watching whatever replaces it.
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+WATCH_MASK = (
+    IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
@@ -106,6 +133,146 @@ def discover() -> Iterable[tuple[str, datetime, Path]]:
         yield m.group("slug"), release_at, child
 
 
+class Round(NamedTuple):
+    slug: str
+    release_at: datetime
+    path: Path
+    # ``path.resolve(strict=True)`` at scan time; None if that failed
+    real: Optional[Path]
+
+
+class Rounds(NamedTuple):
+    """One scan of the root. Replaced whole, never modified."""
+
+    # All well-named rounds by release time, for the index page
+    ordered: list[Round]
+    # First round per slug in name order, which is what a request for the
+    # slug gets (the earliest, when a slug is reused)
+    by_slug: dict[str, Round]
+    releases: list[datetime]
+    root_real: Path
+
+
+class RoundIndex:
+    """In-memory copy of ``discover()``, rescanned when the root changes.
+
+    Change detection is an inotify watch on ``ROOT`` (via ctypes; libc has
+    the calls, the stdlib doesn't), drained without blocking at the start of
+    each request, so there's no background thread and a change is seen by
+    the very next request. Where inotify isn't available (non-Linux, watch
+    limit reached, root missing at startup) it falls back to comparing the
+    root's mtime and inode, one ``stat`` per request; renaming, adding or
+    removing a round directory bumps both. Either way the directory stays
+    the schedule: ``mv`` a round to a new timestamp and the next request
+    sees it.
+
+    Symlinked round directories are resolved at scan time. Retargeting
+    the link shows up as a change to the root; a target removed outside
+    the root is caught by the ``is_dir`` check in ``safe_round_dir``.
+
+    ``next_release`` is the earliest release time still in the future, kept
+    up to date as releases pass, so callers know how long the
+    revealed/upcoming split holds without walking the rounds.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.next_release: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._signature: Optional[tuple[int, int]] = None
+        self._rounds = Rounds([], {}, [], root)
+        self._rescan(_now())
+
+    def current(self, now: datetime) -> tuple[Rounds, Optional[datetime]]:
+        """The rounds and next release as of now, rescanning if the root changed."""
+        with self._lock:
+            if self._changed():
+                self._rescan(now)
+            elif self.next_release is not None and now >= self.next_release:
+                self._advance(now)
+            return self._rounds, self.next_release
+
+    def _changed(self) -> bool:
+        if self._fd is None:
+            return self._stat() != self._signature
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size + length
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED | IN_Q_OVERFLOW):
+                # The watch is gone or events were lost: start over
+                self._unwatch()
+                break
+        return True
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        try:
+            st = self.root.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino
+
+    def _watch(self) -> None:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            log.warning("inotify unavailable (%s), polling %s", os.strerror(ctypes.get_errno()), self.root)
+            return
+        if libc.inotify_add_watch(fd, os.fsencode(self.root), WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            if self.root.is_dir():
+                log.warning("cannot watch %s (%s), polling it", self.root, os.strerror(err))
+            return
+        self._fd = fd
+
+    def _unwatch(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _rescan(self, now: datetime) -> None:
+        # Watch (or stat) before listing, so a change made mid-scan
+        # triggers another one rather than being missed
+        if self._fd is None:
+            self._watch()
+        self._signature = self._stat()
+        root_real = self.root.resolve()
+        by_slug: dict[str, Round] = {}
+        ordered = []
+        for slug, release_at, path in discover():
+            try:
+                real: Optional[Path] = path.resolve(strict=True)
+            except (FileNotFoundError, RuntimeError):
+                real = None
+            entry = Round(slug, release_at, path, real)
+            by_slug.setdefault(slug, entry)
+            ordered.append(entry)
+        ordered.sort(key=lambda r: r.release_at)
+        self._rounds = Rounds(ordered, by_slug, [r.release_at for r in ordered], root_real)
+        self._advance(now)
+        log.info(
+            "indexed %d rounds under %s (%s)",
+            len(ordered), self.root, "inotify" if self._fd is not None else "mtime polling",
+        )
+
+    def _advance(self, now: datetime) -> None:
+        releases = self._rounds.releases
+        i = bisect.bisect_right(releases, now)
+        self.next_release = releases[i] if i < len(releases) else None
+
+
+ROUNDS = RoundIndex(ROOT)
+
+
 def safe_round_dir(slug: str) -> Path:
     """Return the resolved directory for ``slug`` iff it's released and safe.
 
@@ -113,27 +280,23 @@ def safe_round_dir(slug: str) -> Path:
     that is itself a symlink pointing outside the root is treated as
     nonexistent.
     """
-    root_real = ROOT.resolve()
     now = _now()
-    for s, release_at, path in discover():
-        if s != slug:
-            continue
-        if release_at > now:
-            raise HTTPException(status_code=404)
-        try:
-            real = path.resolve(strict=True)
-        except (FileNotFoundError, RuntimeError):
-            raise HTTPException(status_code=404)
-        try:
-            real.relative_to(root_real)
-        except ValueError:
-            log.warning(
-                "rejecting round dir that escapes ROOT: slug=%s path=%s real=%s",
-                slug, path, real,
-            )
-            raise HTTPException(status_code=404)
-        return real
-    raise HTTPException(status_code=404)
+    rounds, _ = ROUNDS.current(now)
+    entry = rounds.by_slug.get(slug)
+    if entry is None or entry.release_at > now:
+        raise HTTPException(status_code=404)
+    real = entry.real
+    if real is None or not real.is_dir():
+        raise HTTPException(status_code=404)
+    try:
+        real.relative_to(rounds.root_real)
+    except ValueError:
+        log.warning(
+            "rejecting round dir that escapes ROOT: slug=%s path=%s real=%s",
+            slug, entry.path, real,
+        )
+        raise HTTPException(status_code=404)
+    return real
 
 
 def _page(title: str, body: str) -> str:
@@ -161,13 +324,22 @@ def _page(title: str, body: str) -> str:
     )
 
 
+# Rendered index page, with the scan and next release it was rendered
+# for: it only changes when the root does or a round is released
+_index_page: tuple[Optional[Rounds], Optional[datetime], str] = (None, None, "")
+
+
 @app.get("/", response_class=HTMLResponse)
 def index() -> str:
+    global _index_page
     now = _now()
-    rounds = list(discover())
-    rounds.sort(key=lambda r: r[1])
-    revealed = [(s, t) for s, t, _ in rounds if t <= now]
-    upcoming = [(s, t) for s, t, _ in rounds if t > now]
+    rounds, next_release = ROUNDS.current(now)
+    cached_rounds, cached_next, cached = _index_page
+    if cached_rounds is rounds and cached_next == next_release:
+        return cached
+    split = bisect.bisect_right(rounds.releases, now)
+    revealed = [(r.slug, r.release_at) for r in rounds.ordered[:split]]
+    upcoming = [(r.slug, r.release_at) for r in rounds.ordered[split:]]
 
     parts: list[str] = []
     if revealed:
@@ -191,7 +363,9 @@ def index() -> str:
                 "</li>"
             )
         parts.append("</ul>")
-    return _page("Trivia", "".join(parts))
+    page = _page("Trivia", "".join(parts))
+    _index_page = (rounds, next_release, page)
+    return page
 
 
 @app.get("/{slug}/", response_class=HTMLResponse)
@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the F5-TTS server (assets/tts-server.py).
+
+Subcommands:
+  cpu    Sweep CPU thread budgets and worker counts, report real-time
+         factor (RTF) per inference and aggregate throughput. Loads
+         F5-TTS directly, so run it where f5_tts is installed:
+           docker exec tts python3 /app/tts-bench.py cpu
+           docker exec tts python3 /app/tts-bench.py cpu --threads 2,4,8 --workers 1,2,4
+  batch  Throughput mode speedup versus text chunk count, against a
+         running server: each text is synthesized with batch=false
+         (chunks one after another) and batch=true (padded batches):
+           docker exec tts python3 /app/tts-bench.py batch
+           python3 tts-bench.py batch --url http://tts.home.arpa --chunks 2,8
+  soak   Force load -> unload (or offload -> restore) cycles on a server
+         started with TTS_DEBUG_MEMORY=1 and check that memory stays
+         flat; exits non-zero if it grows past --max-growth-mb:
+           docker exec tts python3 /app/tts-bench.py soak --cycles 30
+           docker exec tts python3 /app/tts-bench.py soak --tier host
+  voice  Find a shorter reference clip for each voice. F5-TTS conditions
+         on the whole reference mel, so a 15s clip costs more per
+         inference than a 6s one that sounds the same. Cuts candidate
+         sub-clips at pauses that line up with transcript punctuation,
+         benchmarks each, and writes the fastest one whose output still
+         has the right pacing to the voice cache, which tts-server
+         prefers over the original:
+           docker exec tts python3 /app/tts-bench.py voice
+           docker exec tts python3 /app/tts-bench.py voice nature --dry-run
+
+RTF is synthesis time / audio duration: below 1.0 is faster than
+realtime. Throughput is seconds of audio produced per wall-clock second
+across all workers. The best interactive setting is usually the lowest
+RTF at workers=1; the best bulk setting is the highest throughput.
+Feed the winners back as TTS_CPU_THREADS / TTS_WORKERS.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "Meanwhile, the kettle on the stove began to whistle, and somebody "
+    "in the next room asked whether dinner would be ready by seven."
+)
+
+
+# Varied sentences so chunks don't all come out the same length
+BATCH_SENTENCES = [
+    "The committee met on Tuesday to review the budget for next year.",
+    "Rain is expected in the afternoon, clearing by the evening.",
+    "She opened the letter slowly, unsure of what it would say.",
+    "Traffic on the bridge was lighter than usual for a Monday morning.",
+    "Nobody remembered who had left the lights on in the workshop.",
+    "After the concert, the band stayed to sign autographs for an hour.",
+]
+
+# Same default as tts-server's TTS_VOICE_CACHE
+VOICE_CACHE = os.environ.get("TTS_VOICE_CACHE", "/root/.cache/huggingface/hub/tts-server/voices")
+
+# Transcript positions where a reader plausibly pauses
+TEXT_BREAK = re.compile(r"[.!?;:,][\"')\]]*\s+")
+
+
+def _int_list(spec: str) -> list[int]:
+    return [int(x) for x in spec.split(",") if x.strip()]
+
+
+def _voice_files(voices_dir: Path, voice: str) -> tuple[str, str]:
+    wav = voices_dir / f"{voice}.wav"
+    txt = voices_dir / f"{voice}.txt"
+    if not wav.exists() or not txt.exists():
+        raise SystemExit(f"voice {voice!r} not found in {voices_dir}")
+    return str(wav), txt.read_text().strip()
+
+
+def _cpu_child(settings: dict, barrier, results):
+    """One benchmark worker: same thread setup as tts-server's workers."""
+    try:
+        if settings["cpus"]:
+            os.sched_setaffinity(0, settings["cpus"])
+        os.environ["OMP_NUM_THREADS"] = str(settings["threads"])
+        os.environ["MKL_NUM_THREADS"] = str(settings["threads"])
+
+        import torch
+
+        torch.set_num_threads(settings["threads"])
+        torch.set_num_interop_threads(settings["interop"])
+
+        from f5_tts.api import F5TTS
+
+        model = F5TTS(device="cpu")
+        ref_file, ref_text = settings["ref_file"], settings["ref_text"]
+        # Warm-up, so allocator growth and first-call overhead don't count
+        model.infer(ref_file=ref_file, ref_text=ref_text, gen_text="Warming up.")
+    except Exception as e:
+        results.put(("error", repr(e)))
+        barrier.abort()
+        return
+
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        results.put(("error", "another worker failed to start"))
+        return
+    with torch.inference_mode():
+        for _ in range(settings["repeats"]):
+            start = time.time()
+            wav, sr, _ = model.infer(
+                ref_file=ref_file, ref_text=ref_text, gen_text=settings["text"]
+            )
+            results.put(("run", (time.time() - start, len(wav) / sr, time.time())))
+    results.put(("done", None))
+
+
+def _cpu_trial(args, threads: int, workers: int, cores: list[int], ref) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = []
+    for index in range(workers):
+        cpus = None
+        if args.affinity:
+            first = index * threads % len(cores)
+            cpus = (cores * 2)[first:first + min(threads, len(cores))]
+        settings = {
+            "threads": threads,
+            "interop": args.interop,
+            "cpus": cpus,
+            "ref_file": ref[0],
+            "ref_text": ref[1],
+            "text": args.text,
+            "repeats": args.repeats,
+        }
+        proc = ctx.Process(target=_cpu_child, args=(settings, barrier, results))
+        proc.start()
+        procs.append(proc)
+
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    started = time.time()
+
+    runs, errors, done = [], [], 0
+    while done < workers:
+        kind, payload = results.get()
+        if kind == "run":
+            runs.append(payload)
+        elif kind == "error":
+            errors.append(payload)
+            done += 1
+        else:
+            done += 1
+    for proc in procs:
+        proc.join()
+
+    if errors:
+        return {"threads": threads, "workers": workers, "error": errors[0]}
+    rtfs = sorted(elapsed / audio for elapsed, audio, _ in runs)
+    wall = max(end for _, _, end in runs) - started
+    return {
+        "threads": threads,
+        "interop": args.interop,
+        "workers": workers,
+        "affinity": args.affinity,
+        "runs": len(runs),
+        "rtf_mean": round(statistics.mean(rtfs), 3),
+        "rtf_p95": round(rtfs[min(len(rtfs) - 1, int(len(rtfs) * 0.95))], 3),
+        "throughput": round(sum(audio for _, audio, _ in runs) / wall, 3),
+    }
+
+
+def cmd_cpu(args):
+    cores = sorted(os.sched_getaffinity(0))
+    ref = _voice_files(Path(args.voices_dir), args.voice)
+    threads_list = _int_list(args.threads) if args.threads else sorted(
+        {t for t in (1, 2, 4, 8, 16, len(cores)) if t <= len(cores)}
+    )
+
+    results = []
+    print(f"{len(cores)} cores available, {args.repeats} runs per worker", file=sys.stderr)
+    print(f"{'threads':>7} {'workers':>7} {'rtf_mean':>8} {'rtf_p95':>8} {'x_realtime':>10}")
+    for threads in threads_list:
+        workers_list = _int_list(args.workers) if args.workers else sorted(
+            {1, max(1, len(cores) // threads)}
+        )
+        for workers in workers_list:
+            if threads * workers > len(cores) and not args.oversubscribe:
+                continue
+            result = _cpu_trial(args, threads, workers, cores, ref)
+            results.append(result)
+            if "error" in result:
+                print(f"{threads:>7} {workers:>7} error: {result['error']}")
+                continue
+            print(
+                f"{threads:>7} {workers:>7} {result['rtf_mean']:>8} "
+                f"{result['rtf_p95']:>8} {result['throughput']:>10}",
+                flush=True,
+            )
+
+    ok = [r for r in results if "error" not in r]
+    if ok:
+        latency = min(ok, key=lambda r: r["rtf_mean"])
+        throughput = max(ok, key=lambda r: r["throughput"])
+        print(
+            f"\nlowest latency: TTS_CPU_THREADS={latency['threads']} "
+            f"TTS_WORKERS={latency['workers']} (RTF {latency['rtf_mean']})"
+        )
+        print(
+            f"best throughput: TTS_CPU_THREADS={throughput['threads']} "
+            f"TTS_WORKERS={throughput['workers']} ({throughput['throughput']}x realtime)"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+def _http_json(args, method: str, path: str, body: Optional[dict] = None) -> dict:
+    request = urllib.request.Request(
+        f"{args.url.rstrip('/')}{path}",
+        method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=600) as response:
+        data = response.read()
+    return json.loads(data) if response.headers.get_content_type() == "application/json" else {}
+
+
+def _batch_request(args, text: str, batch: bool):
+    body = json.dumps({
+        "input": text,
+        "voice": args.voice,
+        "response_format": "wav",
+        "batch": batch,
+        # Fixed quality and a long deadline: measure the mode, not the queue
+        "quality": "high",
+        "priority": "bulk",
+        "deadline": 3600,
+    }).encode()
+    request = urllib.request.Request(
+        f"{args.url.rstrip('/')}/v1/audio/speech",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+    start = time.time()
+    with urllib.request.urlopen(request, timeout=3600) as response:
+        response.read()
+    return time.time() - start, response.headers
+
+
+def cmd_batch(args):
+    print(f"{'chunks':>6} {'batches':>7} {'sequential':>10} {'batched':>8} {'speedup':>7}")
+    # One untimed request so a cold model load doesn't land in the first row
+    _batch_request(args, BATCH_SENTENCES[0], False)
+    results = []
+    for chunks in _int_list(args.chunks):
+        sentences = [BATCH_SENTENCES[i % len(BATCH_SENTENCES)] for i in range(chunks * args.sentences_per_chunk)]
+        text = " ".join(sentences)
+        sequential = min(_batch_request(args, text, False)[0] for _ in range(args.repeats))
+        timings = [_batch_request(args, text, True) for _ in range(args.repeats)]
+        batched, headers = min(timings, key=lambda t: t[0])
+        result = {
+            "requested_chunks": chunks,
+            "chunks": int(headers.get("X-TTS-Chunks", 0)),
+            "batches": int(headers.get("X-TTS-Batches", 0)),
+            "sequential_s": round(sequential, 2),
+            "batched_s": round(batched, 2),
+            "speedup": round(sequential / batched, 2),
+        }
+        results.append(result)
+        print(
+            f"{result['chunks']:>6} {result['batches']:>7} {result['sequential_s']:>10} "
+            f"{result['batched_s']:>8} {result['speedup']:>7}",
+            flush=True,
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+def _growth(values: list[float]) -> float:
+    """Least-squares growth over the whole run, in the values' unit."""
+    if len(values) < 2:
+        return 0.0
+    slope = statistics.linear_regression(range(len(values)), values).slope
+    return slope * (len(values) - 1)
+
+
+def cmd_soak(args):
+    try:
+        baseline = _http_json(args, "GET", "/debug/memory?top=10&tracemalloc=true")
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            raise SystemExit("server doesn't expose /debug/memory; start it with TTS_DEBUG_MEMORY=1")
+        raise
+
+    print(f"{'cycle':>5} {'api_mb':>8} {'worker_mb':>9} {'cuda_mb':>8} {'tensors':>7}")
+    rows = []
+    for cycle in range(args.cycles):
+        # Load (or restore) with a real synthesis, then measure while warm
+        _http_json(args, "POST", "/v1/audio/speech", {
+            "input": args.text,
+            "voice": args.voice,
+            "response_format": "wav",
+            "priority": "bulk",
+            "deadline": 600,
+        })
+        warm = _http_json(args, "GET", "/debug/memory?top=0")
+        _http_json(args, "POST", f"/debug/unload?tier={args.tier}")
+        cold = _http_json(args, "GET", "/debug/memory?top=0")
+
+        workers = [w for w in warm["workers"] if w.get("rss_mb") is not None]
+        row = {
+            "cycle": cycle,
+            "api_mb": cold["api"]["rss_mb"],
+            "worker_mb": sum(w["rss_mb"] for w in workers),
+            "cuda_mb": sum(w.get("cuda", {}).get("allocated_mb", 0) for w in workers),
+            "tensors": sum(t["count"] for w in workers for t in w.get("tensors", {}).values()),
+        }
+        if args.tier == "host":
+            # The worker survives an offload: what it still holds is what leaks
+            parked = [w for w in cold["workers"] if w.get("rss_mb") is not None]
+            row["worker_mb"] = sum(w["rss_mb"] for w in parked)
+            row["cuda_mb"] = sum(w.get("cuda", {}).get("allocated_mb", 0) for w in parked)
+        rows.append(row)
+        print(
+            f"{cycle:>5} {row['api_mb']:>8} {row['worker_mb']:>9} {row['cuda_mb']:>8} {row['tensors']:>7}",
+            flush=True,
+        )
+
+    # The first cycles include one-time growth (imports, allocator pools)
+    steady = rows[args.warmup:]
+    growth = {
+        key: round(_growth([row[key] for row in steady]), 1)
+        for key in ("api_mb", "worker_mb", "cuda_mb")
+    }
+    print(f"\ngrowth over {len(steady)} cycles after warm-up: {growth}")
+    final = _http_json(args, "GET", "/debug/memory?top=10&tracemalloc=true")
+    leaking = {key: mb for key, mb in growth.items() if mb > args.max_growth_mb}
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "rows": rows, "growth": growth, "baseline": baseline, "final": final,
+        }, indent=2))
+    if leaking:
+        print(f"FAIL: memory grew past {args.max_growth_mb} MB: {leaking}")
+        print("API allocations that grew most since the start:")
+        for line in final["api"].get("tracemalloc", {}).get("growth", []):
+            print(f"  {line['kb_diff']:>+10} KB  {line['where']}")
+        sys.exit(1)
+    print(f"OK: memory flat within {args.max_growth_mb} MB")
+
+
+def _voice_source(wav: Path, txt: Path) -> dict:
+    """Identify the reference files a cached clip was cut from (as tts-server does)."""
+    return {
+        "wav": [wav.stat().st_size, wav.stat().st_mtime_ns],
+        "txt": [txt.stat().st_size, txt.stat().st_mtime_ns],
+    }
+
+
+def _pauses(audio, sr: int, threshold_db: float, min_pause_ms: int) -> tuple[list, int, int]:
+    """
+    Find pauses in a reference clip.
+
+    Returns (pauses, speech_start, speech_end) in samples, pauses being
+    (start, end) runs of 10ms frames below threshold_db lasting at least
+    min_pause_ms, excluding leading and trailing silence.
+    """
+    import numpy as np
+
+    frame = sr // 100
+    frames = len(audio) // frame
+    rms = np.sqrt(np.mean(audio[: frames * frame].reshape(frames, frame) ** 2, axis=1))
+    silent = 20 * np.log10(np.maximum(rms, 1e-10)) < threshold_db
+    voiced = np.flatnonzero(~silent)
+    if not len(voiced):
+        return [], 0, len(audio)
+    first, last = voiced[0], voiced[-1] + 1
+
+    pauses, run = [], None
+    for i in range(first, last):
+        if silent[i] and run is None:
+            run = i
+        elif not silent[i] and run is not None:
+            if (i - run) * 10 >= min_pause_ms:
+                pauses.append((run * frame, i * frame))
+            run = None
+    return pauses, first * frame, last * frame
+
+
+def _voice_candidates(audio, sr: int, text: str, args) -> list[dict]:
+    """
+    Cut candidate sub-clips at pauses that line up with transcript breaks.
+
+    Each transcript break (punctuation) is placed in time by its share of
+    the transcript's letters, then matched to the nearest unused pause
+    within --align-tolerance seconds, in order. Every span between two
+    matched boundaries (or the clip's speech start/end) whose length is
+    within --min-seconds..--max-seconds is a candidate; the ones closest
+    to --target-seconds are kept.
+    """
+    pauses, start, end = _pauses(audio, sr, args.threshold_db, args.min_pause_ms)
+    letters = [i for i, c in enumerate(text) if c.isalnum()]
+    if not letters:
+        return []
+
+    # (audio cut-in, audio cut-out, text offset) at each usable boundary
+    pad = int(sr * args.pad_ms / 1000)
+    bounds = [(max(0, start - pad), None, 0)]
+    next_pause = 0
+    for match in TEXT_BREAK.finditer(text):
+        share = sum(1 for i in letters if i < match.start()) / len(letters)
+        expected = start + share * (end - start)
+        best = None
+        for k in range(next_pause, len(pauses)):
+            centre = sum(pauses[k]) / 2
+            if abs(centre - expected) <= args.align_tolerance * sr and (
+                best is None or abs(centre - expected) < abs(sum(pauses[best]) / 2 - expected)
+            ):
+                best = k
+        if best is None:
+            continue
+        pause_start, pause_end = pauses[best]
+        bounds.append((max(pause_start, pause_end - pad), min(pause_end, pause_start + pad), match.end()))
+        next_pause = best + 1
+    bounds.append((None, min(len(audio), end + pad), len(text)))
+
+    candidates = []
+    for i in range(len(bounds)):
+        for j in range(i + 1, len(bounds)):
+            if i == 0 and j == len(bounds) - 1:
+                continue  # the whole clip is the baseline
+            cut_in, cut_out = bounds[i][0], bounds[j][1]
+            seconds = (cut_out - cut_in) / sr
+            span_text = text[bounds[i][2]:bounds[j][2]].strip()
+            if args.min_seconds <= seconds <= args.max_seconds and span_text:
+                candidates.append({
+                    "start": round(cut_in / sr, 3),
+                    "end": round(cut_out / sr, 3),
+                    "seconds": round(seconds, 3),
+                    "text": span_text,
+                })
+    candidates.sort(key=lambda c: abs(c["seconds"] - args.target_seconds))
+    return candidates[: args.candidates]
+
+
+def _bench_clip(model, ref_file: str, ref_text: str, args) -> dict:
+    """RTF and output length for one reference clip (after a warm-up run)."""
+    import torch
+
+    with torch.inference_mode():
+        # First run also preprocesses (and caches) the reference
+        model.infer(ref_file=ref_file, ref_text=ref_text, gen_text="Warming up.")
+        elapsed, audio = [], []
+        for _ in range(args.repeats):
+            start = time.time()
+            wav, sr, _ = model.infer(ref_file=ref_file, ref_text=ref_text, gen_text=args.text)
+            elapsed.append(time.time() - start)
+            audio.append(len(wav) / sr)
+    return {
+        "rtf": round(statistics.mean(elapsed) / statistics.mean(audio), 3),
+        "output_seconds": round(statistics.mean(audio), 2),
+    }
+
+
+def _optimize_voice(model, voices_dir: Path, voice: str, args) -> dict:
+    import soundfile as sf
+
+    wav, txt = voices_dir / f"{voice}.wav", voices_dir / f"{voice}.txt"
+    ref_file, ref_text = _voice_files(voices_dir, voice)
+    audio, sr = sf.read(ref_file, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+
+    baseline = {
+        "start": 0.0,
+        "end": round(len(audio) / sr, 3),
+        "seconds": round(len(audio) / sr, 3),
+        "text": ref_text,
+        **_bench_clip(model, ref_file, ref_text, args),
+    }
+    print(f"\n{voice}: {baseline['seconds']}s reference, RTF {baseline['rtf']}")
+    print(f"{'start':>7} {'end':>7} {'rtf':>6} {'output':>7}  text")
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f"voice-{voice}-"))
+    try:
+        results = []
+        for i, candidate in enumerate(_voice_candidates(audio, sr, ref_text, args)):
+            clip = tmp_dir / f"{i}.wav"
+            sf.write(clip, audio[int(candidate["start"] * sr):int(candidate["end"] * sr)], sr)
+            candidate.update(_bench_clip(model, str(clip), candidate["text"], args))
+            candidate["file"] = str(clip)
+            # F5-TTS sizes the output from the reference's speaking rate; a
+            # clip whose transcript doesn't match its audio gets the pacing
+            # wrong, which shows up as a different output length
+            drift = abs(candidate["output_seconds"] / baseline["output_seconds"] - 1)
+            candidate["ok"] = drift <= args.duration_tolerance
+            results.append(candidate)
+            print(
+                f"{candidate['start']:>7} {candidate['end']:>7} {candidate['rtf']:>6} "
+                f"{candidate['output_seconds']:>6}s  {candidate['text'][:60]!r}"
+                + ("" if candidate["ok"] else "  (pacing off, skipped)")
+            )
+
+        usable = [c for c in results if c["ok"] and c["rtf"] <= baseline["rtf"] * (1 - args.min_gain)]
+        if not usable:
+            print(f"{voice}: no candidate beats the original by {args.min_gain:.0%}, keeping it")
+            return {"voice": voice, "baseline": baseline, "candidates": results, "chosen": None}
+        chosen = min(usable, key=lambda c: c["rtf"])
+        print(
+            f"{voice}: {chosen['seconds']}s clip at {chosen['start']}s, "
+            f"RTF {baseline['rtf']} -> {chosen['rtf']}"
+        )
+
+        if args.dry_run:
+            print(f"{voice}: dry run, candidate clips left in {tmp_dir}")
+        else:
+            cache = Path(args.cache_dir)
+            cache.mkdir(parents=True, exist_ok=True)
+            meta = {
+                "source": _voice_source(wav, txt),
+                **{k: chosen[k] for k in ("start", "end", "seconds", "rtf")},
+                "baseline_seconds": baseline["seconds"],
+                "baseline_rtf": baseline["rtf"],
+            }
+            # Sidecar last: the server only uses a clip once its sidecar exists
+            for name, write in (
+                (f"{voice}.wav", lambda p: p.write_bytes(Path(chosen["file"]).read_bytes())),
+                (f"{voice}.txt", lambda p: p.write_text(chosen["text"] + "\n")),
+                (f"{voice}.json", lambda p: p.write_text(json.dumps(meta, indent=2))),
+            ):
+                tmp = cache / f".{name}.tmp"
+                write(tmp)
+                tmp.rename(cache / name)
+            print(f"{voice}: wrote {cache / (voice + '.wav')}")
+        return {"voice": voice, "baseline": baseline, "candidates": results, "chosen": chosen}
+    finally:
+        # A dry run leaves the candidate clips to listen to
+        if not args.dry_run:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def cmd_voice(args):
+    voices_dir = Path(args.voices_dir)
+    voices = args.voices or sorted(
+        p.stem for p in voices_dir.glob("*.wav") if p.with_suffix(".txt").exists()
+    )
+    if not voices:
+        raise SystemExit(f"no voices in {voices_dir}")
+
+    from f5_tts.api import F5TTS
+
+    model = F5TTS(device=args.device) if args.device else F5TTS()
+    results = [_optimize_voice(model, voices_dir, voice, args) for voice in voices]
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cpu = sub.add_parser("cpu", help="Sweep CPU threads/workers and report RTF")
+    cpu.add_argument(
+        "--threads",
+        help="Comma-separated intra-op thread counts (default: 1,2,4,8,16,all)",
+    )
+    cpu.add_argument(
+        "--workers",
+        help="Comma-separated concurrent worker counts (default: 1 and cores/threads)",
+    )
+    cpu.add_argument("--interop", type=int, default=1, help="Inter-op threads (default: 1)")
+    cpu.add_argument("--affinity", action="store_true", help="Pin each worker to its own cores")
+    cpu.add_argument(
+        "--oversubscribe",
+        action="store_true",
+        help="Also run combinations where threads x workers exceeds the cores",
+    )
+    cpu.add_argument("--repeats", type=int, default=3, help="Runs per worker (default: 3)")
+    cpu.add_argument("--text", default=DEFAULT_TEXT, help="Text to synthesize")
+    cpu.add_argument("--voice", default=os.environ.get("TTS_VOICE", "nature"))
+    cpu.add_argument("--voices-dir", default=os.environ.get("TTS_VOICES_DIR", "/voices"))
+    cpu.add_argument("--json", help="Also write results to this file")
+    cpu.set_defaults(func=cmd_cpu)
+
+    batch = sub.add_parser("batch", help="Throughput mode speedup vs chunk count (over HTTP)")
+    batch.add_argument(
+        "--url",
+        default=os.environ.get("TTS_URL", "http://127.0.0.1:8880"),
+        help="TTS server base URL (default: http://127.0.0.1:8880)",
+    )
+    batch.add_argument(
+        "--chunks", default="1,2,4,8,16", help="Comma-separated target chunk counts (default: 1,2,4,8,16)"
+    )
+    batch.add_argument(
+        "--sentences-per-chunk",
+        type=int,
+        default=3,
+        help="Sentences per target chunk; the server's X-TTS-Chunks has the real count (default: 3)",
+    )
+    batch.add_argument("--repeats", type=int, default=2, help="Runs per mode, best is kept (default: 2)")
+    batch.add_argument("--voice", default=os.environ.get("TTS_VOICE", "nature"))
+    batch.add_argument("--json", help="Also write results to this file")
+    batch.set_defaults(func=cmd_batch)
+
+    soak = sub.add_parser("soak", help="Load/unload cycles; check memory stays flat")
+    soak.add_argument(
+        "--url",
+        default=os.environ.get("TTS_URL", "http://127.0.0.1:8880"),
+        help="TTS server base URL (default: http://127.0.0.1:8880)",
+    )
+    soak.add_argument("--cycles", type=int, default=20, help="Load/unload cycles (default: 20)")
+    soak.add_argument(
+        "--warmup", type=int, default=3, help="Cycles excluded from the growth check (default: 3)"
+    )
+    soak.add_argument(
+        "--tier",
+        choices=("unloaded", "host"),
+        default="unloaded",
+        help="Unload the workers, or only offload to host RAM (default: unloaded)",
+    )
+    soak.add_argument(
+        "--max-growth-mb", type=float, default=20.0, help="Allowed growth per process kind (default: 20)"
+    )
+    soak.add_argument("--text", default="Testing, one two three.", help="Text synthesized each cycle")
+    soak.add_argument("--voice", default=os.environ.get("TTS_VOICE", "nature"))
+    soak.add_argument("--json", help="Also write rows and memory reports to this file")
+    soak.set_defaults(func=cmd_soak)
+
+    voice = sub.add_parser("voice", help="Write shorter, faster reference clips to the voice cache")
+    voice.add_argument("voices", nargs="*", help="Voices to optimize (default: all)")
+    voice.add_argument("--target-seconds", type=float, default=6.0, help="Preferred clip length (default: 6)")
+    voice.add_argument("--min-seconds", type=float, default=3.0, help="Shortest clip to try (default: 3)")
+    voice.add_argument("--max-seconds", type=float, default=10.0, help="Longest clip to try (default: 10)")
+    voice.add_argument("--candidates", type=int, default=5, help="Clips to benchmark per voice (default: 5)")
+    voice.add_argument(
+        "--threshold-db", type=float, default=-40.0, help="Pause level in dBFS (default: -40)"
+    )
+    voice.add_argument("--min-pause-ms", type=int, default=120, help="Shortest pause to cut at (default: 120)")
+    voice.add_argument("--pad-ms", type=int, default=80, help="Silence kept around a cut (default: 80)")
+    voice.add_argument(
+        "--align-tolerance",
+        type=float,
+        default=0.6,
+        help="Max seconds between a transcript break's estimated time and its pause (default: 0.6)",
+    )
+    voice.add_argument(
+        "--duration-tolerance",
+        type=float,
+        default=0.15,
+        help="Max output length drift vs the original clip (default: 0.15)",
+    )
+    voice.add_argument(
+        "--min-gain", type=float, default=0.05, help="Required RTF improvement (default: 0.05)"
+    )
+    voice.add_argument("--repeats", type=int, default=3, help="Runs per clip (default: 3)")
+    voice.add_argument("--text", default=DEFAULT_TEXT, help="Text to synthesize")
+    voice.add_argument("--device", help="cuda or cpu (default: F5-TTS picks)")
+    voice.add_argument("--voices-dir", default=os.environ.get("TTS_VOICES_DIR", "/voices"))
+    voice.add_argument("--cache-dir", default=VOICE_CACHE, help=f"Output directory (default: {VOICE_CACHE})")
+    voice.add_argument("--dry-run", action="store_true", help="Benchmark only, write nothing")
+    voice.add_argument("--json", help="Also write results to this file")
+    voice.set_defaults(func=cmd_voice)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,105 @@ Features:
 - OpenAI API compatible: POST /v1/audio/speech
 - WebSocket streaming: ws://host/v1/audio/stream
 - F5-TTS backend (high-quality neural TTS)
-- Lazy model loading on first request
-- Automatic GPU VRAM unloading after configurable idle timeout
+- Lazy model loading on first request (or POST /v1/audio/warmup), from
+  a pre-converted safetensors copy of the weights (memory-mapped, no
+  dtype conversion), followed by a short warm-up synthesis
+- Tiered idle unloading: after TTS_KEEP_ALIVE the model moves from GPU
+  VRAM to host RAM (seconds to bring back), after TTS_HOST_KEEP_ALIVE
+  the worker is stopped and everything is freed
+- CPU mode: explicit torch thread budgets, a pool of inference workers
+  sized to cores / threads-per-inference, optional core pinning
+- Model runs in a supervised worker process; audio comes back through a
+  shared-memory ring buffer. Unloading stops the worker, and a crashed
+  worker is restarted without taking the API down
 - Voice = reference audio + text pair
+- Leading/trailing silence trimming and compaction of long pauses between
+  streamed batches, before PCM conversion
+- Admission control: bounded per-priority queues, per-client limits,
+  fast 503/429 + Retry-After when a request can't start within its deadline
+- Quality knob (flow-matching NFE steps), chosen per request or
+  automatically: under queue pressure, lower-priority work is synthesized
+  with fewer steps so deadlines hold
+- Throughput mode for non-streaming requests: all text chunks of a
+  request are sampled as padded batches sized to free memory, then
+  crossfaded, instead of one after another
+- Optional lightweight engine (Kokoro-82M via kokoro-onnx, in-process on
+  CPU): short HTTP utterances are routed to it instead of F5-TTS, which
+  skips reference conditioning, the queue and any cold load
+- Resumable WebSocket sessions: audio frames are retained server-side for
+  a while, so a client that reconnects picks up where it left off
+- Prometheus metrics at GET /metrics
 
 Environment variables:
 - TTS_HOST: Host to bind (default: 0.0.0.0)
 - TTS_PORT: Port to bind (default: 8880)
-- TTS_KEEP_ALIVE: Idle timeout in seconds (default: 300 = 5 minutes)
+- TTS_KEEP_ALIVE: Idle seconds before the model leaves the GPU for host
+    RAM (default: 300 = 5 minutes)
+- TTS_HOST_KEEP_ALIVE: Idle seconds before the model is unloaded
+    entirely (default: 1800; 0 skips the host RAM tier and unloads at
+    TTS_KEEP_ALIVE)
 - TTS_VOICE: Default voice name (default: nature)
 - TTS_VOICES_DIR: Directory containing voice reference files
+- TTS_VOICE_CACHE: Optimized reference clips written by
+    `tts-bench.py voice`, used instead of the originals while those are
+    unchanged (default: in the HF cache volume; empty disables)
+- TTS_DEVICE: auto, cuda or cpu (default: auto, F5-TTS picks)
+- TTS_CPU_THREADS: torch intra-op threads per inference worker
+    (default: all cores in cpu mode, torch's default otherwise)
+- TTS_CPU_INTEROP_THREADS: torch inter-op threads per worker
+    (default: 1 in cpu mode, torch's default otherwise)
+- TTS_WORKERS: Inference worker processes (default: cores /
+    TTS_CPU_THREADS in cpu mode, else 1)
+- TTS_CPU_AFFINITY: Pin each worker to its own TTS_CPU_THREADS cores
+    (default: 0)
+- TTS_MAX_CONCURRENT: Synthesis jobs running at once (default: one per
+    inference worker)
+- TTS_MAX_PER_CLIENT: Queued + running jobs per client IP (default: 2)
+- TTS_QUEUE_CAPACITY: Queue slots per priority
+    (default: interactive=8,normal=4,bulk=2)
+- TTS_QUEUE_DEADLINE: Max seconds a request may wait for a slot, per
+    priority (default: interactive=15,normal=60,bulk=300)
+- TTS_SERVICE_ESTIMATE: Initial per-job service time guess in seconds,
+    refined by an EWMA of observed jobs (default: 5)
+- TTS_QUALITY: Default quality, high/medium/low/auto (default: auto)
+- TTS_QUALITY_STEPS: NFE steps per quality level
+    (default: high=32,medium=16,low=8)
+- TTS_BATCH_MAX: Most text chunks of one non-streaming request sampled
+    together (default: 8; 1 disables throughput mode)
+- TTS_DEBUG_MEMORY: Enable /debug/memory and /debug/unload and trace
+    allocations with tracemalloc (default: 0; slows everything down)
+- TTS_DEBUG_MEMORY_FRAMES: tracemalloc frames per allocation (default: 1)
+- TTS_DEBUG_MEMORY_INTERVAL: Seconds between RSS samples (default: 10)
+- TTS_KOKORO_MODEL: kokoro-onnx model file (default: unset, engine off)
+- TTS_KOKORO_VOICES_FILE: kokoro-onnx voices file
+- TTS_KOKORO_VOICES: F5 voice -> Kokoro voice map, "*" for any voice
+    (e.g. "*=af_heart"); only mapped voices are routed automatically
+- TTS_KOKORO_LANG: Kokoro phonemizer language (default: en-us)
+- TTS_ROUTE_MAX_CHARS / TTS_ROUTE_MAX_WORDS: Single-sentence utterances
+    up to both limits go to Kokoro (default: 60 / 8)
+- TTS_WEIGHTS_CACHE: Directory for the converted weights (default: in
+    the HF cache volume; empty disables)
+- TTS_WARMUP: Run a warm-up synthesis after each model load (default: 1)
+- TTS_STUB_MODEL: Replace F5-TTS with a deterministic tone generator,
+    for benchmarking the serving path without torch or a GPU (see
+    `wyoming-bench.py pipeline`): "1", or settings such as
+    "load=2,first=0.3,rtf=0.1,cps=15" - seconds to load, seconds to the
+    first chunk, generation time per second of audio, and characters
+    per second of audio (default: unset, real model)
+- TTS_RING_MB: Shared-memory PCM ring size in MiB, per worker (default: 16, ~5 min
+    of audio)
+- TTS_SILENCE_TRIM: Trim/compact silence in output (default: 1)
+- TTS_SILENCE_THRESHOLD_DB: 10ms frames below this RMS level in dBFS
+    count as silence (default: -45)
+- TTS_SILENCE_PAD_MS: Silence kept before the first and after the last
+    sound of an utterance (default: 40)
+- TTS_SILENCE_MAX_GAP_MS: Longest pause kept inside an utterance or
+    between WebSocket sentences (default: 300)
+- TTS_SESSION_TTL: Seconds a disconnected WebSocket session stays
+    resumable (default: 120)
+- TTS_SESSION_RETAIN_SECONDS: Audio retained per WebSocket session for
+    replay on resume; synthesis pauses when it's full of unsent audio
+    (default: 120)
 
 API:
   POST /v1/audio/speech
@@ -24,14 +113,49 @@ API:
     "input": "Hello world",     # text to synthesize
     "voice": "nature",          # voice name (maps to ref audio)
     "response_format": "mp3",   # mp3, wav, opus, flac
-    "speed": 1.0                # speech rate multiplier
+    "speed": 1.0,               # speech rate multiplier
+    "priority": "normal",       # interactive, normal, bulk (optional)
+    "deadline": 30,             # max seconds to wait in queue (optional)
+    "quality": "auto",          # high, medium, low, auto (optional)
+    "engine": "auto",           # f5, kokoro, auto (optional)
+    "batch": true               # throughput mode, non-streaming (optional)
   }
-  -> Returns audio bytes with appropriate Content-Type
-
-  WebSocket /v1/audio/stream?voice=nature&speed=1.0
+  -> Returns audio bytes with appropriate Content-Type, and
+     X-TTS-Engine (plus X-TTS-Quality / X-TTS-NFE-Steps for F5-TTS,
+     and X-TTS-Chunks / X-TTS-Batches in throughput mode) headers
+     saying what was used; X-TTS-Model-State says whether F5-TTS was
+     warm, loading, in host RAM or unloaded when the request arrived
+  -> 503 (queue full / deadline) or 429 (per-client limit) with
+     Retry-After when the request is shed
+
+  WebSocket /v1/audio/stream?voice=nature&speed=1.0&chunk_ms=340&control=false&quality=auto
   - Client sends: text chunks (string messages)
   - Server sends: raw PCM audio (binary, s16le mono 24kHz)
   - Buffers until sentence boundaries for coherent synthesis
+  - With control=true, client frames are JSON: {"type": "text", ...},
+    {"type": "config", ...} and {"type": "ack", "buffered_ms": N} buffer
+    reports, which the server uses to pace delivery and size chunks
+  - Server sends {"type": "busy", "retry_after": N} and closes when a
+    sentence can't be admitted
+  - session_start carries a session id; the n-th binary frame is audio
+    frame n. Reconnect with ?session=ID&from_seq=N to replay from frame
+    N; the server answers session_resume with received_chars, the amount
+    of text it already has
+
+  POST /v1/audio/warmup
+  - Start loading (or restoring from host RAM) the F5-TTS model without
+    synthesizing anything, and restart its keep-alive clock. Returns at
+    once with {"state": ..., "tier": ...}, state being what the request
+    found. The Wyoming bridges call it when a request looks imminent;
+    session_start carries the same model_state for WebSocket sessions
+
+  GET /debug/memory?top=15&tracemalloc=false   (TTS_DEBUG_MEMORY=1 only)
+  - RSS history of the API and worker processes, memory before/after
+    each offload and unload, live object and tensor counts, torch
+    allocator stats; tracemalloc=true adds top allocating lines and
+    their growth since the previous sample
+  POST /debug/unload?tier=unloaded             (TTS_DEBUG_MEMORY=1 only)
+  - Move the model to host RAM or unload it now (see tts-bench.py soak)
 
 Voice format:
   Each voice requires two files in TTS_VOICES_DIR:
@@ -41,34 +165,175 @@ Voice format:
 
 import asyncio
 import gc
+import heapq
 import io
+import itertools
+import json
 import logging
+import math
+import multiprocessing
 import os
+import queue
 import re
+import secrets
 import struct
 import subprocess
+import sys
 import tempfile
 import threading
 import time
-from contextlib import asynccontextmanager
+import tracemalloc
+from collections import Counter, defaultdict, deque
+from contextlib import aclosing, asynccontextmanager, nullcontext
+from multiprocessing import shared_memory
 from pathlib import Path
-from typing import Generator, Optional
+from types import SimpleNamespace
+from typing import Callable, Generator, Optional
 
 import numpy as np
 import soundfile as sf
-import torch
-import torchaudio
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import Response, StreamingResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.requests import HTTPConnection
+
+
+def _parse_map(spec: str, cast) -> dict:
+    """Parse "interactive=8,normal=4,bulk=2" into {key: cast(value)}."""
+    result = {}
+    for item in spec.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            result[key.strip()] = cast(value.strip())
+    return result
+
 
 # Configuration from environment
 HOST = os.environ.get("TTS_HOST", "0.0.0.0")
 PORT = int(os.environ.get("TTS_PORT", "8880"))
 KEEP_ALIVE = int(os.environ.get("TTS_KEEP_ALIVE", "300"))  # 5 minutes default
+HOST_KEEP_ALIVE = int(os.environ.get("TTS_HOST_KEEP_ALIVE", "1800"))
 DEFAULT_VOICE = os.environ.get("TTS_VOICE", "nature")
 VOICES_DIR = Path(os.environ.get("TTS_VOICES_DIR", "/voices"))
 
+# Inference device and CPU thread budget. Every worker process gets its
+# own torch thread pools, so on CPU the pool is sized so that
+# workers x threads doesn't oversubscribe the cores we're allowed on.
+DEVICE = os.environ.get("TTS_DEVICE", "auto")
+CPU_MODE = DEVICE == "cpu"
+CPU_CORES = sorted(os.sched_getaffinity(0))
+CPU_THREADS = int(os.environ.get("TTS_CPU_THREADS", "0")) or (
+    len(CPU_CORES) if CPU_MODE else None
+)
+CPU_INTEROP_THREADS = int(os.environ.get("TTS_CPU_INTEROP_THREADS", "0")) or (
+    1 if CPU_MODE else None
+)
+WORKERS = int(os.environ.get("TTS_WORKERS", "0")) or (
+    max(1, len(CPU_CORES) // CPU_THREADS) if CPU_MODE else 1
+)
+CPU_AFFINITY = os.environ.get("TTS_CPU_AFFINITY", "0") in ("1", "true", "yes")
+
+
+def worker_settings(index: int) -> dict:
+    """Device, thread budget and (optionally) cores for inference worker `index`."""
+    cpus = None
+    if CPU_AFFINITY and CPU_THREADS:
+        # Consecutive blocks, wrapping if TTS_WORKERS overcommits
+        first = index * CPU_THREADS % len(CPU_CORES)
+        cpus = (CPU_CORES * 2)[first:first + min(CPU_THREADS, len(CPU_CORES))]
+    return {
+        "device": None if DEVICE == "auto" else DEVICE,
+        "threads": CPU_THREADS,
+        "interop_threads": CPU_INTEROP_THREADS,
+        "cpus": cpus,
+    }
+
+
+# Admission control. Priorities are ordered most to least urgent.
+PRIORITIES = ("interactive", "normal", "bulk")
+MAX_CONCURRENT = int(os.environ.get("TTS_MAX_CONCURRENT", str(WORKERS)))
+MAX_PER_CLIENT = int(os.environ.get("TTS_MAX_PER_CLIENT", "2"))
+QUEUE_CAPACITY = {
+    "interactive": 8, "normal": 4, "bulk": 2,
+    **_parse_map(os.environ.get("TTS_QUEUE_CAPACITY", ""), int),
+}
+QUEUE_DEADLINE = {
+    "interactive": 15.0, "normal": 60.0, "bulk": 300.0,
+    **_parse_map(os.environ.get("TTS_QUEUE_DEADLINE", ""), float),
+}
+SERVICE_ESTIMATE = float(os.environ.get("TTS_SERVICE_ESTIMATE", "5"))
+
+# Quality = flow-matching NFE steps; latency scales about linearly with them
+QUALITIES = ("high", "medium", "low")
+QUALITY_STEPS = {
+    "high": 32, "medium": 16, "low": 8,
+    **_parse_map(os.environ.get("TTS_QUALITY_STEPS", ""), int),
+}
+DEFAULT_QUALITY = os.environ.get("TTS_QUALITY", "auto")
+# quality=auto, per priority, as queue pressure rises past 0.5 and 1.0
+AUTO_QUALITY = {
+    "interactive": ("high", "high", "medium"),
+    "normal": ("high", "medium", "low"),
+    "bulk": ("high", "low", "low"),
+}
+# Throughput mode (see _InferenceEngine._generate_batched)
+BATCH_MAX = int(os.environ.get("TTS_BATCH_MAX", "8"))
+
+# Memory instrumentation (see MemoryMonitor)
+DEBUG_MEMORY = os.environ.get("TTS_DEBUG_MEMORY", "0") in ("1", "true", "yes")
+DEBUG_MEMORY_FRAMES = int(os.environ.get("TTS_DEBUG_MEMORY_FRAMES", "1"))
+DEBUG_MEMORY_INTERVAL = float(os.environ.get("TTS_DEBUG_MEMORY_INTERVAL", "10"))
+
+# Lightweight engine for short utterances (see KokoroBackend)
+KOKORO_MODEL = os.environ.get("TTS_KOKORO_MODEL", "")
+KOKORO_VOICES_FILE = os.environ.get("TTS_KOKORO_VOICES_FILE", "")
+KOKORO_VOICES = _parse_map(os.environ.get("TTS_KOKORO_VOICES", ""), str)
+KOKORO_LANG = os.environ.get("TTS_KOKORO_LANG", "en-us")
+ROUTE_MAX_CHARS = int(os.environ.get("TTS_ROUTE_MAX_CHARS", "60"))
+ROUTE_MAX_WORDS = int(os.environ.get("TTS_ROUTE_MAX_WORDS", "8"))
+
+RING_BYTES = int(float(os.environ.get("TTS_RING_MB", "16")) * 1024 * 1024)
+
+# Model load: converted weights live next to the HF downloads so they
+# survive container restarts
+WEIGHTS_CACHE = os.environ.get("TTS_WEIGHTS_CACHE", "/root/.cache/huggingface/hub/tts-server")
+VOICE_CACHE = os.environ.get("TTS_VOICE_CACHE", "/root/.cache/huggingface/hub/tts-server/voices")
+WARMUP = os.environ.get("TTS_WARMUP", "1") not in ("0", "false", "no")
+WARMUP_TEXT = "Warming up."
+
+# Stand-in model for benchmarks (see _StubEngine); None runs F5-TTS
+STUB_MODEL = (
+    {
+        "load": 0.0,
+        "first": 0.2,
+        "rtf": 0.1,
+        "cps": 15.0,
+        **_parse_map(os.environ["TTS_STUB_MODEL"], float),
+    }
+    if os.environ.get("TTS_STUB_MODEL", "") not in ("", "0", "false", "no")
+    else None
+)
+
+# F5-TTS output format (fixed by the vocoder)
+SAMPLE_RATE = 24000
+
+# Vocoder streaming chunk: default ~340ms, clients may negotiate within bounds
+DEFAULT_CHUNK_SAMPLES = 8192
+MIN_CHUNK_MS = 20
+MAX_CHUNK_MS = 2000
+
+# Output silence trimming (applied in the worker, before PCM conversion)
+SILENCE_TRIM = os.environ.get("TTS_SILENCE_TRIM", "1") not in ("0", "false", "no")
+SILENCE_THRESHOLD_DB = float(os.environ.get("TTS_SILENCE_THRESHOLD_DB", "-45"))
+SILENCE_PAD_MS = int(os.environ.get("TTS_SILENCE_PAD_MS", "40"))
+SILENCE_MAX_GAP_MS = int(os.environ.get("TTS_SILENCE_MAX_GAP_MS", "300"))
+
+# Resumable WebSocket sessions
+SESSION_TTL = float(os.environ.get("TTS_SESSION_TTL", "120"))
+SESSION_RETAIN_BYTES = int(
+    float(os.environ.get("TTS_SESSION_RETAIN_SECONDS", "120")) * SAMPLE_RATE * 2
+)
+
 # Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -85,6 +350,330 @@ CONTENT_TYPES = {
 }
 
 
+class Metrics:
+    """
+    Minimal Prometheus text-format registry.
+
+    The container only ships what F5-TTS needs, so rather than pip-install
+    prometheus_client at startup we keep the handful of counters, gauges
+    and histograms we export here. Thread-safe: executor threads and the
+    unload timer update it alongside the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._values: dict[tuple, float] = {}
+        self._hists: dict[tuple, list[float]] = {}
+
+    def counter(self, name: str, help_text: str):
+        self._meta[name] = ("counter", help_text)
+
+    def gauge(self, name: str, help_text: str):
+        self._meta[name] = ("gauge", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...]):
+        self._meta[name] = ("histogram", help_text)
+        self._buckets[name] = buckets
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self._buckets[name]
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            hist = self._hists.setdefault(key, [0.0] * (len(buckets) + 2))
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    @staticmethod
+    def _labels(pairs) -> str:
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind != "histogram":
+                    for (n, pairs), value in self._values.items():
+                        if n == name:
+                            lines.append(f"{name}{self._labels(pairs)} {value}")
+                    continue
+                for (n, pairs), hist in self._hists.items():
+                    if n != name:
+                        continue
+                    for bound, count in zip(self._buckets[name], hist):
+                        le = self._labels(pairs + (("le", bound),))
+                        lines.append(f"{name}_bucket{le} {count}")
+                    inf = self._labels(pairs + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{inf} {hist[-1]}")
+                    lines.append(f"{name}_sum{self._labels(pairs)} {hist[-2]}")
+                    lines.append(f"{name}_count{self._labels(pairs)} {hist[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.gauge("tts_queue_depth", "Requests waiting for a synthesis slot")
+metrics.gauge("tts_active_jobs", "Synthesis jobs currently running")
+metrics.counter("tts_admitted_total", "Requests granted a synthesis slot")
+metrics.counter("tts_shed_total", "Requests rejected by admission control")
+metrics.gauge("tts_model_loaded", "1 if the inference worker has the model loaded")
+metrics.counter("tts_worker_crashes_total", "Inference worker processes that died unexpectedly")
+metrics.gauge("tts_model_load_seconds", "Duration of each phase of the last model load")
+metrics.gauge("tts_model_tier", "1 for where the model currently lives: device, host or unloaded")
+metrics.counter("tts_warmups_total", "POST /v1/audio/warmup calls, by the model state they found")
+metrics.counter("tts_model_state_total", "F5-TTS requests and sessions, by the model state they found")
+metrics.histogram(
+    "tts_time_to_first_audio_seconds",
+    "Job start to first non-silent output sample, per job kind",
+    (0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+metrics.counter("tts_silence_trimmed_seconds_total", "Seconds of silence removed from output")
+metrics.histogram(
+    "tts_queue_wait_seconds",
+    "Time spent waiting for a synthesis slot",
+    (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+metrics.counter("tts_engine_requests_total", "HTTP speech requests by engine and routing reason")
+metrics.histogram(
+    "tts_engine_latency_seconds",
+    "HTTP request received to first audio byte / last audio byte, per engine",
+    (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+metrics.counter("tts_quality_total", "Synthesis jobs by quality used and priority")
+metrics.gauge("tts_ws_sessions", "WebSocket sessions held, attached or awaiting resume")
+metrics.counter("tts_ws_resumes_total", "WebSocket session resume attempts, by result")
+
+
+class Overloaded(Exception):
+    """Raised when admission control sheds a request."""
+
+    def __init__(self, reason: str, retry_after: float, status_code: int = 503):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.status_code = status_code
+
+    def http_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code,
+            detail=f"Server busy ({self.reason}), retry in {self.retry_after}s",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class Ticket:
+    """A request's place in the admission queue (and later, its slot)."""
+
+    def __init__(self, priority: str, client: str, deadline: float):
+        self.priority = priority
+        self.client = client
+        self.deadline = deadline
+        # Service time relative to a full-quality job, for the estimate
+        self.cost = 1.0
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.abandoned = False
+        self.future: Optional[asyncio.Future] = None
+
+
+class AdmissionController:
+    """
+    Bounded, priority-ordered work queue in front of the synthesis slots.
+
+    A request is shed up front (no queueing) when its client already has
+    too many jobs in flight, its priority's queue is full, or the
+    estimated wait exceeds its deadline. Queued requests that still miss
+    their deadline are shed when it expires. The estimate is the number
+    of jobs ahead of it times an EWMA of observed service time.
+
+    Lives on the event loop: acquire() and release() must be called from
+    async code, never from executor threads.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        slots: int,
+        per_client: int,
+        capacity: dict[str, int],
+        deadlines: dict[str, float],
+        service_estimate: float,
+    ):
+        self.slots = max(1, slots)
+        self.per_client = per_client
+        self.capacity = capacity
+        self.deadlines = deadlines
+        self.service_seconds = service_estimate
+        self.active = 0
+        self._waiters: list[tuple[int, int, Ticket]] = []
+        self._seq = itertools.count()
+        self._queued = {p: 0 for p in PRIORITIES}
+        self._clients: dict[str, int] = defaultdict(int)
+        self._update_gauges()
+
+    def estimate_wait(self, priority: str) -> float:
+        """Seconds until a new request at this priority would start."""
+        rank = PRIORITIES.index(priority)
+        ahead = self.active + sum(
+            1 for r, _, t in self._waiters if r <= rank and not t.abandoned
+        )
+        return max(0, ahead - self.slots + 1) * self.service_seconds / self.slots
+
+    def pressure(self, ticket: Ticket) -> float:
+        """
+        How close the work in the queue is to missing its deadlines.
+
+        The worst ratio, over the granted ticket and everything still
+        waiting, of time needed (queued so far, or still to wait if
+        every job ran at full quality) to deadline. 1.0 or more means
+        some deadline will be missed unless jobs get cheaper.
+        """
+        now = time.monotonic()
+        worst = (now - ticket.enqueued_at) / ticket.deadline
+        ahead = self.active
+        for _, _, waiter in sorted(self._waiters):
+            if waiter.abandoned:
+                continue
+            wait = max(0, ahead - self.slots + 1) * self.service_seconds / self.slots
+            left = waiter.deadline - (now - waiter.enqueued_at)
+            worst = max(worst, wait / left if left > 0 else math.inf)
+            ahead += 1
+        return worst
+
+    def _shed(self, priority: str, reason: str, retry_after: float, status_code: int = 503):
+        metrics.inc("tts_shed_total", priority=priority, reason=reason)
+        log.warning(f"Shedding {priority} request: {reason} (retry after {retry_after:.1f}s)")
+        raise Overloaded(reason, retry_after, status_code)
+
+    def _start(self, ticket: Ticket):
+        ticket.started_at = time.monotonic()
+        self.active += 1
+        metrics.inc("tts_admitted_total", priority=ticket.priority)
+        metrics.observe(
+            "tts_queue_wait_seconds",
+            ticket.started_at - ticket.enqueued_at,
+            priority=ticket.priority,
+        )
+
+    def _dispatch(self):
+        """Hand free slots to the most urgent live waiters."""
+        while self.active < self.slots and self._waiters:
+            _, _, ticket = heapq.heappop(self._waiters)
+            if ticket.abandoned:
+                continue
+            self._queued[ticket.priority] -= 1
+            self._start(ticket)
+            ticket.future.set_result(None)
+        self._update_gauges()
+
+    def _update_gauges(self):
+        metrics.set("tts_active_jobs", self.active)
+        for priority, depth in self._queued.items():
+            metrics.set("tts_queue_depth", depth, priority=priority)
+
+    async def acquire(
+        self,
+        priority: str,
+        client: str,
+        deadline: Optional[float] = None,
+    ) -> Ticket:
+        """Wait for a synthesis slot or raise Overloaded."""
+        deadline = deadline or self.deadlines[priority]
+
+        if self._clients[client] >= self.per_client:
+            self._shed(priority, "client_limit", self.service_seconds, status_code=429)
+
+        ticket = Ticket(priority, client, deadline)
+        if self.active < self.slots and not self._waiters:
+            self._clients[client] += 1
+            self._start(ticket)
+            self._update_gauges()
+            return ticket
+
+        if self._queued[priority] >= self.capacity.get(priority, 0):
+            self._shed(priority, "queue_full", self.estimate_wait(priority))
+        wait = self.estimate_wait(priority)
+        if wait > deadline:
+            self._shed(priority, "deadline", wait)
+
+        ticket.future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (PRIORITIES.index(priority), next(self._seq), ticket)
+        )
+        self._queued[priority] += 1
+        self._clients[client] += 1
+        self._update_gauges()
+
+        try:
+            await asyncio.wait_for(ticket.future, timeout=deadline)
+            return ticket
+        except asyncio.TimeoutError:
+            # On 3.12+ wait_for times out even if the slot was handed
+            # over in the same loop iteration; the grant stands
+            if ticket.started_at is not None:
+                return ticket
+            self._abandon(ticket)
+            self._shed(priority, "deadline", self.estimate_wait(priority))
+        except BaseException:
+            # Client went away while queued (or right after being granted)
+            if ticket.started_at is not None:
+                self.release(ticket)
+            else:
+                self._abandon(ticket)
+            raise
+
+    def _abandon(self, ticket: Ticket):
+        if ticket.abandoned or ticket.started_at is not None:
+            return
+        ticket.abandoned = True
+        self._queued[ticket.priority] -= 1
+        self._clients[ticket.client] -= 1
+        self._update_gauges()
+
+    def release(self, ticket: Ticket):
+        """Return a slot and fold the job's duration into the estimate."""
+        if ticket.started_at is None:
+            return
+        elapsed = (time.monotonic() - ticket.started_at) / ticket.cost
+        ticket.started_at = None
+        self.service_seconds += self.EWMA_ALPHA * (elapsed - self.service_seconds)
+        self.active -= 1
+        self._clients[ticket.client] -= 1
+        if self._clients[ticket.client] <= 0:
+            del self._clients[ticket.client]
+        self._dispatch()
+
+    def status(self) -> dict:
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "queued": dict(self._queued),
+            "capacity": self.capacity,
+            "deadlines": self.deadlines,
+            "per_client": self.per_client,
+            "service_estimate_s": round(self.service_seconds, 2),
+        }
+
+
 class SpeechRequest(BaseModel):
     """OpenAI-compatible speech synthesis request."""
 
@@ -94,96 +683,1585 @@ class SpeechRequest(BaseModel):
     response_format: str = Field(default="mp3", description="Output format")
     speed: float = Field(default=1.0, ge=0.25, le=4.0, description="Speed multiplier")
     stream: bool = Field(default=False, description="Stream audio chunks (pcm only)")
+    priority: Optional[str] = Field(
+        default=None,
+        description="interactive, normal or bulk (default: interactive if streaming, else normal)",
+    )
+    deadline: Optional[float] = Field(
+        default=None, gt=0, description="Max seconds to wait for a synthesis slot"
+    )
+    quality: Optional[str] = Field(
+        default=None,
+        description="high, medium, low or auto (default: TTS_QUALITY)",
+    )
+    engine: str = Field(
+        default="auto",
+        description="f5, kokoro or auto (short utterances to kokoro when it is enabled)",
+    )
+    batch: Optional[bool] = Field(
+        default=None,
+        description="Sample all text chunks in padded batches (non-streaming; default: TTS_BATCH_MAX > 1)",
+    )
+
+
+class PcmRing:
+    """
+    Single-producer/single-consumer ring of s16le PCM in shared memory.
+
+    Layout: two uint64 counters (total bytes written, total bytes
+    consumed) followed by `capacity` bytes of audio. Positions are
+    absolute byte counts; the offset into the data area is
+    position % capacity. The worker never writes a segment across the
+    wrap point, so every segment is one contiguous slice and the API
+    process can read it through a memoryview without copying.
+
+    Aligned 8-byte stores are atomic on the hosts we run on, and each
+    counter has exactly one writer process, so no cross-process lock is
+    needed. Segments may be released out of order by API threads (a
+    cancelled job's leftovers, say); the consumed counter only moves over
+    a contiguous run of released segments.
+    """
+
+    HEADER = 16
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self._owner = owner
+        self._counters = np.ndarray((2,), dtype=np.uint64, buffer=shm.buf[: self.HEADER])
+        self._data = shm.buf[self.HEADER : self.HEADER + capacity]
+        self._released: dict[int, int] = {}
+        self._release_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, capacity: int) -> "PcmRing":
+        capacity -= capacity % 2  # Keep every position sample-aligned
+        shm = shared_memory.SharedMemory(create=True, size=cls.HEADER + capacity)
+        ring = cls(shm, capacity, owner=True)
+        ring._counters[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> "PcmRing":
+        return cls(shared_memory.SharedMemory(name=name), capacity, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, pcm: np.ndarray, should_abort) -> list[tuple[int, int]]:
+        """
+        Copy PCM into the ring, blocking while it is full.
+
+        Returns the (start, end) positions written, one per contiguous
+        segment. Gives up early (returning what was written) if
+        should_abort() turns true while waiting for space.
+        """
+        data = memoryview(pcm).cast("B")
+        segments = []
+        pos = 0
+        while pos < len(data):
+            written = int(self._counters[0])
+            consumed = int(self._counters[1])
+            offset = written % self.capacity
+            n = min(
+                len(data) - pos,
+                self.capacity - (written - consumed),
+                self.capacity - offset,
+            )
+            if n <= 0:
+                if should_abort():
+                    break
+                time.sleep(0.002)
+                continue
+            self._data[offset : offset + n] = data[pos : pos + n]
+            self._counters[0] = written + n
+            segments.append((written, written + n))
+            pos += n
+        return segments
+
+    def view(self, start: int, end: int) -> memoryview:
+        """Zero-copy view of a segment previously returned by write()."""
+        offset = start % self.capacity
+        return self._data[offset : offset + (end - start)]
+
+    def release(self, start: int, end: int):
+        """Mark a segment as read, freeing it (and any run after it) for the writer."""
+        with self._release_lock:
+            consumed = int(self._counters[1])
+            if start < consumed:
+                return  # Stale segment from before a discard()
+            self._released[start] = end
+            while consumed in self._released:
+                consumed = self._released.pop(consumed)
+            self._counters[1] = consumed
+
+    def discard(self):
+        """Drop all unread data (used when a worker is replaced)."""
+        with self._release_lock:
+            self._released.clear()
+            self._counters[1] = self._counters[0]
+
+    def close(self):
+        self._counters = None
+        try:
+            self._data.release()
+            self.shm.close()
+        except BufferError:
+            # A consumer still holds a view; the mapping goes with the process
+            pass
+        if self._owner:
+            self.shm.unlink()
+
+
+class SilenceTrimmer:
+    """
+    Streaming, vectorized silence trimmer for float audio.
+
+    Audio is classified in 10ms frames by RMS against a dBFS threshold
+    (one numpy pass per chunk; the Python loop only walks runs of
+    frames). Leading silence is cut to lead_pad, trailing silence to pad
+    at finish(), and any pause in between longer than max_gap is
+    compacted by keeping its head and tail. Silence is held back until we
+    know what follows it, so output lags input by at most max_gap.
+    """
+
+    FRAME_MS = 10
+
+    def __init__(
+        self,
+        sr: int,
+        threshold_db: float,
+        max_gap_ms: int,
+        pad_ms: int,
+        lead_pad_ms: Optional[int] = None,
+    ):
+        self.frame = sr * self.FRAME_MS // 1000
+        self.threshold = 10 ** (threshold_db / 20)
+        self.max_gap = sr * max_gap_ms // 1000
+        self.pad = sr * pad_ms // 1000
+        self.lead_pad = self.pad if lead_pad_ms is None else sr * lead_pad_ms // 1000
+        self.started = False  # Seen any non-silent audio yet
+        self.trimmed = 0  # Samples dropped
+        self._carry = np.zeros(0, dtype=np.float32)  # Partial frame
+        self._silence = np.zeros(0, dtype=np.float32)  # Pending pause
+
+    def _hold(self, silence: np.ndarray):
+        """Add to the pending pause, keeping only what could still be emitted."""
+        pending = np.concatenate((self._silence, silence))
+        keep = self.max_gap if self.started else self.lead_pad
+        if len(pending) > keep:
+            self.trimmed += len(pending) - keep
+            head = keep // 2 if self.started else 0
+            pending = np.concatenate((pending[:head], pending[len(pending) - (keep - head):]))
+        self._silence = pending
+
+    def _sound(self, audio: np.ndarray) -> list[np.ndarray]:
+        out = [self._silence, audio] if len(self._silence) else [audio]
+        self._silence = self._silence[:0]
+        self.started = True
+        return out
+
+    def feed(self, chunk: np.ndarray) -> np.ndarray:
+        """Classify a chunk and return whatever can be emitted so far."""
+        audio = np.concatenate((self._carry, np.asarray(chunk, dtype=np.float32)))
+        usable = len(audio) - len(audio) % self.frame
+        self._carry = audio[usable:]
+        if usable == 0:
+            return audio[:0]
+
+        frames = audio[:usable].reshape(-1, self.frame)
+        loud = np.sqrt(np.mean(np.square(frames), axis=1)) >= self.threshold
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(loud)) + 1, [len(loud)]))
+
+        out = []
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            run = audio[a * self.frame : b * self.frame]
+            if loud[a]:
+                out.extend(self._sound(run))
+            else:
+                self._hold(run)
+        return np.concatenate(out) if out else audio[:0]
+
+    def finish(self) -> np.ndarray:
+        """Flush the partial frame and cut the trailing pause to pad."""
+        tail, self._carry = self._carry, self._carry[:0]
+        out = []
+        if len(tail) and np.sqrt(np.mean(np.square(tail))) >= self.threshold:
+            out.extend(self._sound(tail))
+        else:
+            self._hold(tail)
+        keep = self.pad if self.started else 0
+        out.append(self._silence[:keep])
+        self.trimmed += len(self._silence) - len(out[-1])
+        self._silence = self._silence[:0]
+        return np.concatenate(out)
+
+
+def cross_fade(waves: list[np.ndarray], samples: int) -> np.ndarray:
+    """Join chunk audio with linear crossfades, as F5-TTS's infer_batch_process does."""
+    out = waves[0]
+    for wave in waves[1:]:
+        n = min(samples, len(out), len(wave))
+        if n <= 0:
+            out = np.concatenate((out, wave))
+            continue
+        faded = out[-n:] * np.linspace(1, 0, n) + wave[:n] * np.linspace(0, 1, n)
+        out = np.concatenate((out[:-n], faded, wave[n:]))
+    return out
+
+
+def _rss_mb(pid: str = "self") -> Optional[float]:
+    """Resident set size from /proc, of this process or another (a worker)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _tracemalloc_top(top: int, previous: Optional[tracemalloc.Snapshot]):
+    """Top allocating lines now and growth since previous: (report, snapshot)."""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*"),
+    ))
+
+    def line(stat) -> dict:
+        frame = stat.traceback[0]
+        return {
+            "where": f"{frame.filename}:{frame.lineno}",
+            "kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+
+    report = {"top": [line(stat) for stat in snapshot.statistics("lineno")[:top]]}
+    if previous is not None:
+        report["growth"] = [
+            {**line(stat), "kb_diff": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+            for stat in snapshot.compare_to(previous, "lineno")[:top]
+        ]
+    return report, snapshot
+
+
+def _torch_memory() -> dict:
+    """Live tensors per device and CUDA allocator stats, in a process using torch."""
+    import torch
+
+    tensors = defaultdict(lambda: [0, 0])
+    for obj in gc.get_objects():
+        if torch.is_tensor(obj):
+            count_bytes = tensors[str(obj.device)]
+            count_bytes[0] += 1
+            count_bytes[1] += obj.element_size() * obj.nelement()
+    report = {
+        "tensors": {
+            device: {"count": count, "mb": round(size / 1024**2, 1)}
+            for device, (count, size) in tensors.items()
+        },
+    }
+    if torch.cuda.is_available():
+        stats = torch.cuda.memory_stats()
+        mb = lambda key: round(stats.get(key, 0) / 1024**2, 1)  # noqa: E731
+        report["cuda"] = {
+            "allocated_mb": mb("allocated_bytes.all.current"),
+            "reserved_mb": mb("reserved_bytes.all.current"),
+            "peak_allocated_mb": mb("allocated_bytes.all.peak"),
+            # Reserved but split into pieces too small to reuse
+            "inactive_split_mb": mb("inactive_split_bytes.all.current"),
+            "alloc_retries": stats.get("num_alloc_retries", 0),
+            "ooms": stats.get("num_ooms", 0),
+        }
+    return report
+
+
+class WorkerError(RuntimeError):
+    """The inference worker failed a job or died while running it."""
+
+
+def _configure_threads(settings: dict, wlog: logging.Logger):
+    """Pin cores and size torch's thread pools before any model code runs."""
+    if settings.get("cpus"):
+        os.sched_setaffinity(0, settings["cpus"])
+    threads = settings.get("threads")
+    if threads:
+        # OpenMP/MKL read these when torch first initializes them
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+        os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    if settings.get("interop_threads"):
+        # Only settable before the first inter-op parallel work
+        torch.set_num_interop_threads(settings["interop_threads"])
+    wlog.info(
+        f"torch threads: intra-op={torch.get_num_threads()} "
+        f"inter-op={torch.get_num_interop_threads()} "
+        f"cpus={sorted(os.sched_getaffinity(0))}"
+    )
+
+
+def _worker_main(cmd_queue, result_queue, ring_name: str, ring_capacity: int, settings: dict):
+    """
+    Inference worker process entry point.
+
+    Owns the F5-TTS model and is the only process that imports torch.
+    Jobs arrive on cmd_queue; PCM goes into the shared ring and
+    (job_id, start, end) notifications go back on result_queue. A
+    command reader thread lets cancels overtake the running job.
+    """
+    wlog = logging.getLogger("tts-worker")
+    if DEBUG_MEMORY:
+        tracemalloc.start(DEBUG_MEMORY_FRAMES)
+    if STUB_MODEL is None:
+        _configure_threads(settings, wlog)
+    ring = PcmRing.attach(ring_name, ring_capacity)
+    jobs: "queue.Queue[Optional[dict]]" = queue.Queue()
+    cancelled: set[int] = set()
+    snapshot = None
+
+    def memory_report(options: dict) -> dict:
+        nonlocal snapshot
+        report = {"pid": os.getpid(), "rss_mb": _rss_mb()}
+        try:
+            if "torch" in sys.modules:
+                report.update(_torch_memory())
+            if options.get("tracemalloc") and tracemalloc.is_tracing():
+                report["tracemalloc"], snapshot = _tracemalloc_top(options["top"], snapshot)
+        except Exception as e:
+            # e.g. torch still importing during a model load
+            report["error"] = repr(e)
+        return report
+
+    def read_commands():
+        while True:
+            kind, payload = cmd_queue.get()
+            if kind == "job":
+                jobs.put(payload)
+            elif kind in ("offload", "restore"):
+                # Queued behind running jobs, never under them
+                jobs.put({"kind": kind})
+            elif kind == "cancel":
+                cancelled.add(payload)
+            elif kind == "memory":
+                # Answered from this thread: read-only, and must not wait
+                # behind a long job
+                result_queue.put(("memory", None, memory_report(payload)))
+            elif kind == "shutdown":
+                jobs.put(None)
+                return
+
+    threading.Thread(target=read_commands, daemon=True).start()
+
+    engine_class = _InferenceEngine if STUB_MODEL is None else _StubEngine
+    engine = engine_class(ring, result_queue, wlog, settings.get("device"))
+    try:
+        engine.load()
+    except Exception as e:
+        wlog.exception("F5-TTS model load failed")
+        result_queue.put(("load_failed", None, str(e)))
+        ring.close()
+        return
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        if job["kind"] == "offload":
+            engine.offload()
+        elif job["kind"] == "restore":
+            engine.restore()
+        else:
+            engine.run(job, cancelled)
+    wlog.info("Inference worker exiting")
+    ring.close()
+
+
+class _InferenceEngine:
+    """Model state and job execution inside the worker process."""
+
+    def __init__(self, ring: PcmRing, result_queue, wlog: logging.Logger, device: Optional[str] = None):
+        self.ring = ring
+        self.results = result_queue
+        self.log = wlog
+        self.device = device
+        self.model = None
+        self.offloaded = False
+        self._refs: dict[tuple[str, float], tuple] = {}
+        # Throughput mode sizing: chunks per batch (halved on OOM), and
+        # peak bytes per mel frame seen so far (0 until measured)
+        self._batch_cap = BATCH_MAX
+        self._frame_bytes = 0.0
+        self.job_stats: dict = {}
+
+    def load(self):
+        phases = {}
+        start = phase = time.time()
+
+        def lap(name: str):
+            nonlocal phase
+            now = time.time()
+            phases[name] = round(now - phase, 2)
+            phase = now
+
+        self.log.info("Loading F5-TTS model...")
+        import torch
+        from f5_tts.api import F5TTS
+        lap("import")
+
+        device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+        cached = self._weights_path(device)
+        if cached is not None and cached.exists():
+            try:
+                # safetensors memory-maps the file and the tensors already
+                # have the dtype load_checkpoint wants; the local vocoder
+                # skips the HF Hub round trips
+                self.model = F5TTS(
+                    ckpt_file=str(cached),
+                    vocoder_local_path=self._vocoder_dir(),
+                    device=device,
+                )
+            except Exception as e:
+                self.log.warning(f"Cached weights {cached} unusable ({e}), reconverting")
+                cached.unlink(missing_ok=True)
+        if self.model is None:
+            self.model = F5TTS(device=device)
+        lap("load")
+
+        if cached is not None and not cached.exists():
+            self._save_weights(cached)
+            lap("convert")
+        if WARMUP:
+            self._warm_up()
+            lap("warmup")
+
+        elapsed = time.time() - start
+        if torch.cuda.is_available() and self.model.device != "cpu":
+            self.log.info(f"CUDA available: {torch.cuda.get_device_name()}")
+        self.log.info(
+            f"F5-TTS model loaded in {elapsed:.1f}s on {self.model.device} ("
+            + ", ".join(f"{name} {secs}s" for name, secs in phases.items())
+            + ")"
+        )
+        self.results.put(("loaded", None, {
+            "device": str(self.model.device),
+            "load_seconds": round(elapsed, 2),
+            "phases": phases,
+            "vram_gb": self._vram_gb(),
+        }))
+
+    @staticmethod
+    def _weights_path(device: str) -> Optional[Path]:
+        """Converted checkpoint for this f5-tts version and load dtype."""
+        if not WEIGHTS_CACHE:
+            return None
+        import importlib.metadata
+
+        import torch
+
+        # Same dtype choice as f5_tts load_checkpoint
+        half = device.startswith("cuda") and torch.cuda.get_device_properties(device).major >= 7
+        version = importlib.metadata.version("f5-tts")
+        return Path(WEIGHTS_CACHE) / f"f5-tts-{version}-{'fp16' if half else 'fp32'}.safetensors"
+
+    @staticmethod
+    def _vocoder_dir() -> Optional[str]:
+        from huggingface_hub import snapshot_download
+
+        try:
+            return snapshot_download("charactr/vocos-mel-24khz", local_files_only=True)
+        except Exception:
+            return None
+
+    def _save_weights(self, path: Path):
+        """Write the loaded EMA weights where the next load can mmap them."""
+        from safetensors.torch import save_file
+
+        # load_checkpoint strips this prefix again; copies on the host
+        # so no tensor shares storage with another
+        state = {
+            f"ema_model.{key}": value.detach().cpu().clone()
+            for key, value in self.model.ema_model.state_dict().items()
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        try:
+            save_file(state, str(tmp))
+            tmp.rename(path)
+            self.log.info(f"Saved converted weights to {path}")
+        except OSError as e:
+            self.log.warning(f"Could not save converted weights to {path}: {e}")
+            tmp.unlink(missing_ok=True)
+
+    def _warm_up(self):
+        """Short synthesis so kernel selection and allocator growth happen now."""
+        import torch
+
+        try:
+            ref_file, ref_text = get_voice_files(DEFAULT_VOICE)
+        except HTTPException:
+            self.log.info(f"No default voice '{DEFAULT_VOICE}', skipping warm-up")
+            return
+        job = {
+            "kind": "stream",
+            "ref_file": str(ref_file),
+            "ref_text": ref_text,
+            "text": WARMUP_TEXT,
+            "speed": 1.0,
+        }
+        with torch.inference_mode():
+            for _ in self._generate(job):
+                pass
+
+    def _move(self, device: str, tier: str):
+        import torch
+
+        before = {"rss_mb": _rss_mb(), **_torch_memory()} if DEBUG_MEMORY else None
+        start = time.time()
+        self.model.ema_model.to(device)
+        self.model.vocoder.to(device)
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        self.offloaded = tier == "host"
+        elapsed = round(time.time() - start, 2)
+        self.log.info(f"Model moved to {device} ({tier}) in {elapsed}s")
+        self.results.put(("tier", None, {
+            "tier": tier,
+            "seconds": elapsed,
+            "vram_gb": self._vram_gb(),
+            "memory": before and {"before": before, "after": {"rss_mb": _rss_mb(), **_torch_memory()}},
+        }))
+
+    def offload(self):
+        """Park the weights in host RAM, freeing VRAM but keeping the process warm."""
+        if self.model is not None and not self.offloaded and str(self.model.device) != "cpu":
+            self._move("cpu", "host")
+
+    def restore(self):
+        """Bring offloaded weights back to the inference device."""
+        if self.model is not None and self.offloaded:
+            self._move(self.model.device, "device")
+
+    @staticmethod
+    def _vram_gb() -> Optional[float]:
+        import torch
+
+        if torch.cuda.is_available():
+            return round(torch.cuda.memory_allocated() / 1024**3, 2)
+        return None
+
+    def _reference(self, ref_file: str, ref_text: str):
+        """Preprocessed reference audio plus chunking budget, cached per file."""
+        import torchaudio
+        from f5_tts.infer.utils_infer import preprocess_ref_audio_text
+
+        key = (ref_file, os.path.getmtime(ref_file))
+        if key not in self._refs:
+            # Preprocess reference audio (clips to ~12s, adds silence)
+            # Also processes ref_text (adds punctuation if needed)
+            ref_audio_processed, processed_text = preprocess_ref_audio_text(
+                ref_file, ref_text, show_info=lambda x: None
+            )
+            audio, sr = torchaudio.load(ref_audio_processed)
+
+            # Calculate chunk sizes based on reference audio duration
+            # Formula from F5-TTS socket_server.py
+            ref_duration = audio.shape[-1] / sr
+            ref_text_len = len(processed_text.encode("utf-8"))
+            max_chars = int(ref_text_len / ref_duration * (25 - ref_duration))
+            self._refs[key] = (audio, sr, processed_text, max_chars)
+        return self._refs[key]
+
+    def _generate(self, job: dict):
+        """Yield float audio chunks for a job."""
+        from f5_tts.infer.utils_infer import chunk_text, infer_batch_process
+
+        if job["kind"] == "batch":
+            yield from self._generate_batched(job)
+            return
+
+        if job["kind"] == "infer":
+            wav, _, _ = self.model.infer(
+                ref_file=job["ref_file"],
+                ref_text=job["ref_text"],
+                gen_text=job["text"],
+                speed=job["speed"],
+                nfe_step=job.get("nfe_step", QUALITY_STEPS["high"]),
+            )
+            yield wav
+            return
+
+        audio, sr, ref_text, max_chars = self._reference(job["ref_file"], job["ref_text"])
+        text_batches = chunk_text(job["text"], max_chars=max_chars)
+        self.log.info(f"Streaming {len(text_batches)} text chunks, max_chars={max_chars}")
+
+        audio_stream = infer_batch_process(
+            (audio, sr),
+            ref_text,
+            text_batches,
+            self.model.ema_model,
+            self.model.vocoder,
+            mel_spec_type=self.model.mel_spec_type,
+            progress=None,
+            device=self.model.device,
+            streaming=True,
+            chunk_size=job.get("chunk_size", DEFAULT_CHUNK_SAMPLES),
+            speed=job["speed"],
+            nfe_step=job.get("nfe_step", QUALITY_STEPS["high"]),
+        )
+        for audio_chunk, _ in audio_stream:
+            yield audio_chunk
+
+    def _generate_batched(self, job: dict):
+        """
+        Throughput mode: synthesize every text chunk of a job in padded batches.
+
+        model.infer runs chunk_text's chunks one after another, although
+        they share the reference conditioning. Here each batch goes
+        through one ema_model.sample call (the transformer masks the
+        padding), shortest chunks grouped together to keep padding low,
+        and the results are crossfaded in order as model.infer would.
+        Batches are capped by TTS_BATCH_MAX and, on CUDA, by free memory
+        at the peak bytes per mel frame measured on earlier batches; an
+        out-of-memory error halves the cap and retries.
+        """
+        import torch
+        import torchaudio
+        from f5_tts.infer.utils_infer import chunk_text, cross_fade_duration, hop_length, target_rms
+
+        audio, sr, ref_text, max_chars = self._reference(job["ref_file"], job["ref_text"])
+        chunks = chunk_text(job["text"], max_chars=max_chars)
+
+        # Reference conditioning as infer_batch_process prepares it
+        if audio.shape[0] > 1:
+            audio = torch.mean(audio, dim=0, keepdim=True)
+        rms = float(torch.sqrt(torch.mean(torch.square(audio))))
+        if rms < target_rms:
+            audio = audio * target_rms / rms
+        if sr != SAMPLE_RATE:
+            audio = torchaudio.transforms.Resample(sr, SAMPLE_RATE)(audio)
+        audio = audio.to(self.model.device)
+        ref_frames = audio.shape[-1] // hop_length
+        ref_bytes = len(ref_text.encode("utf-8"))
+
+        def frames(text: str) -> int:
+            # Duration estimate from infer_batch_process, including its
+            # slow-down for very short chunks
+            size = len(text.encode("utf-8"))
+            speed = 0.3 if size < 10 else job["speed"]
+            return ref_frames + int(ref_frames / ref_bytes * size / speed)
+
+        durations = [frames(text) for text in chunks]
+        order = sorted(range(len(chunks)), key=lambda i: durations[i])
+        waves: list = [None] * len(chunks)
+        sizes = []
+        pos = 0
+        while pos < len(order):
+            size = min(len(order) - pos, self._batch_cap)
+            longest = durations[order[pos + size - 1]]
+            if self._frame_bytes and str(audio.device).startswith("cuda"):
+                free, _ = torch.cuda.mem_get_info()
+                size = max(1, min(size, int(free * 0.8 / (self._frame_bytes * longest))))
+            group = order[pos:pos + size]
+            try:
+                generated = self._sample_batch(
+                    audio, ref_text, ref_frames,
+                    [chunks[i] for i in group], [durations[i] for i in group], job,
+                )
+            except torch.cuda.OutOfMemoryError:
+                torch.cuda.empty_cache()
+                if size == 1:
+                    raise
+                self._batch_cap = max(1, size // 2)
+                self.log.warning(f"Out of memory at batch size {size}, retrying at {self._batch_cap}")
+                continue
+            for i, wave in zip(group, generated):
+                waves[i] = wave * rms / target_rms if rms < target_rms else wave
+            sizes.append(size)
+            pos += size
+
+        self.log.info(f"Sampled {len(chunks)} text chunks in batches of {sizes}")
+        self.job_stats = {"chunks": len(chunks), "batches": len(sizes)}
+        yield cross_fade(waves, int(cross_fade_duration * SAMPLE_RATE))
+
+    def _sample_batch(self, audio, ref_text: str, ref_frames: int, texts: list[str], durations: list[int], job: dict):
+        """One ema_model.sample call over several chunks; float audio per chunk."""
+        import torch
+        from f5_tts.infer.utils_infer import cfg_strength, convert_char_to_pinyin, sway_sampling_coef
+
+        cuda = str(audio.device).startswith("cuda")
+        if cuda:
+            torch.cuda.reset_peak_memory_stats()
+            baseline = torch.cuda.memory_allocated()
+        generated, _ = self.model.ema_model.sample(
+            cond=audio.repeat(len(texts), 1),
+            text=convert_char_to_pinyin([ref_text + text for text in texts]),
+            duration=torch.tensor(durations, dtype=torch.long, device=audio.device),
+            steps=job.get("nfe_step", QUALITY_STEPS["high"]),
+            cfg_strength=cfg_strength,
+            sway_sampling_coef=sway_sampling_coef,
+        )
+        if cuda:
+            peak = (torch.cuda.max_memory_allocated() - baseline) / (len(texts) * max(durations))
+            self._frame_bytes = max(self._frame_bytes, peak)
+
+        waves = []
+        for row, duration in zip(generated.to(torch.float32), durations):
+            mel = row[ref_frames:duration, :].permute(1, 0).unsqueeze(0)
+            if self.model.mel_spec_type == "vocos":
+                wave = self.model.vocoder.decode(mel)
+            else:
+                wave = self.model.vocoder(mel)
+            waves.append(wave.squeeze().cpu().numpy())
+        return waves
+
+    def _write(self, job_id: int, audio: np.ndarray, aborted) -> int:
+        """Convert float audio to s16le in the ring and notify the API process."""
+        if len(audio) == 0:
+            return 0
+        pcm = np.int16(audio * 32767)
+        for start_pos, end_pos in self.ring.write(pcm, aborted):
+            self.results.put(("chunk", job_id, (start_pos, end_pos)))
+        return len(pcm)
+
+    @staticmethod
+    def _inference_mode():
+        import torch
+
+        return torch.inference_mode()
+
+    def run(self, job: dict, cancelled: set[int]):
+        job_id = job["id"]
+        aborted = lambda: job_id in cancelled  # noqa: E731
+        # The API restores before submitting; this covers a job that
+        # raced an offload
+        self.restore()
+        start = time.time()
+        samples = 0
+        first_audio = None
+        trimmer = None
+        self.job_stats = {}
+        if SILENCE_TRIM:
+            trimmer = SilenceTrimmer(
+                SAMPLE_RATE,
+                SILENCE_THRESHOLD_DB,
+                SILENCE_MAX_GAP_MS,
+                SILENCE_PAD_MS,
+                lead_pad_ms=job.get("lead_pad_ms"),
+            )
+        # Ratcheting normalizer: track max peak, only reduce gain (never
+        # increase). This prevents clipping without volume pumping. Sessions
+        # carry the peak across jobs so a whole session shares one gain.
+        peak_seen = job.get("peak", 1.0)
+        try:
+            # Every job runs on this process's main thread, so
+            # inference_mode is safe here (it isn't across thread pools).
+            with self._inference_mode():
+                for audio_chunk in self._generate(job):
+                    if aborted():
+                        break
+                    if len(audio_chunk) == 0:
+                        continue
+                    if job["kind"] == "stream":
+                        chunk_peak = float(np.abs(audio_chunk).max())
+                        if chunk_peak > peak_seen:
+                            peak_seen = chunk_peak
+                        if peak_seen > 1.0:
+                            audio_chunk = audio_chunk / peak_seen
+                    else:
+                        audio_chunk = np.clip(audio_chunk, -1.0, 1.0)
+                    if trimmer is not None:
+                        audio_chunk = trimmer.feed(audio_chunk)
+                    if first_audio is None and len(audio_chunk) and (
+                        trimmer is None or trimmer.started
+                    ):
+                        first_audio = time.time() - start
+                    samples += self._write(job_id, audio_chunk, aborted)
+                if trimmer is not None and not aborted():
+                    samples += self._write(job_id, trimmer.finish(), aborted)
+            elapsed = time.time() - start
+            self.results.put(("done", job_id, {
+                "peak": peak_seen,
+                "samples": samples,
+                "elapsed": round(elapsed, 3),
+                "first_audio_s": first_audio,
+                "trimmed_s": trimmer.trimmed / SAMPLE_RATE if trimmer else 0.0,
+                "vram_gb": self._vram_gb(),
+                **self.job_stats,
+            }))
+        except Exception as e:
+            self.log.exception(f"Job {job_id} failed")
+            self.results.put(("error", job_id, str(e)))
+        finally:
+            cancelled.discard(job_id)
+
+
+class _StubEngine(_InferenceEngine):
+    """
+    Deterministic stand-in for F5-TTS (TTS_STUB_MODEL).
+
+    Everything between the HTTP request and the model - admission,
+    worker processes, the PCM ring, silence trimming, keep-alive tiers,
+    streaming responses - runs as usual, so wyoming-bench.py can measure
+    the serving chain on a machine without torch, the weights or a GPU.
+    Each job produces len(text) / cps seconds of a 220 Hz tone (quiet,
+    but well above the silence threshold): the first chunk after `first`
+    seconds, the rest paced at `rtf` seconds per second of audio. Loading
+    takes `load` seconds; tier moves are instant.
+    """
+
+    def load(self):
+        self.log.info(f"Loading stub model ({STUB_MODEL})...")
+        time.sleep(STUB_MODEL["load"])
+        self.model = SimpleNamespace(device="stub")
+        self.results.put(("loaded", None, {
+            "device": "stub",
+            "load_seconds": STUB_MODEL["load"],
+            "phases": {},
+            "vram_gb": None,
+        }))
+
+    def _move(self, device: str, tier: str):
+        self.offloaded = tier == "host"
+        self.log.info(f"Stub model moved to {device} ({tier})")
+        self.results.put(("tier", None, {"tier": tier, "seconds": 0.0, "vram_gb": None, "memory": None}))
+
+    @staticmethod
+    def _vram_gb() -> Optional[float]:
+        return None
+
+    @staticmethod
+    def _inference_mode():
+        return nullcontext()
+
+    def _generate(self, job: dict):
+        seconds = len(job["text"]) / STUB_MODEL["cps"] / job["speed"]
+        total = max(1, int(seconds * SAMPLE_RATE))
+        tone = (0.3 * np.sin(2 * np.pi * 220 * np.arange(total) / SAMPLE_RATE)).astype(np.float32)
+        time.sleep(STUB_MODEL["first"])
+        if job["kind"] != "stream":
+            time.sleep(STUB_MODEL["rtf"] * seconds)
+            if job["kind"] == "batch":
+                self.job_stats = {"chunks": 1, "batches": 1}
+            yield tone
+            return
+        step = job.get("chunk_size", DEFAULT_CHUNK_SAMPLES)
+        for pos in range(0, total, step):
+            if pos:
+                time.sleep(STUB_MODEL["rtf"] * step / SAMPLE_RATE)
+            yield tone[pos:pos + step]
+
+
+class JobHandle:
+    """
+    API-side iterator over one job's PCM.
+
+    Yields zero-copy memoryviews into the worker's ring. A view is only
+    valid until the next iteration; the ring space is released as soon as
+    the consumer asks for the next chunk. Closing the iterator early
+    (client gone, hedged request cancelled) cancels the job in the worker
+    and releases the chunk the consumer was holding: the ring only frees
+    space up to the oldest unreleased segment, so one leaked chunk would
+    block the worker, and every job after it, for good.
+    """
+
+    def __init__(
+        self,
+        worker: "InferenceWorker",
+        job_id: int,
+        kind: str,
+        on_generated: Optional[Callable[[], None]] = None,
+    ):
+        self.worker = worker
+        self.job_id = job_id
+        self.kind = kind
+        # Called from the dispatcher thread once the worker has produced
+        # everything, which may be well before the consumer has read it
+        self.on_generated = on_generated
+        self.events: "queue.Queue[tuple]" = queue.Queue()
+        self.info: dict = {}
+        self.finished = False
+
+    def __iter__(self):
+        ring = self.worker.ring
+        # Segment handed to the consumer and not released yet
+        held: Optional[tuple[int, int]] = None
+        try:
+            while True:
+                kind, payload = self.events.get()
+                if kind == "chunk":
+                    held = payload
+                    yield ring.view(*held)
+                    ring.release(*held)
+                    held = None
+                elif kind == "done":
+                    self.info = payload
+                    self.finished = True
+                    if payload.get("first_audio_s") is not None:
+                        metrics.observe(
+                            "tts_time_to_first_audio_seconds",
+                            payload["first_audio_s"],
+                            kind=self.kind,
+                        )
+                    metrics.inc("tts_silence_trimmed_seconds_total", payload["trimmed_s"])
+                    return
+                else:
+                    self.finished = True
+                    raise WorkerError(payload)
+        finally:
+            if not self.finished:
+                self.worker.cancel(self)
+            if held is not None:
+                ring.release(*held)
+
+
+class InferenceWorker:
+    """
+    Supervisor for the out-of-process inference worker.
+
+    The model lives in a spawned child so inference, numpy conversion and
+    CUDA allocator state stay out of the API process and its GIL. Stopping
+    the worker returns every byte it allocated to the OS, which
+    gc.collect() + empty_cache() never fully did. If the worker dies
+    unexpectedly, its in-flight jobs fail with WorkerError and a
+    replacement is spawned (with backoff) so the model stays warm.
+    """
+
+    RESTART_BACKOFF_MAX = 60
+
+    def __init__(self, ring_bytes: int, index: int = 0, settings: Optional[dict] = None):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._ring_bytes = ring_bytes
+        self.index = index
+        self.settings = settings or {}
+        # Created on first start(): spawned workers re-import this module,
+        # and they must not each allocate a ring of their own
+        self.ring: Optional[PcmRing] = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: dict[int, JobHandle] = {}
+        self.process = None
+        self._cmd = None
+        self._stopping = False
+        self.loaded = False
+        self.info: dict = {}
+        self.restarts = 0
+        self._crashes: list[float] = []
+        # One /debug/memory round trip at a time
+        self._memory_lock = threading.Lock()
+        self._memory_ready = threading.Event()
+        self._memory_reply: Optional[dict] = None
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._jobs)
+
+    def active_jobs(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def start(self):
+        """Spawn the worker if it isn't running. Loading happens in the child."""
+        with self._lock:
+            if self.is_running():
+                return
+            if self.ring is None:
+                self.ring = PcmRing.create(self._ring_bytes)
+            self.ring.discard()
+            self._cmd = self._ctx.Queue()
+            results = self._ctx.Queue()
+            self.process = self._ctx.Process(
+                target=_worker_main,
+                args=(self._cmd, results, self.ring.name, self.ring.capacity, self.settings),
+                name=f"tts-worker-{self.index}",
+                daemon=True,
+            )
+            self._stopping = False
+            self.process.start()
+            log.info(f"Started inference worker {self.index} pid={self.process.pid}")
+            threading.Thread(
+                target=self._dispatch,
+                args=(self.process, results),
+                name=f"tts-worker-{self.index}-dispatch",
+                daemon=True,
+            ).start()
+
+    def submit(self, job: dict, on_generated: Optional[Callable[[], None]] = None) -> JobHandle:
+        """Queue a job on the worker, spawning it first if needed."""
+        self.start()
+        with self._lock:
+            job_id = next(self._ids)
+            handle = JobHandle(self, job_id, job["kind"], on_generated)
+            self._jobs[job_id] = handle
+            self._cmd.put(("job", {**job, "id": job_id}))
+        return handle
+
+    def offload(self):
+        """Ask the worker to move the model to host RAM once idle."""
+        with self._lock:
+            if self.is_running():
+                self._cmd.put(("offload", None))
+
+    def restore(self):
+        """Ask the worker to move the model back to the device."""
+        with self._lock:
+            if self.is_running():
+                self._cmd.put(("restore", None))
+
+    def memory_report(self, top: int = 15, trace: bool = False, timeout: float = 30.0) -> Optional[dict]:
+        """Ask the worker for its memory stats (see _torch_memory); None if not running."""
+        with self._memory_lock:
+            with self._lock:
+                if not self.is_running():
+                    return None
+                self._memory_ready.clear()
+                self._cmd.put(("memory", {"top": top, "tracemalloc": trace}))
+            if not self._memory_ready.wait(timeout):
+                return {"error": f"no reply in {timeout}s"}
+            return self._memory_reply
+
+    def cancel(self, handle: JobHandle):
+        """
+        Abandon a job: tell the worker and release the ring space of chunks
+        queued for it. Chunks the worker writes after this are released by
+        the dispatcher, which no longer finds the job; the one chunk the
+        consumer may be holding is released by JobHandle.
+        """
+        with self._lock:
+            if self._jobs.pop(handle.job_id, None) is not None and self.is_running():
+                self._cmd.put(("cancel", handle.job_id))
+            # Chunks that arrived before the cancel was recorded
+            while not handle.events.empty():
+                kind, payload = handle.events.get_nowait()
+                if kind == "chunk":
+                    self.ring.release(*payload)
+
+    def stop(self, timeout: float = 10.0):
+        """Shut the worker down, escalating to SIGTERM/SIGKILL if it hangs."""
+        with self._lock:
+            process = self.process
+            if process is None:
+                return
+            self._stopping = True
+            if process.is_alive():
+                self._cmd.put(("shutdown", None))
+        process.join(timeout)
+        if process.is_alive():
+            log.warning("Inference worker did not exit, terminating")
+            process.terminate()
+            process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        with self._lock:
+            if self.process is process:
+                self.process = None
+                self.loaded = False
+        self._fail_jobs("inference worker stopped")
+
+    def _fail_jobs(self, reason: str):
+        with self._lock:
+            jobs, self._jobs = self._jobs, {}
+            for handle in jobs.values():
+                # Undelivered chunks point into a ring the next worker reuses
+                while not handle.events.empty():
+                    handle.events.get_nowait()
+                handle.events.put(("error", reason))
+
+    def _dispatch(self, process, results):
+        """Route worker messages to job handles; detect worker death."""
+        while True:
+            try:
+                kind, job_id, payload = results.get(timeout=0.5)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                break
+            except (EOFError, OSError):
+                break
+
+            if kind == "loaded":
+                with self._lock:
+                    self.loaded = True
+                    self.info = payload
+                metrics.set("tts_model_loaded", 1, worker=str(self.index))
+                for phase, seconds in payload.get("phases", {}).items():
+                    metrics.set(
+                        "tts_model_load_seconds", seconds,
+                        phase=phase, worker=str(self.index),
+                    )
+                continue
+            if kind == "tier":
+                with self._lock:
+                    self.info["tier"] = payload["tier"]
+                    self.info["vram_gb"] = payload["vram_gb"]
+                if payload.get("memory"):
+                    memory_monitor.record(
+                        "offload" if payload["tier"] == "host" else "restore",
+                        worker=self.index,
+                        **payload["memory"],
+                    )
+                continue
+            if kind == "memory":
+                self._memory_reply = payload
+                self._memory_ready.set()
+                continue
+            if kind == "load_failed":
+                log.error(f"Inference worker failed to load model: {payload}")
+                self._stopping = True
+                self._fail_jobs(f"model load failed: {payload}")
+                continue
+
+            with self._lock:
+                handle = self._jobs.get(job_id)
+                if kind in ("done", "error"):
+                    self._jobs.pop(job_id, None)
+                if kind == "done" and payload.get("vram_gb") is not None:
+                    self.info["vram_gb"] = payload["vram_gb"]
+                if handle is not None:
+                    handle.events.put((kind, payload))
+                elif kind == "chunk":
+                    # Cancelled job: nobody will read this, free it now
+                    self.ring.release(*payload)
+            if handle is not None and kind in ("done", "error") and handle.on_generated:
+                handle.on_generated()
+
+        with self._lock:
+            if self.process is not process:
+                return
+            stopping = self._stopping
+            self.process = None
+            self.loaded = False
+        metrics.set("tts_model_loaded", 0, worker=str(self.index))
+        if stopping:
+            return
+
+        log.error(
+            f"Inference worker {self.index} pid={process.pid} died "
+            f"(exit code {process.exitcode})"
+        )
+        metrics.inc("tts_worker_crashes_total", worker=str(self.index))
+        self._fail_jobs(f"inference worker crashed (exit code {process.exitcode})")
+        self._restart_after_crash()
+
+    def _restart_after_crash(self):
+        now = time.monotonic()
+        self._crashes = [t for t in self._crashes if now - t < 300] + [now]
+        delay = min(2 ** (len(self._crashes) - 1), self.RESTART_BACKOFF_MAX)
+        log.info(f"Restarting inference worker {self.index} in {delay}s")
+
+        def restart():
+            # Don't resurrect a worker someone has since stopped or replaced
+            if self.process is None and not self._stopping:
+                self.restarts += 1
+                self.start()
+
+        timer = threading.Timer(delay, restart)
+        timer.daemon = True
+        timer.start()
+
+    def close(self):
+        self.stop()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def status(self) -> dict:
+        process = self.process
+        return {
+            "index": self.index,
+            "pid": process.pid if process else None,
+            "loaded": self.loaded,
+            "tier": self.info.get("tier", "device") if self.loaded else "unloaded",
+            "active_jobs": self.active_jobs(),
+            "restarts": self.restarts,
+            "cpus": self.settings.get("cpus"),
+        }
+
+
+class KeepAlivePolicy:
+    """
+    Where the model should live, given how long it has been idle.
+
+        device --keep_alive--> host --host_keep_alive--> unloaded
+
+    Both timeouts count from the last use, and any use brings the model
+    back to the device. A timeout of 0 disables that step (host=0 goes
+    straight from device to unloaded). move(tier) does the actual work
+    and is the policy's only side effect, so it can be driven on CPU
+    with a fake hook and clock:
+
+        moves, now = [], [0.0]
+        policy = KeepAlivePolicy(60, 600, moves.append, clock=lambda: now[0])
+        policy.touch(); now[0] = 61; policy.tick()   # moves == ["device", "host"]
+    """
+
+    def __init__(
+        self,
+        keep_alive: float,
+        host_keep_alive: float,
+        move: Callable[[str], None],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.keep_alive = keep_alive
+        # A host tier that ends before the device tier would never be used
+        self.host_keep_alive = host_keep_alive if host_keep_alive > keep_alive else 0
+        self.move = move
+        self.clock = clock
+        self.tier = "unloaded"
+        self.last_used: Optional[float] = None
+
+    def touch(self):
+        """Record a use; the model must be on the device afterwards."""
+        self.last_used = self.clock()
+        if self.tier != "device":
+            self.move("device")
+            self.tier = "device"
+
+    def force(self, tier: str):
+        """Move to tier now, whatever the timeouts say (debugging, soak tests)."""
+        if tier != self.tier:
+            self.move(tier)
+            self.tier = tier
+
+    def tick(self, busy: bool = False) -> Optional[float]:
+        """Apply the timeouts. Returns seconds until the next check, or None."""
+        if self.tier == "unloaded" or not self.keep_alive:
+            return None
+        if busy:
+            # A long stream is still running; look again later
+            return self.keep_alive
+        idle = self.clock() - self.last_used
+        if self.tier == "device" and idle >= self.keep_alive:
+            if self.host_keep_alive:
+                self.move("host")
+                self.tier = "host"
+            else:
+                self.move("unloaded")
+                self.tier = "unloaded"
+                return None
+        if self.tier == "host":
+            if idle >= self.host_keep_alive:
+                self.move("unloaded")
+                self.tier = "unloaded"
+                return None
+            return self.host_keep_alive - idle
+        return self.keep_alive - idle
 
 
 class F5TTSManager:
     """
     Manages F5-TTS model lifecycle with Ollama-style idle unloading.
 
-    The model is loaded lazily on first request and unloaded after
-    keep_alive seconds of inactivity to free GPU VRAM.
+    The model is loaded lazily on first request (by spawning the
+    inference workers). After keep_alive seconds of inactivity the
+    weights move to host RAM, which frees VRAM for other GPU users
+    while keeping the way back to seconds. After host_keep_alive the
+    workers are stopped, which frees GPU VRAM and host memory
+    completely. With more than one worker (CPU mode), each job goes to
+    the worker with the fewest jobs in flight.
     """
 
-    def __init__(self, keep_alive: int = 300):
+    def __init__(
+        self,
+        keep_alive: int = 300,
+        ring_bytes: int = 16 * 1024 * 1024,
+        pool: Optional[list[dict]] = None,
+        host_keep_alive: int = 0,
+    ):
         self.keep_alive = keep_alive
+        self.host_keep_alive = host_keep_alive
         self.last_used: float = 0
-        self.model = None
+        self.workers = [
+            InferenceWorker(ring_bytes, index, settings)
+            for index, settings in enumerate(pool or [{}])
+        ]
+        self.policy = KeepAlivePolicy(keep_alive, host_keep_alive, self._move)
         self._lock = threading.Lock()
         self._unload_timer: Optional[threading.Timer] = None
 
-    def _schedule_unload(self):
-        """Schedule model unload after keep_alive seconds."""
+    def _schedule_unload(self, delay: Optional[float] = None):
+        """Schedule the next keep-alive check (default: keep_alive seconds)."""
         if self._unload_timer:
             self._unload_timer.cancel()
 
-        if self.keep_alive > 0:
-            self._unload_timer = threading.Timer(self.keep_alive, self._check_unload)
+        delay = self.keep_alive if delay is None else delay
+        if delay > 0:
+            self._unload_timer = threading.Timer(delay, self._check_unload)
             self._unload_timer.daemon = True
             self._unload_timer.start()
 
     def _check_unload(self):
-        """Check if model should be unloaded due to inactivity."""
+        """Move the model down a tier if it has been idle long enough."""
         with self._lock:
-            if self.model and time.time() - self.last_used >= self.keep_alive:
-                log.info(f"Unloading F5-TTS model after {self.keep_alive}s of inactivity")
-                self._unload_model()
+            delay = self.policy.tick(busy=any(w.busy() for w in self.workers))
+            if delay is not None:
+                self._schedule_unload(delay)
+
+    def _move(self, tier: str):
+        """KeepAlivePolicy hook: put the model where the policy wants it."""
+        idle = round(time.time() - self.last_used) if self.last_used else 0
+        if tier == "host":
+            log.info(f"Offloading F5-TTS model to host RAM after {idle}s of inactivity")
+            for worker in self.workers:
+                worker.offload()
+        elif tier == "unloaded":
+            log.info(f"Unloading F5-TTS model after {idle}s of inactivity")
+            self._unload_model()
+        else:
+            for worker in self.workers:
+                worker.restore()
+        for name in ("device", "host", "unloaded"):
+            metrics.set("tts_model_tier", int(name == tier), tier=name)
 
     def _unload_model(self):
-        """Unload model and free GPU memory."""
-        if self.model:
-            del self.model
-            self.model = None
-            gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            log.info("F5-TTS model unloaded, GPU memory freed")
-
-    def get_model(self):
-        """Get or load the F5-TTS model."""
+        """Stop the inference workers, returning all of their memory."""
+        before = memory_monitor.snapshot(workers=True) if DEBUG_MEMORY else None
+        for worker in self.workers:
+            worker.stop()
+        log.info("F5-TTS workers stopped, GPU and host memory freed")
+        if before is not None:
+            memory_monitor.record("unload", before=before, after=memory_monitor.snapshot())
+
+    def force_tier(self, tier: str):
+        """Move the model to host RAM or unload it now (/debug/unload)."""
         with self._lock:
-            self.last_used = time.time()
-            self._schedule_unload()
-
-            if self.model is None:
-                log.info("Loading F5-TTS model...")
-                start = time.time()
-                from f5_tts.api import F5TTS
-                self.model = F5TTS()
-                elapsed = time.time() - start
-                log.info(f"F5-TTS model loaded in {elapsed:.1f}s on {self.model.device}")
+            self.policy.force(tier)
+
+    def _wake(self):
+        """Count a use: load or restore the model and restart the idle clock."""
+        self.last_used = time.time()
+        # Bring the whole pool up together so the second concurrent
+        # request doesn't pay a cold load of its own
+        for worker in self.workers:
+            worker.start()
+        self.policy.touch()
+        self._schedule_unload()
+
+    def state(self) -> str:
+        """warm (loaded on the device), loading, host or unloaded."""
+        tier = self.policy.tier
+        if tier == "device":
+            return "warm" if self.is_loaded() else "loading"
+        return tier
+
+    def warm(self) -> str:
+        """
+        Start loading or restoring the model without running a job, and
+        return the state it was found in. Loading happens in the worker,
+        so this returns at once; a request that follows queues behind
+        the load instead of starting it.
+        """
+        with self._lock:
+            state = self.state()
+            self._wake()
+            return state
 
-            return self.model
+    def submit(self, on_generated: Optional[Callable[[], None]] = None, **job) -> JobHandle:
+        """Run a job on the model, loading or restoring it first if necessary."""
+        with self._lock:
+            self._wake()
+            worker = min(
+                self.workers,
+                key=lambda w: (w.active_jobs(), not w.loaded, w.index),
+            )
+            return worker.submit(job, on_generated)
 
     def is_loaded(self) -> bool:
         """Check if model is currently loaded."""
-        with self._lock:
-            return self.model is not None
+        return any(w.loaded for w in self.workers)
+
+    def shutdown(self):
+        if self._unload_timer:
+            self._unload_timer.cancel()
+        for worker in self.workers:
+            worker.close()
 
     def status(self) -> dict:
         """Return current model status."""
         with self._lock:
             idle_time = time.time() - self.last_used if self.last_used else None
-            vram_used = None
-            if torch.cuda.is_available():
-                vram_used = round(torch.cuda.memory_allocated() / 1024**3, 2)
+            loaded = [w.info for w in self.workers if w.loaded]
+            vram = [info["vram_gb"] for info in loaded if info.get("vram_gb") is not None]
             return {
-                "loaded": self.model is not None,
+                "loaded": bool(loaded),
                 "last_used": self.last_used,
                 "idle_seconds": round(idle_time, 1) if idle_time else None,
                 "keep_alive": self.keep_alive,
-                "vram_gb": vram_used,
-                "device": str(self.model.device) if self.model else None,
+                "host_keep_alive": self.policy.host_keep_alive,
+                "tier": self.policy.tier,
+                "vram_gb": round(sum(vram), 2) if vram else None,
+                "device": loaded[0].get("device") if loaded else None,
+                "load_seconds": loaded[0].get("load_seconds") if loaded else None,
+                "load_phases": loaded[0].get("phases") if loaded else None,
+                "cpu_threads": CPU_THREADS,
+                "cpu_interop_threads": CPU_INTEROP_THREADS,
+                "worker_restarts": sum(w.restarts for w in self.workers),
+                "workers": [w.status() for w in self.workers],
             }
 
 
 # Global model manager
-model_manager = F5TTSManager(keep_alive=KEEP_ALIVE)
+model_manager = F5TTSManager(
+    keep_alive=KEEP_ALIVE,
+    ring_bytes=RING_BYTES,
+    pool=[worker_settings(i) for i in range(WORKERS)],
+    # On CPU the model already lives in host RAM
+    host_keep_alive=0 if CPU_MODE else HOST_KEEP_ALIVE,
+)
+
+# Global admission controller
+admission = AdmissionController(
+    slots=MAX_CONCURRENT,
+    per_client=MAX_PER_CLIENT,
+    capacity=QUEUE_CAPACITY,
+    deadlines=QUEUE_DEADLINE,
+    service_estimate=SERVICE_ESTIMATE,
+)
+
+
+class MemoryMonitor:
+    """
+    Memory history for /debug/memory (TTS_DEBUG_MEMORY=1).
+
+    Samples API and worker RSS every interval and records memory before
+    and after each offload and unload, so an unload -> reload cycle that
+    doesn't give memory back shows up as a trend rather than a guess.
+    Worker-side numbers (tensors, torch allocator, tracemalloc) come
+    from the worker itself over its command queue.
+    """
+
+    def __init__(self, interval: float, history: int = 360, events: int = 100):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=history)
+        self.events: deque = deque(maxlen=events)
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        def run():
+            while True:
+                self.samples.append({"t": round(time.time()), **self.snapshot()})
+                time.sleep(self.interval)
+
+        threading.Thread(target=run, name="memory-monitor", daemon=True).start()
+
+    def snapshot(self, workers: bool = False) -> dict:
+        """RSS of every process; with workers=True, also the workers' own reports."""
+        snap = {
+            "api_rss_mb": _rss_mb(),
+            "workers_rss_mb": {
+                w.index: _rss_mb(str(w.process.pid)) for w in model_manager.workers if w.process
+            },
+        }
+        if workers:
+            snap["workers"] = {w.index: w.memory_report(top=0) for w in model_manager.workers}
+        return snap
+
+    def record(self, kind: str, before: dict, after: dict, **extra):
+        self.events.append({"t": round(time.time()), "kind": kind, **extra, "before": before, "after": after})
+
+    def report(self, top: int, trace: bool) -> dict:
+        api = {
+            "rss_mb": _rss_mb(),
+            "rings_mb": round(sum(w.ring.capacity for w in model_manager.workers if w.ring) / 1024**2, 1),
+            "objects": Counter(type(obj).__name__ for obj in gc.get_objects()).most_common(top),
+        }
+        if trace and tracemalloc.is_tracing():
+            with self._lock:
+                api["tracemalloc"], self._snapshot = _tracemalloc_top(top, self._snapshot)
+        return {
+            "api": api,
+            "workers": [
+                {"index": w.index, **(w.memory_report(top, trace) or {"running": False})}
+                for w in model_manager.workers
+            ],
+            "history": list(self.samples),
+            "events": list(self.events),
+        }
+
+
+memory_monitor = MemoryMonitor(DEBUG_MEMORY_INTERVAL)
+
+
+def client_id(conn: HTTPConnection) -> str:
+    """Identify the caller for per-client limits (nginx sets X-Real-IP)."""
+    real_ip = conn.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+    return conn.client.host if conn.client else "unknown"
+
+
+def check_quality(quality: Optional[str]) -> str:
+    """Validate a requested quality, applying the server default."""
+    quality = quality or DEFAULT_QUALITY
+    if quality != "auto" and quality not in QUALITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported quality: {quality}. Supported: {[*QUALITIES, 'auto']}",
+        )
+    return quality
+
+
+def choose_quality(requested: str, ticket: Ticket) -> str:
+    """
+    Resolve quality=auto for a job that has just been granted a slot.
+
+    Under pressure (see AdmissionController.pressure), lower priorities
+    drop to fewer steps first; interactive work only drops when deadlines
+    are actually at risk. The ticket's cost is set so the service-time
+    estimate stays in full-quality units.
+    """
+    quality = requested
+    if quality == "auto":
+        pressure = admission.pressure(ticket)
+        band = 0 if pressure < 0.5 else 1 if pressure < 1.0 else 2
+        quality = AUTO_QUALITY[ticket.priority][band]
+        if quality != "high":
+            log.info(f"Auto quality: {quality} for {ticket.priority} work (pressure {pressure:.2f})")
+    ticket.cost = QUALITY_STEPS[quality] / QUALITY_STEPS["high"]
+    metrics.inc("tts_quality_total", quality=quality, priority=ticket.priority)
+    return quality
+
+
+def _voice_source(wav: Path, txt: Path) -> dict:
+    """Identify the reference files a cached clip was cut from (as tts-bench does)."""
+    return {
+        "wav": [wav.stat().st_size, wav.stat().st_mtime_ns],
+        "txt": [txt.stat().st_size, txt.stat().st_mtime_ns],
+    }
+
+
+def optimized_voice(voice: str) -> Optional[dict]:
+    """
+    The cached optimized clip's sidecar for a voice, if it is current.
+
+    `tts-bench.py voice` writes {voice}.wav/.txt/.json to TTS_VOICE_CACHE;
+    the sidecar records which reference files the clip was cut from, so
+    replacing a voice's .wav or .txt makes the server ignore the stale clip.
+    """
+    if not VOICE_CACHE:
+        return None
+    try:
+        meta = json.loads((Path(VOICE_CACHE) / f"{voice}.json").read_text())
+        source = _voice_source(VOICES_DIR / f"{voice}.wav", VOICES_DIR / f"{voice}.txt")
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("source") == source else None
 
 
 def get_voice_files(voice: str) -> tuple[Path, str]:
     """
     Get reference audio path and text for a voice.
 
+    Prefers the voice's optimized clip from TTS_VOICE_CACHE when it is
+    current (see optimized_voice).
+
     Returns:
         Tuple of (audio_path, reference_text)
     """
@@ -202,45 +2280,232 @@ def get_voice_files(voice: str) -> tuple[Path, str]:
             detail=f"Voice '{voice}' missing transcript. Missing: {text_path}",
         )
 
+    if optimized_voice(voice):
+        cache = Path(VOICE_CACHE)
+        try:
+            return cache / f"{voice}.wav", (cache / f"{voice}.txt").read_text().strip()
+        except OSError:
+            pass
+
     ref_text = text_path.read_text().strip()
     return audio_path, ref_text
 
 
+class F5Backend:
+    """F5-TTS in the inference worker pool (see F5TTSManager)."""
+
+    name = "f5"
+
+    def available(self) -> bool:
+        return True
+
+    def synthesize(
+        self,
+        text: str,
+        voice: str,
+        speed: float = 1.0,
+        quality: str = "high",
+        stream: bool = False,
+        batch: bool = False,
+        info: Optional[dict] = None,
+    ) -> Generator[bytes, None, None]:
+        """
+        Yield s16le PCM. Streaming jobs are generated chunk by chunk;
+        otherwise the whole text goes through model.infer at once, or with
+        batch=True through throughput mode. The job's stats end up in info.
+        """
+        ref_audio, ref_text = get_voice_files(voice)
+        job = model_manager.submit(
+            kind="stream" if stream else "batch" if batch else "infer",
+            ref_file=str(ref_audio),
+            ref_text=ref_text,
+            text=text,
+            speed=speed,
+            nfe_step=QUALITY_STEPS[quality],
+        )
+        for view in job:
+            # One copy, straight into the response body
+            yield bytes(view)
+        if job.info.get("trimmed_s"):
+            log.info(f"Trimmed {job.info['trimmed_s']:.2f}s silence")
+        if info is not None:
+            info.update(job.info)
+
+    def status(self) -> dict:
+        return model_manager.status()
+
+
+class KokoroBackend:
+    """
+    Kokoro-82M via kokoro-onnx, in the API process on CPU.
+
+    For "OK" or "Light turned off", F5-TTS's reference conditioning and a
+    trip through the worker pool cost more than the speech itself, and a
+    cold or offloaded F5 model costs seconds. Kokoro renders a short
+    sentence in tens of milliseconds on CPU. Loaded at startup and kept:
+    it is a few hundred MB of host RAM and no VRAM. Optional: without
+    kokoro-onnx or its model files everything routes to F5-TTS.
+    """
+
+    name = "kokoro"
+
+    def __init__(self, model_path: str, voices_path: str, voice_map: dict[str, str]):
+        self.model_path = model_path
+        self.voices_path = voices_path
+        self.voice_map = voice_map
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._model = None
+        # One synthesis at a time: onnxruntime already spreads a run over
+        # the cores, and these are short
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return bool(self.model_path) and self.error is None
+
+    def routes(self, voice: str) -> bool:
+        """Whether requests for this (F5) voice may be routed here."""
+        return voice in self.voice_map or "*" in self.voice_map
+
+    def load(self):
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        if self._model is not None or not self.available():
+            return
+        start = time.time()
+        try:
+            from kokoro_onnx import Kokoro
+
+            self._model = Kokoro(self.model_path, self.voices_path)
+        except Exception as e:
+            self.error = str(e)
+            log.warning(f"Kokoro engine unavailable, routing everything to F5-TTS: {e}")
+            return
+        self.load_seconds = round(time.time() - start, 2)
+        log.info(f"Kokoro engine loaded in {self.load_seconds}s")
+
+    def synthesize(
+        self,
+        text: str,
+        voice: str,
+        speed: float = 1.0,
+        quality: str = "high",
+        stream: bool = False,
+        batch: bool = False,
+        info: Optional[dict] = None,
+    ) -> Generator[bytes, None, None]:
+        """Yield s16le PCM. One piece: these utterances are a sentence at most."""
+        kokoro_voice = self.voice_map.get(voice, self.voice_map.get("*", voice))
+        with self._lock:
+            self._load()
+            if self._model is None:
+                raise HTTPException(status_code=503, detail=f"Kokoro engine unavailable: {self.error}")
+            samples, sr = self._model.create(text, voice=kokoro_voice, speed=speed, lang=KOKORO_LANG)
+        if sr != SAMPLE_RATE:
+            raise RuntimeError(f"Kokoro returned {sr} Hz audio, expected {SAMPLE_RATE}")
+
+        audio = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+        if SILENCE_TRIM:
+            trimmer = SilenceTrimmer(SAMPLE_RATE, SILENCE_THRESHOLD_DB, SILENCE_MAX_GAP_MS, SILENCE_PAD_MS)
+            audio = np.concatenate((trimmer.feed(audio), trimmer.finish()))
+        yield np.int16(audio * 32767).tobytes()
+
+    def status(self) -> dict:
+        return {
+            "enabled": bool(self.model_path),
+            "loaded": self._model is not None,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+            "voices": self.voice_map,
+        }
+
+
+engines = {
+    "f5": F5Backend(),
+    "kokoro": KokoroBackend(KOKORO_MODEL, KOKORO_VOICES_FILE, KOKORO_VOICES),
+}
+
+
+def route_engine(text: str, voice: str, requested: str):
+    """
+    Pick the engine for an HTTP request: (backend, reason).
+
+    auto sends short single-sentence utterances for mapped voices to
+    Kokoro and everything else to F5-TTS; tts_engine_latency_seconds
+    shows whether that pays off.
+    """
+    if requested not in ("auto", *engines):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported engine: {requested}. Supported: {['auto', *engines]}",
+        )
+    kokoro = engines["kokoro"]
+    if requested != "auto":
+        if not engines[requested].available():
+            raise HTTPException(status_code=400, detail=f"Engine '{requested}' is not enabled")
+        if requested == "kokoro" and not kokoro.routes(voice):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Voice '{voice}' has no Kokoro voice (see TTS_KOKORO_VOICES)",
+            )
+        return engines[requested], "requested"
+    if not kokoro.available() or not kokoro.routes(voice):
+        return engines["f5"], "default"
+    stripped = text.strip()
+    short = (
+        len(stripped) <= ROUTE_MAX_CHARS
+        and len(stripped.split()) <= ROUTE_MAX_WORDS
+        and not StreamingSession.SENTENCE_END.search(stripped.rstrip(".!?"))
+    )
+    return (kokoro, "short") if short else (engines["f5"], "long")
+
+
 def synthesize_speech(
     text: str,
     voice: str,
     output_format: str = "mp3",
     speed: float = 1.0,
+    quality: str = "high",
+    backend=engines["f5"],
+    batch: bool = False,
+    info: Optional[dict] = None,
 ) -> bytes:
     """
-    Synthesize speech using F5-TTS.
+    Synthesize speech and encode it.
 
     Args:
         text: Text to synthesize
         voice: Voice name (maps to reference audio/text)
         output_format: Output format (mp3, wav, opus, flac)
         speed: Speech rate multiplier
+        quality: high, medium or low (NFE steps, see QUALITY_STEPS)
+        backend: Engine to synthesize with (see route_engine)
+        batch: Use throughput mode (F5-TTS)
+        info: Filled with the job's stats (chunks, batches, ...)
 
     Returns:
         Audio data as bytes
     """
-    ref_audio, ref_text = get_voice_files(voice)
-    model = model_manager.get_model()
-
-    log.info(f"Synthesizing {len(text)} chars with voice '{voice}'")
+    log.info(
+        f"Synthesizing {len(text)} chars with voice '{voice}' on {backend.name}"
+        + (f" at {quality} quality" if backend.name == "f5" else "")
+    )
     start = time.time()
 
-    # Generate speech
-    wav, sr, _ = model.infer(
-        ref_file=str(ref_audio),
-        ref_text=ref_text,
-        gen_text=text,
-        speed=speed,
-    )
+    pcm = bytearray()
+    for chunk in backend.synthesize(text, voice, speed, quality, batch=batch, info=info):
+        pcm += chunk
+    wav = np.frombuffer(pcm, dtype=np.int16)
+    sr = SAMPLE_RATE
 
     elapsed = time.time() - start
     duration = len(wav) / sr
-    log.info(f"Generated {duration:.1f}s audio in {elapsed:.2f}s (RTF: {elapsed/duration:.3f})")
+    log.info(
+        f"Generated {duration:.1f}s audio in {elapsed:.2f}s "
+        f"(RTF: {elapsed / duration if duration else 0:.3f})"
+    )
 
     # Convert to requested format
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
@@ -280,89 +2545,91 @@ def synthesize_speech_streaming(
     text: str,
     voice: str,
     speed: float = 1.0,
+    quality: str = "high",
+    backend=engines["f5"],
 ) -> Generator[bytes, None, None]:
     """
-    Synthesize speech using F5-TTS with streaming output.
+    Synthesize speech with streaming output.
 
     Yields raw PCM chunks (16-bit signed, mono, 24kHz) as they're generated.
     """
-    from f5_tts.infer.utils_infer import (
-        chunk_text,
-        infer_batch_process,
-        preprocess_ref_audio_text,
-    )
-
-    ref_audio_path, ref_text_orig = get_voice_files(voice)
-    model = model_manager.get_model()
-
-    log.info(f"Streaming synthesis: {len(text)} chars with voice '{voice}'")
-
-    # Preprocess reference audio (clips to ~12s, adds silence)
-    # Also processes ref_text (adds punctuation if needed)
-    ref_audio_processed, ref_text = preprocess_ref_audio_text(
-        str(ref_audio_path), ref_text_orig, show_info=lambda x: None
+    log.info(
+        f"Streaming synthesis: {len(text)} chars with voice '{voice}' on {backend.name}"
+        + (f" at {quality} quality" if backend.name == "f5" else "")
     )
-    audio, sr = torchaudio.load(ref_audio_processed)
-
-    # Calculate chunk sizes based on reference audio duration
-    # Formula from F5-TTS socket_server.py
-    ref_duration = audio.shape[-1] / sr
-    ref_text_len = len(ref_text.encode("utf-8"))
-    max_chars = int(ref_text_len / ref_duration * (25 - ref_duration))
-
-    # Chunk the input text
-    text_batches = chunk_text(text, max_chars=max_chars)
+    yield from backend.synthesize(text, voice, speed, quality, stream=True)
 
-    log.info(f"Streaming {len(text_batches)} text chunks, max_chars={max_chars}")
 
-    # Must use no_grad context for streaming in thread pool
-    # (inference_mode doesn't work across thread boundaries)
-    with torch.no_grad():
-        # Stream audio chunks
-        audio_stream = infer_batch_process(
-            (audio, sr),
-            ref_text,
-            text_batches,
-            model.ema_model,
-            model.vocoder,
-            mel_spec_type=model.mel_spec_type,
-            progress=None,
-            device=model.device,
-            streaming=True,
-            chunk_size=8192,  # ~340ms chunks for smoother playback
-            speed=speed,
-        )
+async def iterate_closing(chunks: Generator[bytes, None, None]):
+    """
+    Iterate a synthesis generator in the thread pool, closing it when the
+    consumer stops. Starlette's iterate_in_threadpool leaves an abandoned
+    generator to the garbage collector, and until it runs the job keeps
+    its chunk in the worker's ring (see JobHandle). Closing needs the
+    generator suspended, so after a cancel that lands while a thread is
+    inside next(), it's closed when that call returns.
+    """
+    loop = asyncio.get_running_loop()
+    pending = None
+    try:
+        while True:
+            # Shielded: cancelling us must not mark the call done while
+            # the thread is still running it
+            pending = loop.run_in_executor(None, next, chunks, None)
+            chunk = await asyncio.shield(pending)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        if pending is not None and not pending.done():
+            pending.add_done_callback(lambda _: chunks.close())
+        else:
+            chunks.close()
 
-        # Ratcheting normalizer: track max peak, only reduce gain (never increase)
-        # This prevents clipping without volume pumping
-        peak_seen = 1.0
 
-        for audio_chunk, _ in audio_stream:
-            if len(audio_chunk) > 0:
-                # Update peak tracker (ratchet up only)
-                chunk_peak = np.abs(audio_chunk).max()
-                if chunk_peak > peak_seen:
-                    peak_seen = chunk_peak
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that closes its body iterator when the client goes.
 
-                # Apply gain reduction based on worst peak seen
-                if peak_seen > 1.0:
-                    audio_chunk = audio_chunk / peak_seen
+    Starlette stops iterating on a disconnect but leaves the suspended
+    async generator to the garbage collector, and with it the synthesis
+    generator underneath (see iterate_closing).
+    """
 
-                pcm = np.int16(audio_chunk * 32767)
-                yield pcm.tobytes()
+    async def stream_response(self, send):
+        try:
+            await super().stream_response(send)
+        finally:
+            await self.body_iterator.aclose()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     log.info(f"TTS server starting on {HOST}:{PORT}")
-    log.info(f"Keep-alive timeout: {KEEP_ALIVE}s")
+    log.info(f"Keep-alive: {KEEP_ALIVE}s on device, {HOST_KEEP_ALIVE}s until unload")
     log.info(f"Default voice: {DEFAULT_VOICE}")
     log.info(f"Voices directory: {VOICES_DIR}")
-    if torch.cuda.is_available():
-        log.info(f"CUDA available: {torch.cuda.get_device_name()}")
+    log.info(
+        f"Inference: device={DEVICE} workers={WORKERS} "
+        f"threads={CPU_THREADS or 'default'} interop={CPU_INTEROP_THREADS or 'default'} "
+        f"affinity={'on' if CPU_AFFINITY else 'off'}"
+    )
+    log.info(f"PCM ring: {RING_BYTES // 1024 // 1024} MiB shared memory per worker")
+    if engines["kokoro"].available():
+        log.info(
+            f"Kokoro engine for utterances up to {ROUTE_MAX_CHARS} chars / "
+            f"{ROUTE_MAX_WORDS} words, voices {KOKORO_VOICES}"
+        )
+        # Loading is the cold start we route to Kokoro to avoid
+        asyncio.get_running_loop().run_in_executor(None, engines["kokoro"].load)
+    if DEBUG_MEMORY:
+        log.warning("Memory debugging on: /debug/memory and /debug/unload, tracemalloc tracing")
+        tracemalloc.start(DEBUG_MEMORY_FRAMES)
+        memory_monitor.start()
     yield
     log.info("TTS server shutting down")
+    model_manager.shutdown()
 
 
 app = FastAPI(
@@ -374,58 +2641,208 @@ app = FastAPI(
 
 
 @app.post("/v1/audio/speech")
-async def create_speech(request: SpeechRequest) -> Response:
+async def create_speech(request: SpeechRequest, http_request: Request) -> Response:
     """Generate speech from text (OpenAI-compatible endpoint)."""
+    received = time.monotonic()
     if not request.input.strip():
         raise HTTPException(status_code=400, detail="Input text cannot be empty")
 
+    priority = request.priority or ("interactive" if request.stream else "normal")
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported priority: {priority}. Supported: {list(PRIORITIES)}",
+        )
+
+    # Validate before queueing so bad requests don't hold a slot
+    requested_quality = check_quality(request.quality)
+    if not request.stream and request.response_format not in CONTENT_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format: {request.response_format}. "
+            f"Supported: {list(CONTENT_TYPES.keys())}",
+        )
+
+    backend, reason = route_engine(request.input, request.voice, request.engine)
+    metrics.inc("tts_engine_requests_total", engine=backend.name, reason=reason)
+    engine_headers = {"X-TTS-Engine": backend.name}
+    if backend.name == "f5":
+        # Before admission: a queued request finds the model as it was
+        model_state = model_manager.state()
+        metrics.inc("tts_model_state_total", state=model_state)
+        engine_headers["X-TTS-Model-State"] = model_state
+
+    # Admission control meters the F5-TTS workers; Kokoro runs beside them
+    ticket = None
+    quality = "high"
+    if backend.name == "f5":
+        try:
+            ticket = await admission.acquire(
+                priority, client_id(http_request), request.deadline
+            )
+        except Overloaded as e:
+            raise e.http_exception()
+        quality = choose_quality(requested_quality, ticket)
+        engine_headers["X-TTS-Quality"] = quality
+        engine_headers["X-TTS-NFE-Steps"] = str(QUALITY_STEPS[quality])
+
     # Streaming mode - return raw PCM chunks
     if request.stream:
-        def generate():
-            yield from synthesize_speech_streaming(
-                request.input,
-                request.voice,
-                request.speed,
+        async def generate():
+            # The slot is held until the stream finishes or the client leaves
+            first = True
+            chunks = iterate_closing(
+                synthesize_speech_streaming(
+                    request.input,
+                    request.voice,
+                    request.speed,
+                    quality,
+                    backend,
+                )
             )
-
-        return StreamingResponse(
+            try:
+                async for chunk in chunks:
+                    if first:
+                        metrics.observe(
+                            "tts_engine_latency_seconds",
+                            time.monotonic() - received,
+                            engine=backend.name,
+                            stage="first_audio",
+                        )
+                        first = False
+                    yield chunk
+                metrics.observe(
+                    "tts_engine_latency_seconds",
+                    time.monotonic() - received,
+                    engine=backend.name,
+                    stage="total",
+                )
+            finally:
+                await chunks.aclose()
+                if ticket is not None:
+                    admission.release(ticket)
+
+        return ClosingStreamingResponse(
             generate(),
             media_type="audio/pcm",
             headers={
                 "X-Audio-Sample-Rate": "24000",
                 "X-Audio-Channels": "1",
                 "X-Audio-Format": "s16le",
+                **engine_headers,
             },
         )
 
     # Non-streaming mode
-    if request.response_format not in CONTENT_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported format: {request.response_format}. "
-            f"Supported: {list(CONTENT_TYPES.keys())}",
-        )
-
-    import asyncio
     loop = asyncio.get_event_loop()
-    audio_data = await loop.run_in_executor(
-        None,
-        synthesize_speech,
-        request.input,
-        request.voice,
-        request.response_format,
-        request.speed,
-    )
+    batch = BATCH_MAX > 1 if request.batch is None else request.batch
+    info: dict = {}
+    try:
+        audio_data = await loop.run_in_executor(
+            None,
+            synthesize_speech,
+            request.input,
+            request.voice,
+            request.response_format,
+            request.speed,
+            quality,
+            backend,
+            batch,
+            info,
+        )
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
+    if "batches" in info:
+        engine_headers["X-TTS-Chunks"] = str(info["chunks"])
+        engine_headers["X-TTS-Batches"] = str(info["batches"])
+    # Encoded responses arrive all at once: first audio is the whole thing
+    for stage in ("first_audio", "total"):
+        metrics.observe(
+            "tts_engine_latency_seconds",
+            time.monotonic() - received,
+            engine=backend.name,
+            stage=stage,
+        )
 
     return Response(
         content=audio_data,
         media_type=CONTENT_TYPES[request.response_format],
         headers={
-            "Content-Disposition": f'attachment; filename="speech.{request.response_format}"'
+            "Content-Disposition": f'attachment; filename="speech.{request.response_format}"',
+            **engine_headers,
         },
     )
 
 
+class FlowController:
+    """
+    Paces WebSocket audio against the client's playback buffer.
+
+    Clients that opt in send {"type": "ack", "buffered_ms": N} reports.
+    Between reports the buffer is extrapolated: it grows by what we send
+    and drains in real time. Above target_buffer_ms the sender waits;
+    below low_water_ms the client is close to an underrun, so pacing is
+    off and the next sentence is generated in the smallest chunks. With
+    target_buffer_ms=0 (the default) audio goes out as fast as it is
+    made, which suits bulk readers.
+    """
+
+    def __init__(self, chunk_ms: Optional[int] = None):
+        self.chunk_samples = DEFAULT_CHUNK_SAMPLES
+        self.target_buffer_ms = 0.0
+        self.low_water_ms = 200.0
+        self._reported_ms: Optional[float] = None
+        self._reported_at = 0.0
+        self._sent_ms = 0.0
+        if chunk_ms:
+            self.configure({"chunk_ms": chunk_ms})
+
+    def configure(self, msg: dict) -> dict:
+        """Apply a client config message; returns the effective settings."""
+        if msg.get("chunk_ms"):
+            chunk_ms = min(max(float(msg["chunk_ms"]), MIN_CHUNK_MS), MAX_CHUNK_MS)
+            self.chunk_samples = int(SAMPLE_RATE * chunk_ms / 1000)
+        if "target_buffer_ms" in msg:
+            self.target_buffer_ms = max(0.0, float(msg["target_buffer_ms"]))
+        if "low_water_ms" in msg:
+            self.low_water_ms = max(0.0, float(msg["low_water_ms"]))
+        return {
+            "chunk_ms": round(self.chunk_samples * 1000 / SAMPLE_RATE),
+            "target_buffer_ms": self.target_buffer_ms,
+            "low_water_ms": self.low_water_ms,
+        }
+
+    def ack(self, buffered_ms: float):
+        self._reported_ms = max(0.0, float(buffered_ms))
+        self._reported_at = time.monotonic()
+        self._sent_ms = 0.0
+
+    def sent(self, nbytes: int):
+        self._sent_ms += nbytes / 2 / SAMPLE_RATE * 1000
+
+    def buffered_ms(self) -> Optional[float]:
+        """Estimated client buffer now, or None before the first ack."""
+        if self._reported_ms is None:
+            return None
+        drained = (time.monotonic() - self._reported_at) * 1000
+        return max(0.0, self._reported_ms + self._sent_ms - drained)
+
+    def delay(self) -> float:
+        """Seconds to hold the next chunk so the buffer settles at target."""
+        buffered = self.buffered_ms()
+        if not self.target_buffer_ms or buffered is None:
+            return 0.0
+        return max(0.0, buffered - self.target_buffer_ms) / 1000
+
+    def next_chunk_samples(self) -> int:
+        """Vocoder chunk size for the next sentence."""
+        buffered = self.buffered_ms()
+        if buffered is not None and buffered < self.low_water_ms:
+            return int(SAMPLE_RATE * MIN_CHUNK_MS / 1000)
+        return self.chunk_samples
+
+
 class StreamingSession:
     """
     Manages a WebSocket TTS streaming session.
@@ -444,28 +2861,32 @@ class StreamingSession:
     # Line boundary: newline
     LINE_END = re.compile(r'\n')
 
-    def __init__(self, voice: str, speed: float = 1.0, line_mode: bool = False):
+    def __init__(
+        self,
+        voice: str,
+        speed: float = 1.0,
+        line_mode: bool = False,
+        flow: Optional[FlowController] = None,
+        control: bool = False,
+        quality: Optional[str] = None,
+    ):
         self.voice = voice
         self.speed = speed
         self.line_mode = line_mode
+        self.flow = flow or FlowController()
+        self.control = control
+        self.quality = check_quality(quality)
+        self.quality_used = {q: 0 for q in QUALITIES}
         self.buffer = ""
         self.peak_seen = 1.0  # Ratcheting normalizer state
+        self.sentences = 0
 
-        # Preload reference audio for the session
-        from f5_tts.infer.utils_infer import preprocess_ref_audio_text
-
-        ref_audio_path, ref_text_orig = get_voice_files(voice)
-        self.ref_audio_processed, self.ref_text = preprocess_ref_audio_text(
-            str(ref_audio_path), ref_text_orig, show_info=lambda x: None
-        )
-        self.audio, self.sr = torchaudio.load(self.ref_audio_processed)
-
-        # Calculate max chars for chunking
-        ref_duration = self.audio.shape[-1] / self.sr
-        ref_text_len = len(self.ref_text.encode("utf-8"))
-        self.max_chars = int(ref_text_len / ref_duration * (25 - ref_duration))
+        # Resolve the reference up front so a bad voice fails the session
+        # immediately; the worker preprocesses and caches it on first use
+        ref_audio_path, self.ref_text = get_voice_files(voice)
+        self.ref_file = str(ref_audio_path)
 
-        log.info(f"WebSocket session started: voice={voice}, max_chars={self.max_chars}")
+        log.info(f"WebSocket session started: voice={voice}")
 
     def add_text(self, text: str) -> list[str]:
         """
@@ -500,42 +2921,203 @@ class StreamingSession:
         self.buffer = ""
         return [remaining] if remaining else []
 
-    def synthesize(self, text: str) -> Generator[bytes, None, None]:
+    def synthesize(
+        self,
+        text: str,
+        on_generated: Optional[Callable[[], None]] = None,
+        quality: str = "high",
+    ) -> Generator[bytes, None, None]:
         """Synthesize a sentence and yield PCM chunks."""
-        from f5_tts.infer.utils_infer import chunk_text, infer_batch_process
+        chunk_size = self.flow.next_chunk_samples()
+        log.info(f"WebSocket synthesizing: {len(text)} chars, chunk_size={chunk_size}, quality={quality}")
+        self.quality_used[quality] += 1
+
+        job = model_manager.submit(
+            on_generated=on_generated,
+            kind="stream",
+            chunk_size=chunk_size,
+            ref_file=self.ref_file,
+            ref_text=self.ref_text,
+            text=text,
+            speed=self.speed,
+            nfe_step=QUALITY_STEPS[quality],
+            peak=self.peak_seen,  # Ratcheting normalizer (shared across session)
+            # Only the session's first sentence gets its lead-in cut to the
+            # pad; later ones keep up to a normal pause as the sentence gap
+            lead_pad_ms=SILENCE_MAX_GAP_MS if self.sentences else None,
+        )
+        self.sentences += 1
+        for view in job:
+            yield bytes(view)
+        self.peak_seen = job.info.get("peak", self.peak_seen)
 
-        model = model_manager.get_model()
-        text_batches = chunk_text(text, max_chars=self.max_chars)
-
-        log.info(f"WebSocket synthesizing: {len(text)} chars, {len(text_batches)} batches")
-
-        with torch.no_grad():
-            audio_stream = infer_batch_process(
-                (self.audio, self.sr),
-                self.ref_text,
-                text_batches,
-                model.ema_model,
-                model.vocoder,
-                mel_spec_type=model.mel_spec_type,
-                progress=None,
-                device=model.device,
-                streaming=True,
-                chunk_size=8192,
-                speed=self.speed,
-            )
 
-            for audio_chunk, _ in audio_stream:
-                if len(audio_chunk) > 0:
-                    # Ratcheting normalizer (shared across session)
-                    chunk_peak = np.abs(audio_chunk).max()
-                    if chunk_peak > self.peak_seen:
-                        self.peak_seen = chunk_peak
+class ResumableSession:
+    """
+    Server side of a WebSocket session, able to outlive its connection.
+
+    Synthesis runs in a producer task that appends PCM frames here; each
+    connection replays frames from its own cursor. Frame n is the n-th
+    binary message of the session, so a client that counts what it got
+    can ask for the rest. Up to retain_bytes of frames are kept: the
+    oldest already-sent frames are dropped to make room, and if
+    everything retained is unsent (nobody is listening) the producer
+    waits rather than grow the buffer.
+    """
 
-                    if self.peak_seen > 1.0:
-                        audio_chunk = audio_chunk / self.peak_seen
+    def __init__(self, session_id: str, streaming: "StreamingSession", client: str, retain_bytes: int):
+        self.id = session_id
+        self.streaming = streaming
+        self.client = client
+        self.retain_bytes = retain_bytes
+        self.frames: deque[bytes] = deque()
+        self.base_seq = 0  # seq of frames[0]
+        self.retained = 0
+        self.sent_seq = 0  # frames handed to some connection
+        self.received_chars = 0
+        self.input_closed = False
+        self.final: Optional[dict] = None  # session_end/busy/error, sent last
+        self.sentences: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self.changed = asyncio.Condition()
+        self.producer: Optional[asyncio.Task] = None
+        self.owner: Optional[object] = None  # the attached connection
+        self.detached_at: Optional[float] = None
+
+    @property
+    def next_seq(self) -> int:
+        return self.base_seq + len(self.frames)
+
+    def take_text(self, text: str):
+        """Accept client text; an empty string ends the input."""
+        if self.input_closed:
+            return
+        self.received_chars += len(text)
+        if text:
+            sentences = self.streaming.add_text(text)
+        else:
+            sentences = self.streaming.flush()
+            self.input_closed = True
+        for sentence in sentences:
+            self.sentences.put_nowait(sentence)
+        if self.input_closed:
+            self.sentences.put_nowait(None)
+
+    async def append(self, frame: bytes):
+        async with self.changed:
+            while self.frames and self.retained + len(frame) > self.retain_bytes:
+                if self.base_seq < self.sent_seq:
+                    self.retained -= len(self.frames.popleft())
+                    self.base_seq += 1
+                else:
+                    await self.changed.wait()
+            self.frames.append(frame)
+            self.retained += len(frame)
+            self.changed.notify_all()
+
+    async def finish(self, final: dict):
+        async with self.changed:
+            self.final = final
+            self.changed.notify_all()
+
+    async def next_frame(self, seq: int, owner: object) -> Optional[bytes | dict]:
+        """
+        Frame `seq` once it exists, then the final message, then None.
 
-                    pcm = np.int16(audio_chunk * 32767)
-                    yield pcm.tobytes()
+        Also None as soon as another connection takes the session over.
+        """
+        async with self.changed:
+            while self.owner is owner and seq >= self.next_seq and self.final is None:
+                await self.changed.wait()
+            if self.owner is not owner:
+                return None
+            if seq < self.next_seq:
+                return self.frames[seq - self.base_seq]
+            return self.final if seq == self.next_seq else None
+
+    async def mark_sent(self, seq: int):
+        async with self.changed:
+            self.sent_seq = max(self.sent_seq, seq)
+            self.changed.notify_all()
+
+    async def attach(self, owner: object):
+        async with self.changed:
+            self.owner = owner
+            self.detached_at = None
+            self.changed.notify_all()
+
+
+class SessionStore:
+    """Live WebSocket sessions by id, expiring ttl seconds after detach."""
+
+    def __init__(self, ttl: float, retain_bytes: int):
+        self.ttl = ttl
+        self.retain_bytes = retain_bytes
+        self._sessions: dict[str, ResumableSession] = {}
+
+    def create(self, streaming: "StreamingSession", client: str) -> ResumableSession:
+        self.reap()
+        session = ResumableSession(
+            secrets.token_urlsafe(12), streaming, client, self.retain_bytes
+        )
+        self._sessions[session.id] = session
+        metrics.set("tts_ws_sessions", len(self._sessions))
+        return session
+
+    def get(self, session_id: str) -> Optional[ResumableSession]:
+        self.reap()
+        return self._sessions.get(session_id)
+
+    def detach(self, session: ResumableSession, owner: object):
+        if session.owner is not owner:
+            return  # already taken over by a newer connection
+        session.owner = None
+        session.detached_at = time.monotonic()
+        asyncio.get_running_loop().call_later(self.ttl + 1, self.reap)
+
+    def discard(self, session: ResumableSession):
+        if self._sessions.pop(session.id, None) is not None:
+            if session.producer is not None:
+                session.producer.cancel()
+            metrics.set("tts_ws_sessions", len(self._sessions))
+
+    def reap(self):
+        now = time.monotonic()
+        for session in list(self._sessions.values()):
+            if session.detached_at is not None and now - session.detached_at > self.ttl:
+                log.info(f"WebSocket session {session.id} expired")
+                self.discard(session)
+
+
+sessions = SessionStore(ttl=SESSION_TTL, retain_bytes=SESSION_RETAIN_BYTES)
+
+
+async def produce_session_audio(session: ResumableSession):
+    """Synthesize a session's sentences into its frame buffer, connected or not."""
+    loop = asyncio.get_running_loop()
+    final = {"type": "session_end"}
+    try:
+        while (sentence := await session.sentences.get()) is not None:
+            ticket = await admission.acquire("interactive", session.client)
+            try:
+                chunks = session.streaming.synthesize(
+                    sentence,
+                    on_generated=lambda: loop.call_soon_threadsafe(admission.release, ticket),
+                    # Chosen per sentence, so quality recovers as load drops
+                    quality=choose_quality(session.streaming.quality, ticket),
+                )
+                # A session discarded mid-sentence frees the job's ring space
+                async with aclosing(iterate_closing(chunks)) as stream:
+                    async for chunk in stream:
+                        await session.append(chunk)
+            finally:
+                admission.release(ticket)
+    except Overloaded as e:
+        final = {"type": "busy", "reason": e.reason, "retry_after": e.retry_after}
+    except Exception as e:
+        log.error(f"WebSocket session {session.id} error: {e}")
+        final = {"type": "error", "message": str(e)}
+    final["quality_used"] = session.streaming.quality_used
+    await session.finish(final)
 
 
 @app.websocket("/v1/audio/stream")
@@ -544,6 +3126,11 @@ async def websocket_stream(
     voice: str = DEFAULT_VOICE,
     speed: float = 1.0,
     line_mode: bool = False,
+    chunk_ms: Optional[int] = None,
+    control: bool = False,
+    session: Optional[str] = None,
+    from_seq: int = 0,
+    quality: Optional[str] = None,
 ):
     """
     WebSocket endpoint for bidirectional TTS streaming.
@@ -554,65 +3141,202 @@ async def websocket_stream(
     - voice: Voice name (default: nature)
     - speed: Speed multiplier (default: 1.0)
     - line_mode: If true, split on newlines instead of sentences (default: false)
+    - chunk_ms: Requested audio chunk duration, 20-2000ms (default: ~340)
+    - control: If true, client text frames are JSON control messages
+      (default: false, every text frame is text to speak)
+    - quality: high, medium, low or auto (default: TTS_QUALITY). With
+      auto, each sentence is synthesized at the quality current load allows
+    - session, from_seq: Resume an earlier session, replaying audio from
+      frame from_seq (the number of binary frames already received).
+      voice/speed/line_mode/chunk_ms/quality are those of the original
+      session.
 
     Protocol:
+    - Server sends: {"type": "session_start", "session": ID, ...}, or
+      {"type": "session_resume", "session": ID, "from_seq": N,
+      "received_chars": N, "input_closed": bool} when resuming
     - Client sends: text chunks (string messages)
     - Server sends: raw PCM audio (binary messages, s16le mono 24kHz)
     - Client sends: empty string or closes connection to end session
+    - Server sends: {"type": "session_end", "quality_used": {"high": N,
+      "medium": N, "low": N}}: sentences synthesized at each quality
+
+    Resuming: text the server already has is counted in received_chars;
+    the client resends the rest. If frames before from_seq were dropped
+    from retention, session_resume's from_seq is where replay actually
+    starts. Synthesis keeps going while the client is away (up to
+    TTS_SESSION_RETAIN_SECONDS of audio), and a detached session expires
+    after TTS_SESSION_TTL. A normal close (code 1000) ends it at once.
+
+    Control messages (control=true):
+    - {"type": "text", "text": "..."}: text to speak ("" ends the session)
+    - {"type": "config", "chunk_ms": N, "target_buffer_ms": N,
+      "low_water_ms": N}: server replies {"type": "config", ...} with the
+      effective values
+    - {"type": "ack", "buffered_ms": N}: client playback buffer level.
+      The server holds audio while the buffer is above target_buffer_ms
+      and drops to the smallest chunks when it falls below low_water_ms.
+    - Anything else (not JSON, an unknown type, text that isn't a
+      string): the server replies {"type": "error", "message": ...} and
+      the session carries on
 
     The server buffers text until boundaries (sentences or newlines), then
-    synthesizes and streams audio. Voice context is maintained for coherent output.
+    synthesizes and streams audio. Voice context is maintained for coherent output,
+    so sessions always use F5-TTS (no per-sentence engine routing).
+
+    Each sentence goes through admission control at interactive priority.
+    If one is shed, the server sends {"type": "busy", "reason": ...,
+    "retry_after": N} and ends the session. The synthesis slot is given
+    back as soon as the worker finishes a sentence, so pacing a slow
+    client doesn't hold the GPU.
     """
     await websocket.accept()
+    owner = object()
 
-    try:
-        session = StreamingSession(voice=voice, speed=speed, line_mode=line_mode)
-
-        # Send session info
+    async def receive():
+        """Read client frames into the session until the client goes away."""
+        while True:
+            message = await websocket.receive_text()
+            if state.owner is not owner:
+                return
+            if state.streaming.control:
+                try:
+                    msg = json.loads(message)
+                except json.JSONDecodeError as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Control message is not JSON: {e}",
+                    })
+                    continue
+                kind = msg.get("type") if isinstance(msg, dict) else None
+                if kind == "ack":
+                    state.streaming.flow.ack(msg.get("buffered_ms", 0))
+                    continue
+                if kind == "config":
+                    effective = state.streaming.flow.configure(msg)
+                    await websocket.send_json({"type": "config", **effective})
+                    continue
+                # Only an explicit {"type": "text", "text": ""} ends the
+                # input: a typo mustn't cut the session short
+                text = msg.get("text") if kind == "text" else None
+                if not isinstance(text, str):
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Unknown control message: {message[:200]}",
+                    })
+                    continue
+                message = text
+            state.take_text(message)
+
+    async def send(seq: int):
+        """Deliver frames from seq onwards, then the final message."""
+        flow = state.streaming.flow
+        while (frame := await state.next_frame(seq, owner)) is not None:
+            if isinstance(frame, dict):
+                await websocket.send_json(frame)
+                return
+            # Re-check after each nap: an ack may have moved the estimate
+            while (delay := flow.delay()) > 0:
+                await asyncio.sleep(min(delay, 0.25))
+            await websocket.send_bytes(frame)
+            flow.sent(len(frame))
+            seq += 1
+            await state.mark_sent(seq)
+
+    state = sessions.get(session) if session else None
+    if session and state is None:
+        metrics.inc("tts_ws_resumes_total", result="unknown")
         await websocket.send_json({
-            "type": "session_start",
-            "voice": voice,
-            "speed": speed,
-            "line_mode": line_mode,
-            "sample_rate": 24000,
-            "channels": 1,
-            "format": "s16le",
+            "type": "error",
+            "message": f"Session '{session}' not found or expired",
         })
+        await websocket.close()
+        return
 
-        while True:
-            # Receive text from client
-            try:
-                message = await websocket.receive_text()
-            except WebSocketDisconnect:
-                break
-
-            # Empty message signals flush and end
-            if not message:
-                sentences = session.flush()
-                for sentence in sentences:
-                    for chunk in session.synthesize(sentence):
-                        await websocket.send_bytes(chunk)
-                break
-
-            # Add text and synthesize any complete sentences
-            sentences = session.add_text(message)
-            for sentence in sentences:
-                for chunk in session.synthesize(sentence):
-                    await websocket.send_bytes(chunk)
-
-        # Signal end of audio
-        await websocket.send_json({"type": "session_end"})
-
-    except WebSocketDisconnect:
-        log.info("WebSocket client disconnected")
+    try:
+        if state is not None:
+            await state.attach(owner)
+            start = min(max(from_seq, state.base_seq), state.next_seq)
+            metrics.inc(
+                "tts_ws_resumes_total",
+                result="complete" if start == from_seq else "gap",
+            )
+            log.info(f"WebSocket session {state.id} resumed at frame {start} (asked {from_seq})")
+            await websocket.send_json({
+                "type": "session_resume",
+                "session": state.id,
+                "from_seq": start,
+                "received_chars": state.received_chars,
+                "input_closed": state.input_closed,
+            })
+        else:
+            streaming = StreamingSession(
+                voice=voice,
+                speed=speed,
+                line_mode=line_mode,
+                flow=FlowController(chunk_ms),
+                control=control,
+                quality=quality,
+            )
+            model_state = model_manager.state()
+            metrics.inc("tts_model_state_total", state=model_state)
+            state = sessions.create(streaming, client_id(websocket))
+            await state.attach(owner)
+            state.producer = asyncio.create_task(produce_session_audio(state))
+            start = 0
+
+            # Send session info
+            await websocket.send_json({
+                "type": "session_start",
+                "session": state.id,
+                "voice": voice,
+                "speed": speed,
+                "line_mode": line_mode,
+                "sample_rate": SAMPLE_RATE,
+                "channels": 1,
+                "format": "s16le",
+                "control": control,
+                "quality": streaming.quality,
+                "chunk_ms": round(streaming.flow.chunk_samples * 1000 / SAMPLE_RATE),
+                "model_state": model_state,
+            })
+
+        receiver = asyncio.create_task(receive())
+        sender = asyncio.create_task(send(start))
+        try:
+            done, _ = await asyncio.wait(
+                {receiver, sender}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+        finally:
+            receiver.cancel()
+            sender.cancel()
+
+        if state.final is not None and state.final["type"] != "session_end":
+            sessions.discard(state)
+
+    except WebSocketDisconnect as e:
+        # state is None if the client left before its session was created
+        if state is None:
+            log.info("WebSocket client disconnected before the session started")
+        elif e.code == 1000:
+            log.info(f"WebSocket session {state.id} closed by client")
+            sessions.discard(state)
+        else:
+            log.info(f"WebSocket client disconnected, session {state.id} kept for resume")
     except Exception as e:
+        # Also a session that never started (bad voice, bad chunk_ms)
         log.error(f"WebSocket error: {e}")
         try:
             await websocket.send_json({"type": "error", "message": str(e)})
+            await websocket.close()
         except Exception:
             pass
     finally:
-        log.info("WebSocket session ended")
+        if state is not None:
+            sessions.detach(state, owner)
+        log.info("WebSocket connection ended")
 
 
 @app.get("/v1/audio/voices")
@@ -625,24 +3349,68 @@ async def list_voices() -> dict:
             voice_name = audio_file.stem
             text_file = VOICES_DIR / f"{voice_name}.txt"
             if text_file.exists():
+                optimized = optimized_voice(voice_name)
                 voices.append({
                     "voice_id": voice_name,
                     "name": voice_name,
                     "has_transcript": True,
+                    "optimized": optimized is not None,
                 })
 
     return {"voices": voices, "default": DEFAULT_VOICE}
 
 
+@app.post("/v1/audio/warmup")
+async def warmup() -> dict:
+    """Load or restore the F5-TTS model ahead of a request (see F5TTSManager.warm)."""
+    loop = asyncio.get_running_loop()
+    state = await loop.run_in_executor(None, model_manager.warm)
+    metrics.inc("tts_warmups_total", state=state)
+    if state != "warm":
+        log.info(f"Warm-up requested, model was {state}")
+    return {"state": state, "tier": model_manager.policy.tier}
+
+
 @app.get("/health")
 async def health_check() -> dict:
     """Health check endpoint."""
     return {
         "status": "ok",
         "model": model_manager.status(),
+        "kokoro": engines["kokoro"].status(),
+        "admission": admission.status(),
     }
 
 
+@app.get("/metrics")
+async def prometheus_metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/memory")
+async def debug_memory(top: int = 15, tracemalloc: bool = False) -> dict:
+    """Memory instrumentation for leak hunting (TTS_DEBUG_MEMORY=1 only)."""
+    if not DEBUG_MEMORY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, memory_monitor.report, top, tracemalloc)
+
+
+@app.post("/debug/unload")
+async def debug_unload(tier: str = "unloaded") -> dict:
+    """Offload or unload the model now (TTS_DEBUG_MEMORY=1 only)."""
+    if not DEBUG_MEMORY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if tier not in ("host", "unloaded"):
+        raise HTTPException(status_code=400, detail="tier must be host or unloaded")
+    if any(w.busy() for w in model_manager.workers):
+        raise HTTPException(status_code=409, detail="Jobs are running")
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, model_manager.force_tier, tier)
+    return {"tier": model_manager.policy.tier}
+
+
 @app.get("/")
 async def root() -> dict:
     """Root endpoint with service info."""
@@ -650,11 +3418,14 @@ async def root() -> dict:
         "service": "tts-server",
         "version": "0.3.0",
         "backend": "F5-TTS",
+        "engines": [name for name, backend in engines.items() if backend.available()],
         "endpoints": {
             "speech": "POST /v1/audio/speech",
             "stream": "WS /v1/audio/stream",
+            "warmup": "POST /v1/audio/warmup",
             "voices": "GET /v1/audio/voices",
             "health": "GET /health",
+            "metrics": "GET /metrics",
         },
     }
 
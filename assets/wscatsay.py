@@ -4,7 +4,8 @@ WebSocket TTS client - bidirectional streaming text-to-speech.
 
 Reads text from stdin (or file), sends to TTS server via WebSocket,
 and plays audio in real-time as it's generated. Maintains voice context
-across the entire session for coherent synthesis.
+across the entire session for coherent synthesis. A dropped connection
+is resumed without re-synthesizing what was already generated.
 
 Usage:
     echo "Hello world" | wscatsay
@@ -14,6 +15,7 @@ Usage:
 
 import argparse
 import asyncio
+import json
 import os
 import signal
 import subprocess
@@ -28,18 +30,27 @@ except ImportError:
     sys.exit(1)
 
 
+# Text kept for resending after a reconnect; older text is dropped
+RESEND_LIMIT = 1024 * 1024
+
+
 async def stream_tts(
     url: str,
     voice: str,
     speed: float,
     input_stream,
     line_buffered: bool = False,
+    retries: int = 5,
 ):
     """
     Connect to TTS WebSocket and stream text in, audio out.
 
     When line_buffered=True, also enables line_mode on the server
     (split on newlines instead of sentence boundaries).
+
+    If the connection drops, reconnect and resume the server-side session:
+    the server replays audio from the first frame we didn't get, and
+    tells us how much text it has so we resend only the rest.
     """
     # Build WebSocket URL with query params
     line_mode = "true" if line_buffered else "false"
@@ -64,77 +75,130 @@ async def stream_tts(
         stderr=subprocess.DEVNULL,
     )
 
+    # Session state that survives reconnects
+    session = None
+    frames = 0  # binary frames received == next seq to ask for
+    sent = ""  # text sent so far (tail only, see RESEND_LIMIT)
+    sent_offset = 0  # chars dropped from the front of `sent`
+    input_done = False
+
+    # stdin is read once, independent of any one connection
+    text_queue: asyncio.Queue = asyncio.Queue()
+
+    async def read_input():
+        loop = asyncio.get_event_loop()
+        while True:
+            if line_buffered:
+                # Line-buffered mode: send each line as it arrives
+                chunk = await loop.run_in_executor(None, input_stream.readline)
+            else:
+                # Batch mode: read all, send in chunks
+                chunk = await loop.run_in_executor(
+                    None, lambda: input_stream.read(4096)
+                )
+            if not chunk:
+                break
+            await text_queue.put(chunk)
+        # Signal end of input
+        await text_queue.put("")
+
+    async def send_text(ws):
+        """Forward stdin text to the WebSocket."""
+        nonlocal sent, sent_offset, input_done
+        while not input_done:
+            chunk = await text_queue.get()
+            # Record before sending: if the send is lost, resume resends it
+            if chunk:
+                sent += chunk
+                if len(sent) > RESEND_LIMIT:
+                    sent_offset += len(sent) - RESEND_LIMIT
+                    sent = sent[-RESEND_LIMIT:]
+            else:
+                input_done = True
+            await ws.send(chunk)
+
+    async def receive_audio(ws) -> bool:
+        """Pipe audio to ffplay; True once the session is over."""
+        nonlocal frames
+        async for msg in ws:
+            if isinstance(msg, bytes):
+                # Binary = PCM audio
+                frames += 1
+                if ffplay.stdin:
+                    ffplay.stdin.write(msg)
+                    ffplay.stdin.flush()
+            elif isinstance(msg, str):
+                # Text = JSON control message
+                try:
+                    info = json.loads(msg)
+                except json.JSONDecodeError:
+                    continue
+                if info.get("type") == "session_end":
+                    return True
+                elif info.get("type") in ("error", "busy"):
+                    print(
+                        f"Error: {info.get('message') or info.get('reason')}",
+                        file=sys.stderr
+                    )
+                    return True
+        return False
+
+    reader = asyncio.create_task(read_input())
+    attempt = 0
     try:
-        async with websockets.connect(ws_url) as ws:
-            # Receive session start message
-            msg = await ws.recv()
-            if isinstance(msg, str):
-                import json
-                info = json.loads(msg)
-                if info.get("type") == "error":
-                    print(f"Error: {info.get('message')}", file=sys.stderr)
+        while True:
+            connect_url = ws_url
+            if session:
+                connect_url += f"&session={session}&from_seq={frames}"
+            try:
+                async with websockets.connect(connect_url) as ws:
+                    # Receive session start (or resume) message
+                    info = json.loads(await ws.recv())
+                    if info.get("type") == "error":
+                        print(f"Error: {info.get('message')}", file=sys.stderr)
+                        return
+                    if info.get("type") == "session_resume":
+                        if info["from_seq"] != frames:
+                            print(
+                                f"Warning: {info['from_seq'] - frames} audio "
+                                "frames were lost while disconnected",
+                                file=sys.stderr,
+                            )
+                            frames = info["from_seq"]
+                        # Resend whatever text the server didn't get
+                        start = max(info["received_chars"] - sent_offset, 0)
+                        if sent[start:]:
+                            await ws.send(sent[start:])
+                        if input_done and not info["input_closed"]:
+                            await ws.send("")
+                    session = info.get("session")
+                    attempt = 0
+
+                    # Run send and receive concurrently
+                    sender = asyncio.create_task(send_text(ws))
+                    try:
+                        if await receive_audio(ws):
+                            return
+                    finally:
+                        sender.cancel()
+                        # Its own ConnectionClosed, if any, is the same drop
+                        await asyncio.gather(sender, return_exceptions=True)
+            # Any WebSocket failure, including a handshake refused while the
+            # server is busy (InvalidStatus) or a close without session_end
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                if not session:
+                    print(f"Error: {e}", file=sys.stderr)
                     return
+                print(f"Connection lost ({e}), resuming", file=sys.stderr)
 
-            async def send_text():
-                """Read stdin and send text to WebSocket."""
-                loop = asyncio.get_event_loop()
-
-                if line_buffered:
-                    # Line-buffered mode: send each line as it arrives
-                    while True:
-                        line = await loop.run_in_executor(
-                            None, input_stream.readline
-                        )
-                        if not line:
-                            break
-                        await ws.send(line)
-                else:
-                    # Batch mode: read all, send in chunks
-                    while True:
-                        chunk = await loop.run_in_executor(
-                            None, lambda: input_stream.read(4096)
-                        )
-                        if not chunk:
-                            break
-                        await ws.send(chunk)
-
-                # Signal end of input
-                await ws.send("")
-
-            async def receive_audio():
-                """Receive audio from WebSocket and pipe to ffplay."""
-                try:
-                    async for msg in ws:
-                        if isinstance(msg, bytes):
-                            # Binary = PCM audio
-                            if ffplay.stdin:
-                                ffplay.stdin.write(msg)
-                                ffplay.stdin.flush()
-                        elif isinstance(msg, str):
-                            # Text = JSON control message
-                            import json
-                            try:
-                                info = json.loads(msg)
-                                if info.get("type") == "session_end":
-                                    break
-                                elif info.get("type") == "error":
-                                    print(
-                                        f"Error: {info.get('message')}",
-                                        file=sys.stderr
-                                    )
-                                    break
-                            except json.JSONDecodeError:
-                                pass
-                except websockets.exceptions.ConnectionClosed:
-                    pass
-
-            # Run send and receive concurrently
-            await asyncio.gather(
-                send_text(),
-                receive_audio(),
-            )
+            # Servers without resumable sessions don't send an id
+            attempt += 1
+            if not session or attempt > retries:
+                return
+            await asyncio.sleep(min(0.5 * 2 ** attempt, 10))
 
     finally:
+        reader.cancel()
         # Clean up ffplay
         if ffplay.stdin:
             ffplay.stdin.close()
@@ -161,6 +225,12 @@ def main():
         action="store_true",
         help="Send each line as it arrives (for tail -f)",
     )
+    parser.add_argument(
+        "-r", "--retries",
+        type=int,
+        default=5,
+        help="Reconnect attempts after a dropped connection (default: 5)",
+    )
     parser.add_argument(
         "file",
         nargs="?",
@@ -188,6 +258,7 @@ def main():
                 args.speed,
                 args.file,
                 args.line_buffered,
+                args.retries,
             )
         )
     except BrokenPipeError:
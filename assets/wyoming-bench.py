@@ -0,0 +1,848 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Wyoming TTS bridges (assets/wyoming-f5-tts.py,
+assets/wyoming-kokoro.py, assets/wyoming-tts-router.py).
+
+Subcommands:
+  pool   Per-utterance HTTP overhead of a fresh httpx.AsyncClient per
+         Synthesize (what the bridges used to do) versus one pooled,
+         kept-alive client per process. Runs against an in-process stub
+         backend that streams PCM like tts-server/Kokoro-FastAPI do, so
+         only the client side differs between the two modes:
+           python3 wyoming-bench.py pool
+           python3 wyoming-bench.py pool --requests 500 --concurrency 4
+           python3 wyoming-bench.py pool --url http://127.0.0.1:8881
+  reframe
+         AudioChunk events and bridge CPU time per utterance with the
+         bridge forwarding backend chunks as they arrive (--frame-ms 0)
+         versus re-framing to fixed durations. Spawns the real bridge
+         script against a stub that fragments its stream the way socket
+         reads do (random sizes up to --fragment-bytes, odd lengths
+         included):
+           python3 wyoming-bench.py reframe
+           python3 wyoming-bench.py reframe --bridge wyoming-f5-tts.py --frame-ms 20,60,100
+  pipeline
+         The whole HA -> bridge -> backend chain without HA, a GPU or
+         models. A fake HA client sends Describe and Synthesize (or, with
+         --stream, a word-by-word SynthesizeStart/Chunk/Stop) for a
+         corpus of typical replies to the real bridge scripts, pointed at
+         tts-server.py running its deterministic stub model
+         (TTS_STUB_MODEL) and at a Kokoro stub that streams paced,
+         text-length audio. Per stage, p50/p95 in ms: Describe round trip,
+         request to AudioStart and to first audio, the backend's time to
+         first byte (from the bridge's own /metrics), bridge overhead
+         (first audio minus that and, streaming, minus the wait for the
+         first sentence the bridge can start on by its own splitting
+         rule: first_text), total, and streaming cadence - chunk
+         spacing and the silence a satellite playing chunks as they come
+         would sit through (underrun):
+           python3 wyoming-bench.py pipeline
+           python3 wyoming-bench.py pipeline --bridges kokoro --stream --json pipeline.json
+           python3 wyoming-bench.py pipeline --bridges f5 --f5-url http://127.0.0.1:8880
+         tts-server needs fastapi, uvicorn, numpy and soundfile (no torch
+         in stub mode); --server-python names an interpreter that has them.
+
+Needs the bridges' Python env (wyoming + httpx), e.g. on skaia:
+  nix shell --impure --expr \\
+    'with import <nixpkgs> {}; python3.withPackages (ps: [ ps.wyoming ps.httpx ])' \\
+    -c python3 assets/wyoming-bench.py pool
+"""
+
+from __future__ import annotations
+
+import argparse
+import array
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import httpx
+from wyoming.audio import AudioChunk, AudioStart, AudioStop
+from wyoming.client import AsyncTcpClient
+from wyoming.info import Describe, Info
+from wyoming.tts import (
+    Synthesize,
+    SynthesizeChunk,
+    SynthesizeStart,
+    SynthesizeStop,
+    SynthesizeStopped,
+)
+
+SAMPLE_RATE_HZ = 24000
+SAMPLE_WIDTH_BYTES = 2
+
+# Same client settings as the bridges
+TIMEOUT = httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0)
+
+# Where each bridge's backend can start on streamed text. tts-server's
+# session (StreamingSession.SENTENCE_END) takes a sentence as soon as it
+# ends; wyoming-kokoro.py's splitter also wants the next one to begin,
+# and holds pieces under MIN_SENTENCE_CHARS for the next. Copies: keep
+# them in step
+F5_SENTENCE_END = re.compile(r"[.!?](?:\s|$)")
+KOKORO_SENTENCE_END = re.compile(
+    r"(?<=[.!?\u2026])[\"')\]\u201d\u2019]*\s+(?=[A-Z0-9\"'(\[\u201c\u2018])|\n+"
+)
+KOKORO_MIN_SENTENCE_CHARS = 20
+
+
+class StubBackend:
+    """
+    Minimal HTTP/1.1 server in the shape of POST /v1/audio/speech.
+
+    Streams audio_ms of silent s16le PCM in chunk_ms chunks with chunked
+    transfer encoding, after latency_ms and gap_ms apart, and keeps
+    connections alive the way uvicorn does. Counts connections so reuse
+    is visible.
+    """
+
+    def __init__(
+        self,
+        audio_ms: int = 1000,
+        chunk_ms: int = 340,
+        latency_ms: float = 0.0,
+        fragment_bytes: int = 0,
+        gap_ms: float = 0.0,
+    ):
+        self.audio_ms = audio_ms
+        self.chunk_ms = chunk_ms
+        self.latency_ms = latency_ms
+        self.gap_ms = gap_ms
+        # >0: cut the stream into random 1..fragment_bytes pieces
+        self.fragment_bytes = fragment_bytes
+        self._random = random.Random(0)
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                await self._respond(writer, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def chunks(self, body: bytes) -> list[bytes]:
+        """PCM chunks for one request (subclasses may look at the body)."""
+        chunk = bytes(SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * self.chunk_ms // 1000)
+        count = max(1, self.audio_ms // self.chunk_ms)
+        if not self.fragment_bytes:
+            return [chunk] * count
+        stream = chunk * count
+        pieces = []
+        while stream:
+            size = self._random.randint(1, self.fragment_bytes)
+            pieces.append(stream[:size])
+            stream = stream[size:]
+        return pieces
+
+    async def _respond(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"content-type: audio/pcm\r\n"
+            b"transfer-encoding: chunked\r\n"
+            b"\r\n"
+        )
+        for i, chunk in enumerate(self.chunks(body)):
+            if i and self.gap_ms:
+                await asyncio.sleep(self.gap_ms / 1000)
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+class SpeechStub(StubBackend):
+    """
+    StubBackend that answers like a speech engine: as much audio as the
+    request's input takes to say at chars_per_s, the first chunk after
+    latency_ms and the rest rtf times their duration apart, the way a
+    model generating faster than realtime streams. Stands in for
+    Kokoro-FastAPI in the pipeline benchmark.
+    """
+
+    def __init__(self, latency_ms: float, rtf: float, chars_per_s: float = 15.0, chunk_ms: int = 340):
+        super().__init__(chunk_ms=chunk_ms, latency_ms=latency_ms, gap_ms=rtf * chunk_ms)
+        self.chars_per_s = chars_per_s
+
+    def chunks(self, body: bytes) -> list[bytes]:
+        # Health probes are bodiless GETs; they get a single chunk
+        text = json.loads(body).get("input", "") if body else ""
+        chunk = bytes(SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * self.chunk_ms // 1000)
+        return [chunk] * max(1, round(len(text) * 1000 / self.chars_per_s / self.chunk_ms))
+
+
+def _payload(args) -> dict:
+    return {
+        "model": "kokoro",
+        "input": "The kitchen lights are now off.",
+        "voice": args.voice,
+        "response_format": "pcm",
+        "stream": True,
+        "speed": 1.0,
+    }
+
+
+async def _utterance(client: httpx.AsyncClient, url: str, payload: dict) -> tuple[float, float]:
+    """One streamed synthesis: (seconds to first audio, seconds to last)."""
+    start = time.perf_counter()
+    first = None
+    async with client.stream("POST", f"{url}/v1/audio/speech", json=payload) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.aiter_bytes():
+            if chunk and first is None:
+                first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+
+async def _run_mode(args, url: str, pooled: bool) -> list[tuple[float, float]]:
+    payload = _payload(args)
+    limits = httpx.Limits(
+        max_connections=max(10, args.concurrency),
+        max_keepalive_connections=max(5, args.concurrency),
+    )
+    shared = httpx.AsyncClient(timeout=TIMEOUT, limits=limits) if pooled else None
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one() -> tuple[float, float]:
+        async with semaphore:
+            if shared is not None:
+                return await _utterance(shared, url, payload)
+            async with httpx.AsyncClient(timeout=TIMEOUT) as client:
+                return await _utterance(client, url, payload)
+
+    try:
+        # Warm-up outside the timings (first connection, backend caches)
+        await one()
+        return await asyncio.gather(*(one() for _ in range(args.requests)))
+    finally:
+        if shared is not None:
+            await shared.aclose()
+
+
+def _summary(timings: list[tuple[float, float]]) -> dict:
+    def stats(values: list[float]) -> dict:
+        values = sorted(values)
+        return {
+            "mean_ms": round(statistics.mean(values) * 1000, 2),
+            "p50_ms": round(values[len(values) // 2] * 1000, 2),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 2),
+        }
+
+    return {
+        "first_audio": stats([first for first, _ in timings]),
+        "total": stats([total for _, total in timings]),
+    }
+
+
+async def cmd_pool(args) -> None:
+    stub = None
+    url = args.url
+    if not url:
+        stub = StubBackend(args.audio_ms, args.chunk_ms, args.latency_ms)
+        await stub.start()
+        url = stub.url
+
+    results = {}
+    try:
+        for mode, pooled in (("per-request", False), ("pooled", True)):
+            before = stub.connections if stub else 0
+            results[mode] = _summary(await _run_mode(args, url, pooled))
+            if stub:
+                results[mode]["connections"] = stub.connections - before
+    finally:
+        if stub:
+            await stub.stop()
+
+    print(f"{args.requests} utterances, concurrency {args.concurrency}, backend {url}")
+    print(f"{'mode':<12} {'first_p50':>9} {'first_p95':>9} {'total_p50':>9} {'total_p95':>9} {'conns':>6}")
+    for mode, summary in results.items():
+        print(
+            f"{mode:<12} {summary['first_audio']['p50_ms']:>9} {summary['first_audio']['p95_ms']:>9} "
+            f"{summary['total']['p50_ms']:>9} {summary['total']['p95_ms']:>9} "
+            f"{summary.get('connections', '-'):>6}"
+        )
+    saved = results["per-request"]["first_audio"]["mean_ms"] - results["pooled"]["first_audio"]["mean_ms"]
+    print(f"\npooled client saves {saved:.2f} ms to first audio per utterance (mean)")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _cpu_seconds(pid: int) -> float:
+    """utime + stime of a process, from /proc (Linux only)."""
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _bridge_args(bridge: Path, backend_url: str) -> list[str]:
+    """Point any of the three bridge scripts at one backend."""
+    if "router" in bridge.name:
+        return ["--backend", f"stub={backend_url}", "--route", "stub=stub"]
+    if "kokoro" in bridge.name:
+        return ["--kokoro-url", backend_url]
+    return ["--f5-url", backend_url]
+
+
+async def _wyoming_utterance(port: int) -> tuple[int, int]:
+    """One Synthesize through a bridge: (AudioChunk events, odd-length ones)."""
+    events = split = 0
+    async with AsyncTcpClient("127.0.0.1", port) as client:
+        await client.write_event(Synthesize(text="The kitchen lights are now off.").event())
+        while True:
+            event = await client.read_event()
+            if event is None or AudioStop.is_type(event.type):
+                break
+            if AudioChunk.is_type(event.type):
+                events += 1
+                split += len(event.payload) % SAMPLE_WIDTH_BYTES
+    return events, split
+
+
+async def _run_bridge(args, backend_url: str, frame_ms: int) -> dict:
+    port = _free_port()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(args.bridge),
+        "--uri", f"tcp://127.0.0.1:{port}",
+        "--frame-ms", str(frame_ms),
+        "--log-level", "WARNING",
+        *_bridge_args(args.bridge, backend_url),
+    )
+    try:
+        for _ in range(100):
+            try:
+                await _wyoming_utterance(port)
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        else:
+            raise SystemExit(f"{args.bridge.name} did not come up on port {port}")
+
+        cpu = _cpu_seconds(proc.pid)
+        events = split = 0
+        for _ in range(args.utterances):
+            count, odd = await _wyoming_utterance(port)
+            events += count
+            split += odd
+        cpu = _cpu_seconds(proc.pid) - cpu
+    finally:
+        proc.terminate()
+        await proc.wait()
+
+    return {
+        "frame_ms": frame_ms,
+        "events_per_utterance": round(events / args.utterances, 1),
+        "split_samples_per_utterance": round(split / args.utterances, 1),
+        "bridge_cpu_ms_per_utterance": round(cpu * 1000 / args.utterances, 2),
+    }
+
+
+async def cmd_reframe(args) -> None:
+    stub = StubBackend(args.audio_ms, fragment_bytes=args.fragment_bytes)
+    await stub.start()
+    try:
+        frame_ms = [0] + [int(ms) for ms in args.frame_ms.split(",")]
+        results = [await _run_bridge(args, stub.url, ms) for ms in frame_ms]
+    finally:
+        await stub.stop()
+
+    print(
+        f"{args.bridge.name}: {args.utterances} utterances of {args.audio_ms}ms, "
+        f"fragments up to {args.fragment_bytes} bytes"
+    )
+    print(f"{'frame_ms':>8} {'events':>8} {'split':>6} {'cpu_ms':>8}")
+    for result in results:
+        print(
+            f"{result['frame_ms'] or 'as-is':>8} {result['events_per_utterance']:>8} "
+            f"{result['split_samples_per_utterance']:>6} "
+            f"{result['bridge_cpu_ms_per_utterance']:>8}"
+        )
+    base = results[0]
+    for result in results[1:]:
+        print(
+            f"\n{result['frame_ms']}ms frames save "
+            f"{base['events_per_utterance'] - result['events_per_utterance']:.0f} events and "
+            f"{base['bridge_cpu_ms_per_utterance'] - result['bridge_cpu_ms_per_utterance']:.2f} "
+            "ms of bridge CPU per utterance",
+            end="",
+        )
+    print()
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+# Typical Home Assistant replies: intent confirmations, state readouts,
+# errors, and a few longer conversation agent answers
+CORPUS = [
+    "Turned on the kitchen lights.",
+    "The front door is locked.",
+    "Sorry, I couldn't understand that.",
+    "The living room is 21.5 degrees.",
+    "Timer set for 10 minutes.",
+    "Your 10 minute timer is done.",
+    "I've turned off 3 lights and closed the garage door.",
+    "It's 14 degrees and partly cloudy. Expect rain this afternoon, with a high of 17.",
+    "Good morning! You have two events today: the dentist at 10 and dinner with Sam at 7.",
+    "The washing machine finished 5 minutes ago. The dryer has about 40 minutes left, "
+    "and the dishwasher is still running its eco cycle.",
+]
+
+BRIDGES = {
+    "f5": "wyoming-f5-tts.py",
+    "kokoro": "wyoming-kokoro.py",
+    "router": "wyoming-tts-router.py",
+}
+
+# Stages in the order the pipeline report lists them
+STAGES = (
+    "describe_ms",
+    "first_text_ms",
+    "audio_start_ms",
+    "first_audio_ms",
+    "backend_ttfb_ms",
+    "bridge_ms",
+    "total_ms",
+    "audio_ms",
+    "gap_p50_ms",
+    "gap_max_ms",
+    "underrun_ms",
+)
+
+
+def _write_voice(directory: Path, name: str) -> None:
+    """A one-second reference tone and its transcript: one tts-server voice."""
+    tone = array.array(
+        "h",
+        (int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE_HZ)) for i in range(SAMPLE_RATE_HZ)),
+    )
+    with wave.open(str(directory / f"{name}.wav"), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH_BYTES)
+        wav.setframerate(SAMPLE_RATE_HZ)
+        wav.writeframes(tone.tobytes())
+    (directory / f"{name}.txt").write_text("This is a reference tone.")
+
+
+async def _start_tts_server(args, workdir: Path) -> tuple[asyncio.subprocess.Process, str]:
+    """
+    tts-server.py with its stub model on a free port, returned once the
+    model is loaded, so no bridge's numbers include the load.
+    """
+    voices = workdir / "voices"
+    voices.mkdir()
+    _write_voice(voices, "nature")
+    port = _free_port()
+    env = {
+        **os.environ,
+        "TTS_HOST": "127.0.0.1",
+        "TTS_PORT": str(port),
+        "TTS_STUB_MODEL": args.stub_model,
+        "TTS_VOICE": "nature",
+        "TTS_VOICES_DIR": str(voices),
+        "TTS_VOICE_CACHE": "",
+        "TTS_WEIGHTS_CACHE": "",
+    }
+    log_path = workdir / "tts-server.log"
+    with log_path.open("wb") as log:
+        proc = await asyncio.create_subprocess_exec(
+            args.server_python, str(args.server), env=env, stdout=log, stderr=log
+        )
+    url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
+        for _ in range(600):
+            if proc.returncode is not None:
+                break
+            try:
+                health = await client.get(f"{url}/health")
+                if health.json()["model"]["loaded"]:
+                    return proc, url
+                await client.post(f"{url}/v1/audio/warmup")
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    if proc.returncode is None:
+        proc.terminate()
+        await proc.wait()
+    tail = "\n".join(log_path.read_text(errors="replace").splitlines()[-20:])
+    raise SystemExit(f"{args.server.name} did not come up on port {port}:\n{tail}")
+
+
+def _pipeline_bridge_args(bridge: str, f5_url: str, kokoro_url: str) -> list[str]:
+    """Point a bridge at the F5-TTS and/or Kokoro stand-in."""
+    if bridge == "router":
+        return [
+            "--backend", f"f5={f5_url}",
+            "--backend", f"kokoro={kokoro_url}",
+            "--route", "nature=f5:nature,kokoro:af_heart",
+        ]
+    if bridge == "kokoro":
+        return ["--kokoro-url", kokoro_url]
+    return ["--f5-url", f5_url]
+
+
+async def _scrape_first_byte(client: httpx.AsyncClient, url: str) -> tuple[float, float]:
+    """(sum, count) of the bridge's wyoming_backend_first_byte_seconds, all labels."""
+    total = count = 0.0
+    for line in (await client.get(url)).text.splitlines():
+        series, _, value = line.rpartition(" ")
+        if series.startswith("wyoming_backend_first_byte_seconds_sum"):
+            total += float(value)
+        elif series.startswith("wyoming_backend_first_byte_seconds_count"):
+            count += float(value)
+    return total, count
+
+
+def _cadence(arrivals: list[tuple[float, float]]) -> dict:
+    """
+    Chunk spacing and playback stalls from (arrival ms, audio ms) pairs,
+    playing each chunk as soon as it arrives and the previous one ends:
+    underrun_ms is how long a satellite would have sat in silence waiting
+    for audio after it started speaking.
+    """
+    gaps = sorted(b[0] - a[0] for a, b in zip(arrivals, arrivals[1:])) or [0.0]
+    underrun = 0.0
+    played_until = arrivals[0][0] if arrivals else 0.0
+    for arrival, audio in arrivals:
+        if arrival > played_until:
+            underrun += arrival - played_until
+            played_until = arrival
+        played_until += audio
+    return {
+        "gap_p50_ms": gaps[len(gaps) // 2],
+        "gap_max_ms": gaps[-1],
+        "underrun_ms": underrun,
+        "audio_ms": sum(audio for _, audio in arrivals),
+    }
+
+
+def _sentence_ready(bridge: str, text: str) -> bool:
+    """Whether the bridge has a first sentence to synthesize in text so far."""
+    if bridge == "kokoro":
+        return any(
+            len(text[: match.end()].strip()) >= KOKORO_MIN_SENTENCE_CHARS
+            for match in KOKORO_SENTENCE_END.finditer(text)
+        )
+    return F5_SENTENCE_END.search(text) is not None
+
+
+async def _pipeline_utterance(port: int, bridge: str, text: str, word_ms: float | None) -> dict:
+    """
+    One exchange the way HA has it with a Wyoming TTS: Describe, then the
+    text as a Synthesize, or with word_ms as a SynthesizeStart/Chunk/Stop
+    stream a word every word_ms (the plain Synthesize HA repeats it in
+    included) if the bridge says it supports streaming. Times are ms from
+    sending the request; first_text_ms is when the text sent so far first
+    held a sentence the bridge (or its backend) starts on, by its own
+    splitting rule: nothing can start before that.
+    """
+    async with AsyncTcpClient("127.0.0.1", port) as client:
+        start = time.perf_counter()
+        await client.write_event(Describe().event())
+        while (event := await client.read_event()) is not None and not Info.is_type(event.type):
+            pass
+        describe = (time.perf_counter() - start) * 1000
+        if event is None or not any(tts.supports_synthesize_streaming for tts in Info.from_event(event).tts):
+            word_ms = None
+        first_text = 0.0
+
+        async def send() -> None:
+            nonlocal first_text
+            if word_ms is None:
+                await client.write_event(Synthesize(text=text).event())
+                return
+            await client.write_event(SynthesizeStart().event())
+            sent = ""
+            for word in text.split(" "):
+                await client.write_event(SynthesizeChunk(text=word + " ").event())
+                sent += word + " "
+                if not first_text and _sentence_ready(bridge, sent):
+                    first_text = (time.perf_counter() - start) * 1000
+                await asyncio.sleep(word_ms / 1000)
+            await client.write_event(Synthesize(text=text).event())
+            await client.write_event(SynthesizeStop().event())
+            first_text = first_text or (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        sender = asyncio.create_task(send())
+        audio_start = None
+        arrivals: list[tuple[float, float]] = []
+        try:
+            while True:
+                event = await client.read_event()
+                now = (time.perf_counter() - start) * 1000
+                if event is None:
+                    raise ConnectionError("bridge closed the connection mid-utterance")
+                if AudioStart.is_type(event.type) and audio_start is None:
+                    audio_start = now
+                elif AudioChunk.is_type(event.type):
+                    chunk = AudioChunk.from_event(event)
+                    arrivals.append((now, len(chunk.audio) * 1000 / (chunk.rate * chunk.width * chunk.channels)))
+                elif (AudioStop.is_type(event.type) and word_ms is None) or SynthesizeStopped.is_type(event.type):
+                    break
+            await sender
+        finally:
+            sender.cancel()
+
+    return {
+        "text": text,
+        "streamed": word_ms is not None,
+        "describe_ms": describe,
+        "first_text_ms": first_text,
+        "audio_start_ms": audio_start,
+        "first_audio_ms": arrivals[0][0] if arrivals else None,
+        "total_ms": now,
+        "chunks": len(arrivals),
+        **_cadence(arrivals),
+    }
+
+
+async def _run_pipeline(args, bridge: str, f5_url: str, kokoro_url: str, corpus: list[str]) -> dict:
+    port = _free_port()
+    metrics_port = _free_port()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(Path(__file__).with_name(BRIDGES[bridge])),
+        "--uri", f"tcp://127.0.0.1:{port}",
+        "--metrics-port", str(metrics_port),
+        "--log-level", "WARNING",
+        *_pipeline_bridge_args(bridge, f5_url, kokoro_url),
+    )
+    metrics_url = f"http://127.0.0.1:{metrics_port}/metrics"
+    word_ms = args.word_ms if args.stream else None
+    rows = []
+    try:
+        # The first utterance waits for the bridge to listen and opens
+        # its backend connections; it isn't counted
+        for _ in range(100):
+            try:
+                await _pipeline_utterance(port, bridge, corpus[0], word_ms)
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        else:
+            raise SystemExit(f"{BRIDGES[bridge]} did not come up on port {port}")
+
+        async with httpx.AsyncClient(timeout=TIMEOUT) as scraper:
+            for _ in range(args.repeat):
+                for text in corpus:
+                    before = await _scrape_first_byte(scraper, metrics_url)
+                    row = await _pipeline_utterance(port, bridge, text, word_ms)
+                    after = await _scrape_first_byte(scraper, metrics_url)
+                    # Kokoro fans long replies out by sentence and the
+                    # router may hedge, so there can be several backend
+                    # requests per utterance; their first bytes are averaged
+                    row["backend_requests"] = int(after[1] - before[1])
+                    row["backend_ttfb_ms"] = row["bridge_ms"] = None
+                    if row["backend_requests"]:
+                        row["backend_ttfb_ms"] = (after[0] - before[0]) * 1000 / row["backend_requests"]
+                        if row["first_audio_ms"] is not None:
+                            row["bridge_ms"] = (
+                                row["first_audio_ms"] - row["first_text_ms"] - row["backend_ttfb_ms"]
+                            )
+                    rows.append(row)
+    finally:
+        proc.terminate()
+        await proc.wait()
+
+    summary = {}
+    for stage in STAGES:
+        values = sorted(row[stage] for row in rows if row[stage] is not None)
+        if values:
+            summary[stage] = {
+                "p50": round(values[len(values) // 2], 1),
+                "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 1),
+            }
+    return {"bridge": bridge, "summary": summary, "utterances": rows}
+
+
+async def cmd_pipeline(args) -> None:
+    bridges = [name.strip() for name in args.bridges.split(",") if name.strip()]
+    unknown = set(bridges) - set(BRIDGES)
+    if unknown:
+        raise SystemExit(f"--bridges: unknown {', '.join(sorted(unknown))} (choose from {', '.join(BRIDGES)})")
+    corpus = CORPUS
+    if args.corpus:
+        corpus = [
+            line.strip()
+            for line in Path(args.corpus).read_text().splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+
+    server = kokoro = None
+    f5_url, kokoro_url = args.f5_url, args.kokoro_url
+    with tempfile.TemporaryDirectory(prefix="wyoming-bench-") as workdir:
+        try:
+            if not f5_url and {"f5", "router"} & set(bridges):
+                server, f5_url = await _start_tts_server(args, Path(workdir))
+            if not kokoro_url and {"kokoro", "router"} & set(bridges):
+                kokoro = SpeechStub(args.kokoro_latency_ms, args.kokoro_rtf)
+                await kokoro.start()
+                kokoro_url = kokoro.url
+            results = [await _run_pipeline(args, name, f5_url, kokoro_url, corpus) for name in bridges]
+        finally:
+            if kokoro is not None:
+                await kokoro.stop()
+            if server is not None:
+                server.terminate()
+                await server.wait()
+
+    mode = f"streamed a word every {args.word_ms:g}ms" if args.stream else "Synthesize"
+    print(f"{len(corpus)} utterances x {args.repeat}, {mode}")
+    print(f"  f5: {args.f5_url or f'tts-server stub model ({args.stub_model})'}")
+    print(
+        f"  kokoro: {args.kokoro_url or f'stub, {args.kokoro_latency_ms:g}ms to first audio, rtf {args.kokoro_rtf:g}'}"
+    )
+    header = f"{'stage (ms)':<16}" + "".join(
+        f"{result['bridge'] + ' p50':>13}{result['bridge'] + ' p95':>13}" for result in results
+    )
+    print(header)
+    for stage in STAGES:
+        cells = "".join(
+            f"{result['summary'].get(stage, {}).get('p50', '-'):>13}"
+            f"{result['summary'].get(stage, {}).get('p95', '-'):>13}"
+            for result in results
+        )
+        print(f"{stage[:-3]:<16}{cells}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pool = sub.add_parser("pool", help="Per-request vs pooled HTTP client overhead")
+    pool.add_argument("--requests", type=int, default=200, help="Utterances per mode (default: 200)")
+    pool.add_argument("--concurrency", type=int, default=1, help="Utterances in flight (default: 1)")
+    pool.add_argument(
+        "--url",
+        help="Benchmark a real backend (e.g. http://127.0.0.1:8881) instead of the stub",
+    )
+    pool.add_argument("--voice", default="af_heart", help="Voice for --url backends (default: af_heart)")
+    pool.add_argument("--audio-ms", type=int, default=1000, help="Stub audio per utterance (default: 1000)")
+    pool.add_argument("--chunk-ms", type=int, default=340, help="Stub chunk size (default: 340)")
+    pool.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Stub delay before first audio (default: 0)"
+    )
+    pool.add_argument("--json", help="Also write results to this file")
+    pool.set_defaults(func=cmd_pool)
+
+    reframe = sub.add_parser("reframe", help="AudioChunk events and CPU with and without re-framing")
+    reframe.add_argument(
+        "--bridge",
+        type=Path,
+        default=Path(__file__).with_name("wyoming-kokoro.py"),
+        help="Bridge script to run (default: wyoming-kokoro.py next to this one)",
+    )
+    reframe.add_argument(
+        "--frame-ms", default="60", help="Comma-separated frame durations to compare (default: 60)"
+    )
+    reframe.add_argument("--utterances", type=int, default=50, help="Utterances per run (default: 50)")
+    reframe.add_argument("--audio-ms", type=int, default=3060, help="Audio per utterance (default: 3060)")
+    reframe.add_argument(
+        "--fragment-bytes",
+        type=int,
+        default=1500,
+        help="Largest stub fragment, roughly one TCP segment (default: 1500)",
+    )
+    reframe.add_argument("--json", help="Also write results to this file")
+    reframe.set_defaults(func=cmd_reframe)
+
+    pipeline = sub.add_parser("pipeline", help="Per-stage latency from HA through a bridge to a stub backend")
+    pipeline.add_argument(
+        "--bridges",
+        default="f5,kokoro,router",
+        help="Comma-separated bridges to run: f5, kokoro, router (default: all three)",
+    )
+    pipeline.add_argument("--corpus", help="Utterances to synthesize, one per line (default: built in)")
+    pipeline.add_argument("--repeat", type=int, default=3, help="Passes over the corpus (default: 3)")
+    pipeline.add_argument(
+        "--stream",
+        action="store_true",
+        help="Send text as SynthesizeStart/Chunk/Stop, like a conversation agent",
+    )
+    pipeline.add_argument(
+        "--word-ms", type=float, default=40, help="With --stream, ms between words (default: 40)"
+    )
+    pipeline.add_argument(
+        "--server",
+        type=Path,
+        default=Path(__file__).with_name("tts-server.py"),
+        help="tts-server script (default: tts-server.py next to this one)",
+    )
+    pipeline.add_argument(
+        "--server-python",
+        default=sys.executable,
+        help="Interpreter with tts-server's dependencies (default: this one)",
+    )
+    pipeline.add_argument(
+        "--stub-model",
+        default="first=0.25,rtf=0.1,cps=15",
+        help="TTS_STUB_MODEL for tts-server (default: first=0.25,rtf=0.1,cps=15)",
+    )
+    pipeline.add_argument(
+        "--kokoro-latency-ms",
+        type=float,
+        default=80,
+        help="Kokoro stub delay before first audio (default: 80)",
+    )
+    pipeline.add_argument(
+        "--kokoro-rtf",
+        type=float,
+        default=0.05,
+        help="Kokoro stub generation time per second of audio (default: 0.05)",
+    )
+    pipeline.add_argument("--f5-url", help="Use this F5-TTS server instead of starting tts-server")
+    pipeline.add_argument("--kokoro-url", help="Use this Kokoro server instead of the stub")
+    pipeline.add_argument("--json", help="Also write per-utterance results to this file")
+    pipeline.set_defaults(func=cmd_pipeline)
+
+    args = parser.parse_args()
+    asyncio.run(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,45 +10,172 @@ Pipeline:
   HA (Wyoming Synthesize)
     -> this server: POST F5-TTS /v1/audio/speech with stream=True
     -> read raw PCM s16le mono 24kHz chunks
-    -> forward each as Wyoming AudioChunk events
+    -> re-cut into --frame-ms AudioChunk events (default 60ms)
     -> emit AudioStart at the beginning, AudioStop at the end
 
-This is intentionally a thin protocol translator: no buffering, no
-re-encoding. F5-TTS's streaming chunk size (~340ms) is forwarded
-verbatim.
+  HA (Wyoming SynthesizeStart, SynthesizeChunk..., SynthesizeStop)
+    -> this server: one F5-TTS /v1/audio/stream WebSocket session; each
+       text chunk is forwarded as it arrives, tts-server splits sentences
+       and synthesizes each as soon as it's complete
+    -> session audio as AudioChunk events between one AudioStart and
+       AudioStop, then SynthesizeStopped
+
+Streaming text: we advertise supports_synthesize_streaming, so HA sends
+an LLM reply as it's generated and speech starts with the first
+sentence instead of after the last. The plain Synthesize HA repeats
+inside a streaming request (for older servers) is ignored. Needs the
+websockets package; without it, or if the session can't be opened,
+streamed text is collected and synthesized over HTTP at SynthesizeStop.
+
+Audio is never re-encoded: F5-TTS streams ~340ms chunks of the PCM HA
+wants, but what arrives from the socket is whatever each read returned,
+sometimes splitting a sample; AudioReframer turns that into whole-sample
+frames of a fixed duration. `wyoming-bench.py reframe` measures the
+events and CPU time that saves per utterance.
+
+The plumbing that isn't specific to F5-TTS is shared with
+wyoming-kokoro.py and wyoming-tts-router.py through wyoming_common.py,
+which has to be importable: next to this script, or on PYTHONPATH as
+hosts/skaia/voice.nix sets it.
 
 Cold starts: F5-TTS lazily loads its model on first request (~5-10s on
-GPU). The Wyoming client (HA) just waits during that window. Subsequent
-requests are warm. We do not pre-warm here; pre-warming would extend
-service startup time and add little value because HA also blocks on the
-first request anyway.
+GPU, a few seconds back from host RAM after TTS_KEEP_ALIVE), and HA
+just waits during that window. Warm-ups move the load ahead of the
+request: POST /v1/audio/warmup starts it and returns at once, sent in
+the background on the triggers configured (--warm-on connect/describe:
+HA opening a connection, which it does right before speaking, notably
+at SynthesizeStart while the LLM is still writing; --warm-interval
+within --warm-hours: never idle long enough for the keep-alive to
+offload it while people are about; --warm-file: a file something local
+touches on a wake word). Triggers within --warm-debounce of the last
+warm-up or request are dropped. tts-server reports the model state each
+request and stream session found, and wyoming_backend_state_total on
+--metrics-port counts them as warm or cold: that's the number to watch
+when tuning the triggers. Nothing warms at startup unless a trigger
+fires (prefetching hot phrases, below, loads the model as a side
+effect, in the background).
+
+Failing fast: a CircuitBreaker tracks F5-TTS health. Transport errors
+and 5xx answers (not 503, which is admission control shedding load)
+count as failures, and so do failed /health probes, which run every
+--health-interval seconds. After --breaker-failures in a row, Synthesize
+gets empty audio at once instead of after the connect/read timeouts;
+after --breaker-cooldown one trial request is let through, and a /health
+answer closes the breaker straight away. Transitions are logged and
+exported as wyoming_breaker_state. For failing over to another backend
+rather than going quiet, use wyoming-tts-router.py.
 
 Voices: F5-TTS reads voice reference files from /var/lib/tts/voices/.
 This wrapper does not introspect the directory; it advertises a fixed
 list of voices (default: ["nature"]) passed via --voices. Add new voices
 by extending the CLI flag once the underlying .wav/.txt files exist.
+
+Connections: one httpx.AsyncClient per bridge process, created in
+main() and closed on shutdown, so consecutive utterances reuse a
+kept-alive connection instead of paying client construction and a TCP
+handshake each. Pool limits are flags; --http2 is there for an https
+upstream (it needs the h2 package, and neither local server speaks
+HTTP/2 today). `wyoming-bench.py pool` measures the difference.
+
+Read-ahead: the backend reader and the writer to HA are separate tasks
+joined by a ReadAhead buffer of up to --read-ahead-s of audio, so a
+slow satellite no longer paces the backend read and holds the TTS
+server's generator (and its GPU slot) for the length of playback. The
+per-utterance high-water mark is in the "synthesize done" log line and
+wyoming_read_ahead_high_water_seconds; wyoming_read_ahead_full_total
+counts reads that hit the bound.
+
+Phrase cache: with --cache-dir, texts up to --cache-max-chars are kept
+as raw PCM on disk, keyed by (backend, voice, text), and a repeat is
+replayed as Wyoming events without touching F5-TTS, so first audio is
+a disk read away rather than a synthesis. --hot-phrases names a file of
+phrases HA says all the time; missing ones are synthesized at startup
+in the background (as bulk priority at high quality, so they never
+queue ahead of a live request or get cached at a degraded step count).
+Bounded by --cache-max-mb (least recently used out first) and
+--cache-ttl-days (so a re-recorded voice reference takes effect).
+
+Metrics (--metrics-port, Prometheus text format): per request,
+wyoming_backend_first_byte_seconds (streamed: from the first complete
+sentence), wyoming_synthesis_seconds (Synthesize to AudioStop) and wyoming_audio_seconds, the latter two by source
+(cache, backend, stream, failed); wyoming_backend_errors_total by HTTP
+status or exception; the wyoming_synthesize_active gauge; and per-voice
+request, character and audio-second counters. Next to tts-server's own
+tts_* series that splits an utterance's latency between bridge and
+backend. The warm-up, breaker and read-ahead series live there too.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import json
 import logging
+import re
+import signal
+import time
 from functools import partial
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
 
 import httpx
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.event import Event
 from wyoming.info import Attribution, Describe, Info, TtsProgram, TtsVoice
 from wyoming.server import AsyncEventHandler, AsyncServer
-from wyoming.tts import Synthesize
+from wyoming.tts import (
+    Synthesize,
+    SynthesizeChunk,
+    SynthesizeStart,
+    SynthesizeStop,
+    SynthesizeStopped,
+    SynthesizeVoice,
+)
+
+from wyoming_common import (
+    CHANNELS,
+    SAMPLE_RATE_HZ,
+    SAMPLE_WIDTH_BYTES,
+    WARM_TRIGGERS,
+    AudioReframer,
+    CircuitBreaker,
+    PhraseCache,
+    ReadAhead,
+    Warmer,
+    count_backend_error,
+    load_phrases,
+    metrics,
+    observe_read_ahead,
+    observe_synthesis,
+    parse_hours,
+    prefetch,
+    probe_health,
+    serve_metrics,
+)
+
+# Streaming text input goes over tts-server's WebSocket. Without the
+# library, streamed text is collected and synthesized in one request.
+try:
+    import websockets
+except ImportError:
+    websockets = None
 
 LOG = logging.getLogger("wyoming-f5-tts")
 
-# F5-TTS streams native PCM at this format. Hardcoded; F5-TTS won't change it.
-SAMPLE_RATE_HZ = 24000
-SAMPLE_WIDTH_BYTES = 2  # s16le
-CHANNELS = 1
+# Where tts-server's streaming session ends a sentence and starts on it
+# (StreamingSession.SENTENCE_END); streamed first-byte times count from
+# the text that completes the first one
+SENTENCE_END = re.compile(r"[.!?](?:\s|$)")
+
+
+def speech_payload(text: str, voice: str) -> dict:
+    return {
+        "input": text,
+        "voice": voice,
+        "stream": True,
+        "speed": 1.0,
+    }
 
 
 class F5TTSHandler(AsyncEventHandler):
@@ -60,13 +187,39 @@ class F5TTSHandler(AsyncEventHandler):
         f5_url: str,
         voices: list[str],
         default_voice: str,
+        client: httpx.AsyncClient,
+        frame_ms: int,
+        read_ahead_bytes: int,
+        cache: Optional[PhraseCache],
+        warmer: Warmer,
+        breaker: CircuitBreaker,
         **kwargs,
     ) -> None:
         super().__init__(*args, **kwargs)
         self._f5_url = f5_url.rstrip("/")
         self._voices = voices
         self._default_voice = default_voice
+        self._client = client
+        self._frame_ms = frame_ms
+        self._read_ahead_bytes = read_ahead_bytes
+        self._cache = cache
+        self._warmer = warmer
+        self._breaker = breaker
         self._info = self._build_info()
+        # HA only connects when it has something to say (or to Describe)
+        warmer.poke("connect")
+        # Streaming synthesis (SynthesizeStart .. SynthesizeStop) state
+        self._streaming = False
+        self._stream_voice = default_voice
+        self._stream_text: list[str] = []
+        self._ws = None
+        self._receiver: Optional[asyncio.Task] = None
+        # When the session's first sentence was complete, for the
+        # first-byte time
+        self._stream_sent: Optional[float] = None
+        # Where the current request's audio came from, and how much of it
+        self._outcome: tuple[str, int] = ("failed", 0)
+        self._stream_started = 0.0
 
     def _build_info(self) -> Info:
         attribution = Attribution(
@@ -81,6 +234,7 @@ class F5TTSHandler(AsyncEventHandler):
                     attribution=attribution,
                     installed=True,
                     version="0.1.0",
+                    supports_synthesize_streaming=True,
                     voices=[
                         TtsVoice(
                             name=v,
@@ -99,83 +253,341 @@ class F5TTSHandler(AsyncEventHandler):
     async def handle_event(self, event: Event) -> bool:
         if Describe.is_type(event.type):
             LOG.debug("describe -> info")
+            self._warmer.poke("describe")
             await self.write_event(self._info.event())
             return True
 
         if Synthesize.is_type(event.type):
+            if self._streaming:
+                # HA repeats the whole text as a plain Synthesize inside a
+                # streaming request, for servers that don't stream
+                return True
             request = Synthesize.from_event(event)
-            voice = self._default_voice
-            if request.voice is not None and request.voice.name:
-                voice = request.voice.name
-            await self._synthesize(request.text, voice)
+            voice = self._pick_voice(request.voice)
+            started = time.monotonic()
+            self._outcome = ("failed", 0)
+            metrics.inc("wyoming_synthesize_active")
+            try:
+                await self._synthesize(request.text, voice)
+            finally:
+                metrics.inc("wyoming_synthesize_active", -1)
+            observe_synthesis(
+                self._voice_label(voice), started, len(request.text), *self._outcome
+            )
+            return True
+
+        if SynthesizeStart.is_type(event.type):
+            if self._streaming:
+                # A second start before SynthesizeStop would orphan the
+                # open stream and count it twice; its text joins this one
+                LOG.warning("SynthesizeStart while already streaming, ignored")
+                return True
+            start = SynthesizeStart.from_event(event)
+            self._stream_started = time.monotonic()
+            self._outcome = ("failed", 0)
+            metrics.inc("wyoming_synthesize_active")
+            await self._stream_start(self._pick_voice(start.voice))
+            return True
+
+        if SynthesizeChunk.is_type(event.type):
+            if self._streaming:
+                await self._stream_chunk(SynthesizeChunk.from_event(event).text)
+            return True
+
+        if SynthesizeStop.is_type(event.type):
+            if self._streaming:
+                try:
+                    await self._stream_stop()
+                finally:
+                    metrics.inc("wyoming_synthesize_active", -1)
+                observe_synthesis(
+                    self._voice_label(self._stream_voice), self._stream_started,
+                    sum(map(len, self._stream_text)), *self._outcome,
+                )
             return True
 
         # Unhandled event types: keep the connection alive and ignore.
         return True
 
+    def _pick_voice(self, requested: Optional[SynthesizeVoice]) -> str:
+        if requested is not None and requested.name:
+            return requested.name
+        return self._default_voice
+
+    def _voice_label(self, voice: str) -> str:
+        """
+        Voice for the metrics: HA may ask for any name and it's passed
+        through, but only advertised voices get a series of their own.
+        """
+        return voice if voice in self._voices else "other"
+
+    async def _stream_start(self, voice: str) -> None:
+        """
+        Open a tts-server WebSocket session for the streamed text. The
+        server splits sentences and synthesizes each as soon as it's
+        complete, so audio starts while HA's agent is still writing.
+        """
+        LOG.info("stream start voice=%s", voice)
+        self._streaming = True
+        self._stream_voice = voice
+        self._stream_text = []
+        self._stream_sent = None
+        if websockets is None:
+            return
+        if not self._breaker.allow():
+            LOG.warning("F5-TTS breaker %s, buffering text instead", self._breaker.state)
+            return
+        query = urlencode({"voice": voice, "speed": 1.0})
+        url = self._f5_url.replace("http", "ws", 1) + f"/v1/audio/stream?{query}"
+        try:
+            ws = await websockets.connect(url, open_timeout=5.0)
+            info = json.loads(await ws.recv())
+        except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as exc:
+            LOG.error("F5-TTS stream session failed, buffering text instead: %s", exc)
+            count_backend_error(exc)
+            self._breaker.failure(f"stream session: {type(exc).__name__}")
+            return
+        self._breaker.success()
+        if info.get("type") != "session_start":
+            LOG.error("F5-TTS refused stream session, buffering text instead: %s", info)
+            await ws.close()
+            return
+        self._ws = ws
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        # The model loads on the first sentence; the session says how it
+        # was found, and the receiver counts it once audio arrives
+        self._receiver = asyncio.create_task(self._stream_audio(ws, info.get("model_state")))
+
+    async def _stream_chunk(self, text: str) -> None:
+        self._stream_text.append(text)
+        if self._ws is None or not text:
+            return
+        if self._stream_sent is None and SENTENCE_END.search("".join(self._stream_text[-2:])):
+            self._stream_sent = time.monotonic()
+        try:
+            await self._ws.send(text)
+        except websockets.exceptions.ConnectionClosed as exc:
+            LOG.error("F5-TTS stream closed while sending text: %s", exc)
+
+    async def _stream_stop(self) -> None:
+        ws, receiver = self._ws, self._receiver
+        self._streaming = False
+        self._ws = self._receiver = None
+        if ws is None:
+            # No session: synthesize everything we were given in one go
+            await self._synthesize("".join(self._stream_text), self._stream_voice)
+        else:
+            if self._stream_sent is None:
+                self._stream_sent = time.monotonic()  # the server flushes what's left
+            try:
+                await ws.send("")  # end of input; server finishes, then session_end
+            except websockets.exceptions.ConnectionClosed:
+                pass
+            chunks, bytes_streamed = await receiver
+            await ws.close()
+            await self.write_event(AudioStop().event())
+            self._outcome = ("stream" if bytes_streamed else "failed", bytes_streamed)
+            LOG.info(
+                "stream done voice=%s chars=%d bytes=%d chunks=%d ~duration=%.2fs",
+                self._stream_voice, sum(map(len, self._stream_text)),
+                bytes_streamed, chunks,
+                bytes_streamed / (SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS),
+            )
+        await self.write_event(SynthesizeStopped().event())
+
+    async def _stream_audio(self, ws, model_state: Optional[str]) -> tuple[int, int]:
+        """Forward session audio until session_end: (chunks, bytes)."""
+        reframer = AudioReframer(self._frame_ms)
+        chunks = bytes_streamed = 0
+        counted = False
+        try:
+            async for message in ws:
+                if isinstance(message, bytes):
+                    if not counted and self._stream_sent is not None:
+                        # Not from SynthesizeStart: HA's agent may take a
+                        # while to write the first sentence
+                        first_byte = time.monotonic() - self._stream_sent
+                        metrics.observe("wyoming_backend_first_byte_seconds", first_byte)
+                        self._warmer.observe(model_state, first_byte)
+                        counted = True
+                    for frame in reframer.feed(message):
+                        bytes_streamed += len(frame)
+                        chunks += 1
+                        await self._write_audio(frame)
+                    continue
+                info = json.loads(message)
+                if info.get("type") == "session_end":
+                    break
+                if info.get("type") in ("busy", "error"):
+                    LOG.error("F5-TTS ended the stream session: %s", info)
+                    count_backend_error(f"stream {info['type']}")
+                    if info["type"] == "error":
+                        self._breaker.failure("stream session error")
+                    break
+        except websockets.exceptions.ConnectionClosed as exc:
+            LOG.error("F5-TTS stream session dropped: %s", exc)
+            count_backend_error(exc)
+            self._breaker.failure("stream session dropped")
+        if not counted:
+            self._warmer.observe(model_state, None)
+        tail = reframer.flush()
+        if tail:
+            bytes_streamed += len(tail)
+            chunks += 1
+            await self._write_audio(tail)
+        return chunks, bytes_streamed
+
+    async def disconnect(self) -> None:
+        if self._streaming:
+            self._streaming = False
+            metrics.inc("wyoming_synthesize_active", -1)
+        # HA hung up mid-stream: don't leave the session generating
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+
     async def _synthesize(self, text: str, voice: str) -> None:
         LOG.info("synthesize voice=%s len=%d", voice, len(text))
+        cache = self._cache if self._cache is not None and self._cache.cacheable(text) else None
+        if cache is not None:
+            audio = cache.get(self._f5_url, voice, text)
+            if audio is not None:
+                await self._replay(audio)
+                self._outcome = ("cache", len(audio))
+                LOG.info("synthesize done voice=%s from cache bytes=%d", voice, len(audio))
+                return
+
+        if not self._breaker.allow():
+            # Known down: empty audio now rather than after the timeouts
+            LOG.warning("F5-TTS breaker %s, failing fast for voice=%s", self._breaker.state, voice)
+            await self._emit_empty_audio()
+            return
+
         url = f"{self._f5_url}/v1/audio/speech"
-        payload = {
-            "input": text,
-            "voice": voice,
-            "stream": True,
-            "speed": 1.0,
-        }
-
-        # Generous timeout: cold-start model load can take ~10s on GPU.
-        # Within a single response, httpx applies the read timeout per
-        # chunk, not over the whole stream, which suits our use case.
-        timeout = httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0)
+        payload = speech_payload(text, voice)
+        if cache is not None:
+            # Kept for a week: auto mustn't store a degraded take
+            payload["quality"] = "high"
+        started = time.monotonic()
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                async with client.stream("POST", url, json=payload) as resp:
-                    if resp.status_code != 200:
-                        body = (await resp.aread()).decode("utf-8", "replace")
-                        LOG.error(
-                            "F5-TTS returned HTTP %s for voice=%s: %s",
-                            resp.status_code, voice, body[:300],
-                        )
-                        # We can't recover the synthesis; emit empty audio so
-                        # HA's pipeline doesn't hang waiting for AudioStop.
-                        await self._emit_empty_audio()
-                        return
-
-                    await self.write_event(
-                        AudioStart(
-                            rate=SAMPLE_RATE_HZ,
-                            width=SAMPLE_WIDTH_BYTES,
-                            channels=CHANNELS,
-                        ).event()
-                    )
-
-                    bytes_streamed = 0
-                    async for chunk in resp.aiter_bytes():
-                        if not chunk:
-                            continue
-                        bytes_streamed += len(chunk)
-                        await self.write_event(
-                            AudioChunk(
-                                rate=SAMPLE_RATE_HZ,
-                                width=SAMPLE_WIDTH_BYTES,
-                                channels=CHANNELS,
-                                audio=chunk,
-                            ).event()
-                        )
-
-                    await self.write_event(AudioStop().event())
-                    duration_s = bytes_streamed / (
-                        SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
-                    )
-                    LOG.info(
-                        "synthesize done voice=%s bytes=%d ~duration=%.2fs",
-                        voice, bytes_streamed, duration_s,
+            async with self._client.stream("POST", url, json=payload) as resp:
+                self._breaker.record(resp.status_code)
+                if resp.status_code != 200:
+                    count_backend_error(resp.status_code)
+                    body = (await resp.aread()).decode("utf-8", "replace")
+                    LOG.error(
+                        "F5-TTS returned HTTP %s for voice=%s: %s",
+                        resp.status_code, voice, body[:300],
                     )
+                    # We can't recover the synthesis; emit empty audio so
+                    # HA's pipeline doesn't hang waiting for AudioStop.
+                    await self._emit_empty_audio()
+                    return
+
+                await self.write_event(
+                    AudioStart(
+                        rate=SAMPLE_RATE_HZ,
+                        width=SAMPLE_WIDTH_BYTES,
+                        channels=CHANNELS,
+                    ).event()
+                )
+
+                reframer = AudioReframer(self._frame_ms)
+                kept: Optional[list[bytes]] = [] if cache is not None else None
+                buffer = ReadAhead(self._read_ahead_bytes)
+                writer = asyncio.create_task(self._play(buffer, reframer, kept))
+                first_byte: Optional[float] = None
+                try:
+                    async for data in resp.aiter_bytes():
+                        if first_byte is None:
+                            first_byte = time.monotonic() - started
+                            metrics.observe("wyoming_backend_first_byte_seconds", first_byte)
+                            self._warmer.observe(resp.headers.get("X-TTS-Model-State"), first_byte)
+                        await buffer.put(data)
+                        if writer.done():
+                            break  # HA went away; the await below says why
+                except BaseException:
+                    writer.cancel()
+                    raise
+                finally:
+                    buffer.close()
+                chunks, bytes_streamed = await writer
+                read_ahead_s = observe_read_ahead(buffer)
+                tail = reframer.flush()
+                if tail:
+                    bytes_streamed += len(tail)
+                    chunks += 1
+                    await self._write_audio(tail)
+                    if kept is not None:
+                        kept.append(tail)
+
+                await self.write_event(AudioStop().event())
+                if kept is not None:
+                    cache.put(self._f5_url, voice, text, b"".join(kept))
+                self._outcome = ("backend", bytes_streamed)
+                duration_s = bytes_streamed / (
+                    SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
+                )
+                LOG.info(
+                    "synthesize done voice=%s bytes=%d chunks=%d ~duration=%.2fs "
+                    "read_ahead=%.1fs",
+                    voice, bytes_streamed, chunks, duration_s, read_ahead_s,
+                )
         except httpx.HTTPError as exc:
             LOG.exception("F5-TTS request failed: %s", exc)
+            count_backend_error(exc)
+            self._breaker.error(exc)
             await self._emit_empty_audio()
 
+    async def _play(
+        self, buffer: ReadAhead, reframer: AudioReframer, kept: Optional[list[bytes]]
+    ) -> tuple[int, int]:
+        """Write buffer's audio to HA until it closes: (chunks, bytes)."""
+        chunks = bytes_streamed = 0
+        while (data := await buffer.get()) is not None:
+            for frame in reframer.feed(data):
+                bytes_streamed += len(frame)
+                chunks += 1
+                await self._write_audio(frame)
+                if kept is not None:
+                    kept.append(frame)
+        return chunks, bytes_streamed
+
+    async def _replay(self, audio: bytes) -> None:
+        """Send cached PCM as one utterance, framed like a live one."""
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        reframer = AudioReframer(self._frame_ms)
+        for frame in reframer.feed(audio):
+            await self._write_audio(frame)
+        tail = reframer.flush()
+        if tail:
+            await self._write_audio(tail)
+        await self.write_event(AudioStop().event())
+
+    async def _write_audio(self, audio: bytes) -> None:
+        await self.write_event(
+            AudioChunk(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+                audio=audio,
+            ).event()
+        )
+
     async def _emit_empty_audio(self) -> None:
         """Send a minimal AudioStart/AudioStop pair so HA doesn't hang."""
         await self.write_event(
@@ -210,6 +622,141 @@ async def main() -> None:
         default="nature",
         help="Voice to use when client does not specify one",
     )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=10,
+        help="Most concurrent connections to the backend (default: 10)",
+    )
+    parser.add_argument(
+        "--max-keepalive",
+        type=int,
+        default=5,
+        help="Idle connections kept open for reuse (default: 5)",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=60.0,
+        help="Seconds an idle connection is kept (default: 60)",
+    )
+    parser.add_argument(
+        "--frame-ms",
+        type=int,
+        default=60,
+        help="Duration of each AudioChunk sent to HA; 0 forwards backend "
+        "chunks as they arrive (default: 60)",
+    )
+    parser.add_argument(
+        "--read-ahead-s",
+        type=float,
+        default=30,
+        help="Audio to buffer between the backend and HA, so a slow "
+        "satellite doesn't hold up the backend (default: 30)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep synthesized phrases here and replay repeats (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=64,
+        help="Phrase cache size bound, least recently used out first (default: 64)",
+    )
+    parser.add_argument(
+        "--cache-max-chars",
+        type=int,
+        default=200,
+        help="Only cache texts up to this long (default: 200)",
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=7,
+        help="Re-synthesize cached phrases older than this (default: 7)",
+    )
+    parser.add_argument(
+        "--hot-phrases",
+        help='File of phrases ("text" or "voice|text" per line) to prefetch '
+        "into the cache at startup",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Negotiate HTTP/2 with an https backend (needs the h2 package)",
+    )
+    parser.add_argument(
+        "--warm-on",
+        default="",
+        help="Comma-separated warm-up triggers: connect, describe (default: none)",
+    )
+    parser.add_argument(
+        "--warm-interval",
+        type=float,
+        default=0,
+        help="Warm up whenever the backend has been idle this many seconds; "
+        "keep it under the backend's keep-alive (default: 0, off)",
+    )
+    parser.add_argument(
+        "--warm-hours",
+        default="0-24",
+        help="Local hours START-END in which --warm-interval applies (default: 0-24)",
+    )
+    parser.add_argument(
+        "--warm-file",
+        help="Warm up whenever this file is touched (e.g. on a wake word)",
+    )
+    parser.add_argument(
+        "--warm-debounce",
+        type=float,
+        default=60,
+        help="Skip warm-ups within this many seconds of the last warm-up or "
+        "request (default: 60)",
+    )
+    parser.add_argument(
+        "--cold-ms",
+        type=float,
+        default=2000,
+        help="Count a request as cold if its first audio took longer than this, "
+        "when the backend doesn't say (default: 2000)",
+    )
+    parser.add_argument(
+        "--health-interval",
+        type=float,
+        default=10,
+        help="Seconds between backend /health probes; 0 disables them (default: 10)",
+    )
+    parser.add_argument(
+        "--health-timeout",
+        type=float,
+        default=2,
+        help="Seconds a /health probe may take before it counts as failed (default: 2)",
+    )
+    parser.add_argument(
+        "--breaker-failures",
+        type=int,
+        default=3,
+        help="Consecutive backend failures that open its circuit breaker (default: 3)",
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=30,
+        help="Seconds an open breaker fails fast before letting a trial request "
+        "through (default: 30)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics over HTTP on this port (default: 0, off)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Address for --metrics-port (default: 127.0.0.1)",
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -230,20 +777,126 @@ async def main() -> None:
             f"--default-voice {args.default_voice!r} must be one of {voices}"
         )
 
+    cache = None
+    if args.cache_dir:
+        cache = PhraseCache(
+            Path(args.cache_dir),
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            max_chars=args.cache_max_chars,
+            ttl=args.cache_ttl_days * 86400,
+        )
+        LOG.info("phrase cache %s holds %d", args.cache_dir, len(cache))
+    phrases = []
+    if args.hot_phrases:
+        if cache is None:
+            raise SystemExit("--hot-phrases needs --cache-dir")
+        phrases = load_phrases(Path(args.hot_phrases), args.default_voice)
+
+    triggers = {t.strip() for t in args.warm_on.split(",") if t.strip()}
+    if triggers - WARM_TRIGGERS:
+        raise SystemExit(f"--warm-on: unknown trigger(s) {sorted(triggers - WARM_TRIGGERS)}")
+    if args.warm_interval:
+        triggers.add("schedule")
+    if args.warm_file:
+        triggers.add("file")
+    hours = parse_hours(args.warm_hours)
+    if args.breaker_failures < 1:
+        raise SystemExit("--breaker-failures must be at least 1")
+    if args.read_ahead_s <= 0:
+        raise SystemExit("--read-ahead-s must be positive")
+
     LOG.info(
         "starting wyoming-f5-tts uri=%s f5_url=%s voices=%s default=%s",
         args.uri, args.f5_url, voices, args.default_voice,
     )
 
+    # Generous timeout: cold-start model load can take ~10s on GPU.
+    # Within a single response, httpx applies the read timeout per
+    # chunk, not over the whole stream, which suits our use case.
+    try:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0),
+            limits=httpx.Limits(
+                max_connections=args.max_connections,
+                max_keepalive_connections=args.max_keepalive,
+                keepalive_expiry=args.keepalive_expiry,
+            ),
+            http2=args.http2,
+        )
+    except ImportError as exc:
+        raise SystemExit(f"--http2: {exc}")
+
+    f5_url = args.f5_url.rstrip("/")
+
+    async def warm() -> str:
+        # Starts the load and returns; tts-server says what it found
+        resp = await client.post(f"{f5_url}/v1/audio/warmup")
+        resp.raise_for_status()
+        return resp.json()["state"]
+
+    warmer = Warmer(warm, triggers, args.warm_debounce, args.cold_ms / 1000)
+    breaker = CircuitBreaker("f5", args.breaker_failures, args.breaker_cooldown)
+
     server = AsyncServer.from_uri(args.uri)
-    await server.run(
-        partial(
-            F5TTSHandler,
-            f5_url=args.f5_url,
-            voices=voices,
-            default_voice=args.default_voice,
-        ),
+    run = asyncio.ensure_future(
+        server.run(
+            partial(
+                F5TTSHandler,
+                f5_url=args.f5_url,
+                voices=voices,
+                default_voice=args.default_voice,
+                client=client,
+                frame_ms=args.frame_ms,
+                read_ahead_bytes=int(
+                    args.read_ahead_s * SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
+                ),
+                cache=cache,
+                warmer=warmer,
+                breaker=breaker,
+            ),
+        )
     )
+    # systemd stops us with SIGTERM; cancel the server so the pool closes
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, run.cancel)
+
+    async def fetch(backend: str, voice: str, text: str) -> bytes:
+        # bulk so prefetching never queues ahead of someone talking, and
+        # high quality so auto can't cache a degraded take for a week
+        resp = await client.post(
+            f"{backend}/v1/audio/speech",
+            json={**speech_payload(text, voice), "priority": "bulk", "quality": "high"},
+        )
+        resp.raise_for_status()
+        return resp.content
+
+    # In the background: F5 may be cold, and Describe shouldn't wait on it
+    background = []
+    if phrases:
+        background.append(asyncio.ensure_future(
+            prefetch(cache, [(f5_url, voice, text) for voice, text in phrases], fetch)
+        ))
+    if args.warm_interval:
+        background.append(asyncio.ensure_future(warmer.keep_warm(args.warm_interval, hours)))
+    if args.warm_file:
+        background.append(asyncio.ensure_future(warmer.watch(Path(args.warm_file))))
+    if args.health_interval:
+        background.append(asyncio.ensure_future(probe_health(
+            client, f"{f5_url}/health", breaker, args.health_interval, args.health_timeout,
+        )))
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = await serve_metrics(args.metrics_host, args.metrics_port)
+    try:
+        await run
+    except asyncio.CancelledError:
+        LOG.info("shutting down")
+    finally:
+        for task in background:
+            task.cancel()
+        warmer.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        await client.aclose()
 
 
 if __name__ == "__main__":
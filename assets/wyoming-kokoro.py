@@ -11,22 +11,82 @@ Pipeline:
     -> this server: POST /v1/audio/speech with response_format=pcm,
        stream=true
     -> read raw PCM s16le mono 24kHz chunks
-    -> forward each as Wyoming AudioChunk events
+    -> re-cut into --frame-ms AudioChunk events (default 60ms; see
+       AudioReframer)
     -> emit AudioStart at the beginning, AudioStop at the end
-
-This is a near-clone of wyoming-f5-tts.py; kept separate (rather than
-factored into a shared library) because the request-shape diffs are
-small, the failure modes are TTS-engine-specific, and we want either
-backend to keep working when we hack on the other.
+    -> a text of more than one sentence instead fans out like streamed
+       text below: the first sentence is sent at once, the rest follow
+       up to --pipeline-depth in flight, and the audio is reassembled in
+       order. First audio then waits on one sentence, not the whole
+       reply, and later sentences synthesize while earlier ones play
+
+  HA (Wyoming SynthesizeStart, SynthesizeChunk..., SynthesizeStop)
+    -> split the incoming text into sentences (SentenceSplitter)
+    -> one POST per sentence as soon as it's complete, up to
+       --pipeline-depth in flight, so the next sentence is synthesizing
+       while the current one plays
+    -> their audio in sentence order between one AudioStart and
+       AudioStop, then SynthesizeStopped
+
+Streaming text differs from the F5 bridge on purpose: Kokoro-FastAPI has
+no session endpoint, and Kokoro doesn't carry voice context between
+sentences anyway, so independent per-sentence requests lose nothing.
+
+The handler is kept separate from wyoming-f5-tts.py's because the
+request shape, the streaming strategy and the failure modes are
+engine-specific; the plumbing underneath is shared through
+wyoming_common.py, which must be importable (next to this script, or
+on PYTHONPATH as hosts/skaia/voice.nix sets it).
 
 Why Kokoro alongside F5-TTS: see hosts/skaia/kokoro.nix. Short version:
 Kokoro normalizes numbers/dates/times before phonemizing, F5-TTS does
 not. We A/B by switching the HA pipeline's TTS engine, no rebuild
 required.
 
+Failing fast: the same CircuitBreaker and /health probes as the F5
+bridge (--health-interval, --breaker-failures, --breaker-cooldown).
+While it's open, Synthesize gets empty audio at once, and sentences
+(streamed or fanned out) are skipped rather than each waiting out the
+timeouts.
+
 Voices: Kokoro ships ~50 voices (af_heart, af_bella, am_michael, ...).
 We advertise a curated subset via --voices because exposing all 50 in
 HA's pipeline picker is noise. Add more by extending the CLI flag.
+
+Connections: one httpx.AsyncClient per bridge process, created in
+main() and closed on shutdown, so consecutive utterances reuse a
+kept-alive connection instead of paying client construction and a TCP
+handshake each. Pool limits are flags; --http2 is there for an https
+upstream (it needs the h2 package, and neither local server speaks
+HTTP/2 today). `wyoming-bench.py pool` measures the difference.
+
+Read-ahead: the backend reader and the writer to HA are separate tasks
+joined by a ReadAhead buffer of up to --read-ahead-s of audio, so a
+slow satellite no longer paces the backend read and holds the TTS
+server's generator (and its GPU slot) for the length of playback. The
+per-utterance high-water mark is in the "synthesize done" log line and
+wyoming_read_ahead_high_water_seconds; wyoming_read_ahead_full_total
+counts reads that hit the bound. Each fanned-out or streamed sentence
+gets its own buffer.
+
+Phrase cache: with --cache-dir, texts up to --cache-max-chars are kept
+as raw PCM on disk, keyed by (backend, voice, text), and a repeat is
+replayed as Wyoming events without a round trip to Kokoro. Phrases in
+the --hot-phrases file are synthesized into it in the background at
+startup. Bounded by --cache-max-mb (least recently used out first) and
+--cache-ttl-days.
+
+Warm-ups: the same triggers as the F5 bridge (--warm-on, --warm-interval,
+--warm-file, --warm-debounce). Kokoro-FastAPI has no warm-up endpoint
+and keeps its model loaded, so a warm-up is a one-word synthesis, and
+whether a request found it warm is judged by first-byte latency against
+--cold-ms. Mostly that catches the first request after a container
+restart; wyoming_backend_state_total on --metrics-port shows how often
+that is.
+
+Metrics: the same --metrics-port series as the F5 bridge. Fanned-out
+replies are source="sentences", and every sentence request feeds
+wyoming_backend_first_byte_seconds.
 """
 
 from __future__ import annotations
@@ -34,23 +94,95 @@ from __future__ import annotations
 import argparse
 import asyncio
 import logging
+import re
+import signal
+import time
 from functools import partial
+from pathlib import Path
+from typing import Optional
 
 import httpx
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.event import Event
 from wyoming.info import Attribution, Describe, Info, TtsProgram, TtsVoice
 from wyoming.server import AsyncEventHandler, AsyncServer
-from wyoming.tts import Synthesize
+from wyoming.tts import (
+    Synthesize,
+    SynthesizeChunk,
+    SynthesizeStart,
+    SynthesizeStop,
+    SynthesizeStopped,
+    SynthesizeVoice,
+)
+
+from wyoming_common import (
+    CHANNELS,
+    SAMPLE_RATE_HZ,
+    SAMPLE_WIDTH_BYTES,
+    WARM_TRIGGERS,
+    AudioReframer,
+    CircuitBreaker,
+    PhraseCache,
+    ReadAhead,
+    Warmer,
+    count_backend_error,
+    load_phrases,
+    metrics,
+    observe_read_ahead,
+    observe_synthesis,
+    parse_hours,
+    prefetch,
+    probe_health,
+    serve_metrics,
+)
 
 LOG = logging.getLogger("wyoming-kokoro")
 
-# Kokoro-82M outputs at 24 kHz mono. Hardcoded; the model architecture
-# fixes this, and Kokoro-FastAPI's pcm response_format passes it
-# through unchanged.
-SAMPLE_RATE_HZ = 24000
-SAMPLE_WIDTH_BYTES = 2  # s16le
-CHANNELS = 1
+# A sentence ends at terminal punctuation (plus any closing quotes or
+# brackets) followed by whitespace and something that can start a
+# sentence, or at a line break. Pieces shorter than MIN_SENTENCE_CHARS
+# are held and sent with the next one: a request per "Sure." costs more
+# in round trips than it gains in latency.
+SENTENCE_END = re.compile(
+    r"(?<=[.!?\u2026])[\"')\]\u201d\u2019]*\s+(?=[A-Z0-9\"'(\[\u201c\u2018])|\n+"
+)
+MIN_SENTENCE_CHARS = 20
+
+
+class SentenceSplitter:
+    """Accumulate streamed text and hand back complete sentences."""
+
+    def __init__(self) -> None:
+        self._text = ""
+
+    def add(self, text: str) -> list[str]:
+        self._text += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._text):
+            sentence = self._text[start : match.end()].strip()
+            if len(sentence) >= MIN_SENTENCE_CHARS:
+                sentences.append(sentence)
+                start = match.end()
+        self._text = self._text[start:]
+        return sentences
+
+    def finish(self) -> list[str]:
+        rest, self._text = self._text.strip(), ""
+        return [rest] if rest else []
+
+
+def speech_payload(text: str, voice: str, model: str) -> dict:
+    return {
+        "model": model,
+        "input": text,
+        "voice": voice,
+        # Raw 16-bit PCM at 24 kHz mono. Avoids a decode step in the
+        # bridge - we just pass the bytes straight through to HA.
+        "response_format": "pcm",
+        "stream": True,
+        "speed": 1.0,
+    }
 
 
 class KokoroTTSHandler(AsyncEventHandler):
@@ -62,15 +194,46 @@ class KokoroTTSHandler(AsyncEventHandler):
         kokoro_url: str,
         voices: list[str],
         default_voice: str,
+        client: httpx.AsyncClient,
+        frame_ms: int,
+        read_ahead_bytes: int,
+        cache: Optional[PhraseCache],
+        pipeline_depth: int,
         model: str,
+        warmer: Warmer,
+        breaker: CircuitBreaker,
         **kwargs,
     ) -> None:
         super().__init__(*args, **kwargs)
         self._kokoro_url = kokoro_url.rstrip("/")
         self._voices = voices
         self._default_voice = default_voice
+        self._client = client
+        self._frame_ms = frame_ms
+        self._read_ahead_bytes = read_ahead_bytes
+        self._cache = cache
         self._model = model
+        self._warmer = warmer
+        self._breaker = breaker
         self._info = self._build_info()
+        # HA only connects when it has something to say (or to Describe)
+        warmer.poke("connect")
+        # Sentence pipeline state, for streamed text (SynthesizeStart ..
+        # SynthesizeStop) and multi-sentence Synthesize: one request per
+        # sentence, at most pipeline_depth in flight, and a writer task
+        # playing their audio back in order
+        self._streaming = False
+        self._stream_voice = default_voice
+        self._splitter = SentenceSplitter()
+        self._pipeline = asyncio.Semaphore(pipeline_depth)
+        self._sentences: asyncio.Queue = asyncio.Queue()
+        self._fetches: list[asyncio.Task] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._skipped = 0
+        # Where the current request's audio came from, and how much of it
+        self._outcome: tuple[str, int] = ("failed", 0)
+        self._stream_started = 0.0
+        self._stream_chars = 0
 
     def _build_info(self) -> Info:
         attribution = Attribution(
@@ -85,6 +248,7 @@ class KokoroTTSHandler(AsyncEventHandler):
                     attribution=attribution,
                     installed=True,
                     version="0.1.0",
+                    supports_synthesize_streaming=True,
                     voices=[
                         TtsVoice(
                             name=v,
@@ -103,85 +267,371 @@ class KokoroTTSHandler(AsyncEventHandler):
     async def handle_event(self, event: Event) -> bool:
         if Describe.is_type(event.type):
             LOG.debug("describe -> info")
+            self._warmer.poke("describe")
             await self.write_event(self._info.event())
             return True
 
         if Synthesize.is_type(event.type):
+            if self._streaming:
+                # HA repeats the whole text as a plain Synthesize inside a
+                # streaming request, for servers that don't stream
+                return True
             request = Synthesize.from_event(event)
-            voice = self._default_voice
-            if request.voice is not None and request.voice.name:
-                voice = request.voice.name
-            await self._synthesize(request.text, voice)
+            voice = self._pick_voice(request.voice)
+            started = time.monotonic()
+            self._outcome = ("failed", 0)
+            metrics.inc("wyoming_synthesize_active")
+            try:
+                await self._synthesize(request.text, voice)
+            finally:
+                metrics.inc("wyoming_synthesize_active", -1)
+            observe_synthesis(
+                self._voice_label(voice), started, len(request.text), *self._outcome
+            )
+            return True
+
+        if SynthesizeStart.is_type(event.type):
+            if self._streaming:
+                # A second start before SynthesizeStop would orphan the
+                # open stream and count it twice; its text joins this one
+                LOG.warning("SynthesizeStart while already streaming, ignored")
+                return True
+            start = SynthesizeStart.from_event(event)
+            self._stream_started = time.monotonic()
+            self._stream_chars = 0
+            self._outcome = ("failed", 0)
+            metrics.inc("wyoming_synthesize_active")
+            await self._stream_start(self._pick_voice(start.voice))
+            return True
+
+        if SynthesizeChunk.is_type(event.type):
+            if self._streaming:
+                text = SynthesizeChunk.from_event(event).text
+                self._stream_chars += len(text)
+                for sentence in self._splitter.add(text):
+                    self._queue_sentence(sentence)
+            return True
+
+        if SynthesizeStop.is_type(event.type):
+            if self._streaming:
+                try:
+                    await self._stream_stop()
+                finally:
+                    metrics.inc("wyoming_synthesize_active", -1)
+                observe_synthesis(
+                    self._voice_label(self._stream_voice), self._stream_started,
+                    self._stream_chars, *self._outcome,
+                )
             return True
 
         # Unhandled event types: keep the connection alive and ignore.
         return True
 
-    async def _synthesize(self, text: str, voice: str) -> None:
-        LOG.info("synthesize voice=%s len=%d", voice, len(text))
-        url = f"{self._kokoro_url}/v1/audio/speech"
-        payload = {
-            "model": self._model,
-            "input": text,
-            "voice": voice,
-            # Raw 16-bit PCM at 24 kHz mono. Avoids a decode step in the
-            # bridge - we just pass the bytes straight through to HA.
-            "response_format": "pcm",
-            "stream": True,
-            "speed": 1.0,
-        }
-
-        # Generous read timeout: Kokoro is fast (~0.05x realtime warm),
-        # but the first request after container start can take ~5s while
-        # the model loads from disk into VRAM.
-        timeout = httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0)
+    def _pick_voice(self, requested: Optional[SynthesizeVoice]) -> str:
+        if requested is not None and requested.name:
+            return requested.name
+        return self._default_voice
+
+    def _voice_label(self, voice: str) -> str:
+        """
+        Voice for the metrics: HA may ask for any name and it's passed
+        through, but only advertised voices get a series of their own.
+        """
+        return voice if voice in self._voices else "other"
+
+    async def _stream_start(self, voice: str) -> None:
+        LOG.info("stream start voice=%s", voice)
+        self._streaming = True
+        self._splitter = SentenceSplitter()
+        await self._begin_sentences(voice)
+
+    async def _begin_sentences(self, voice: str, kept: Optional[list[bytes]] = None) -> None:
+        """AudioStart, then a writer that plays queued sentences in order."""
+        self._stream_voice = voice
+        self._sentences = asyncio.Queue()
+        self._fetches = []
+        self._skipped = 0
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        self._writer = asyncio.create_task(self._stream_audio(kept))
+
+    def _queue_sentence(self, sentence: str) -> None:
+        """Start fetching a sentence now; the writer plays it in turn."""
+        audio = ReadAhead(self._read_ahead_bytes)
+        first = not self._fetches
+        self._fetches.append(
+            asyncio.create_task(self._fetch_sentence(sentence, audio, first))
+        )
+        self._sentences.put_nowait(audio)
 
+    async def _fetch_sentence(self, sentence: str, audio: ReadAhead, first: bool) -> None:
+        """Stream one sentence's PCM into audio, then close it."""
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                async with client.stream("POST", url, json=payload) as resp:
-                    if resp.status_code != 200:
-                        body = (await resp.aread()).decode("utf-8", "replace")
-                        LOG.error(
-                            "Kokoro returned HTTP %s for voice=%s: %s",
-                            resp.status_code, voice, body[:300],
-                        )
-                        await self._emit_empty_audio()
-                        return
-
-                    await self.write_event(
-                        AudioStart(
-                            rate=SAMPLE_RATE_HZ,
-                            width=SAMPLE_WIDTH_BYTES,
-                            channels=CHANNELS,
-                        ).event()
+            async with self._pipeline:
+                if not self._breaker.allow():
+                    LOG.warning(
+                        "Kokoro breaker %s, skipping a sentence (%d chars)",
+                        self._breaker.state, len(sentence),
                     )
+                    self._skipped += 1
+                    return
+                started = time.monotonic()
+                async with self._client.stream(
+                    "POST",
+                    f"{self._kokoro_url}/v1/audio/speech",
+                    json=speech_payload(sentence, self._stream_voice, self._model),
+                ) as resp:
+                    self._breaker.record(resp.status_code)
+                    resp.raise_for_status()
+                    first_byte: Optional[float] = None
+                    async for data in resp.aiter_bytes():
+                        if first_byte is None:
+                            first_byte = time.monotonic() - started
+                            metrics.observe("wyoming_backend_first_byte_seconds", first_byte)
+                            if first:
+                                # The reply's first sentence is the one HA waits on
+                                self._warmer.observe(None, first_byte)
+                        await audio.put(data)
+        except httpx.HTTPError as exc:
+            # Skip the sentence rather than end the whole reply
+            LOG.error("Kokoro failed on a sentence (%d chars): %s", len(sentence), exc)
+            count_backend_error(exc)
+            self._breaker.error(exc)
+            self._skipped += 1
+        finally:
+            audio.close()
+
+    async def _stream_audio(self, kept: Optional[list[bytes]]) -> tuple[int, int, float]:
+        """
+        Play queued sentences in order until None: (chunks, bytes, the
+        largest read-ahead in seconds). Each sentence has its own
+        ReadAhead, so later sentences keep draining the backend while an
+        earlier one is still being played out to HA.
+        """
+        reframer = AudioReframer(self._frame_ms)
+        chunks = bytes_streamed = 0
+        read_ahead_s = 0.0
+        while (audio := await self._sentences.get()) is not None:
+            played, size = await self._play(audio, reframer, kept)
+            chunks += played
+            bytes_streamed += size
+            read_ahead_s = max(read_ahead_s, observe_read_ahead(audio))
+        tail = reframer.flush()
+        if tail:
+            bytes_streamed += len(tail)
+            chunks += 1
+            await self._write_audio(tail)
+            if kept is not None:
+                kept.append(tail)
+        return chunks, bytes_streamed, read_ahead_s
+
+    async def _end_sentences(self) -> tuple[int, int, int, float]:
+        """
+        Let the queued sentences play out, then AudioStop: (sentences,
+        chunks, bytes, largest read-ahead in seconds).
+        """
+        sentences = len(self._fetches)
+        self._sentences.put_nowait(None)
+        chunks, bytes_streamed, read_ahead_s = await self._writer
+        self._writer = None
+        self._fetches = []
+        await self.write_event(AudioStop().event())
+        return sentences, chunks, bytes_streamed, read_ahead_s
+
+    async def _stream_stop(self) -> None:
+        for sentence in self._splitter.finish():
+            self._queue_sentence(sentence)
+        sentences, chunks, bytes_streamed, read_ahead_s = await self._end_sentences()
+        self._outcome = ("stream" if bytes_streamed else "failed", bytes_streamed)
+        self._streaming = False
+        await self.write_event(SynthesizeStopped().event())
+        LOG.info(
+            "stream done voice=%s sentences=%d bytes=%d chunks=%d ~duration=%.2fs "
+            "read_ahead=%.1fs",
+            self._stream_voice, sentences, bytes_streamed, chunks,
+            bytes_streamed / (SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS),
+            read_ahead_s,
+        )
 
-                    bytes_streamed = 0
-                    async for chunk in resp.aiter_bytes():
-                        if not chunk:
-                            continue
-                        bytes_streamed += len(chunk)
-                        await self.write_event(
-                            AudioChunk(
-                                rate=SAMPLE_RATE_HZ,
-                                width=SAMPLE_WIDTH_BYTES,
-                                channels=CHANNELS,
-                                audio=chunk,
-                            ).event()
-                        )
+    async def disconnect(self) -> None:
+        if self._streaming:
+            self._streaming = False
+            metrics.inc("wyoming_synthesize_active", -1)
+        # HA hung up mid-stream: stop fetching sentences nobody will hear
+        for task in self._fetches:
+            task.cancel()
+        if self._writer is not None:
+            self._writer.cancel()
 
-                    await self.write_event(AudioStop().event())
-                    duration_s = bytes_streamed / (
-                        SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
-                    )
-                    LOG.info(
-                        "synthesize done voice=%s bytes=%d ~duration=%.2fs",
-                        voice, bytes_streamed, duration_s,
+    async def _synthesize(self, text: str, voice: str) -> None:
+        LOG.info("synthesize voice=%s len=%d", voice, len(text))
+        cache = self._cache if self._cache is not None and self._cache.cacheable(text) else None
+        if cache is not None:
+            audio = cache.get(self._kokoro_url, voice, text)
+            if audio is not None:
+                await self._replay(audio)
+                self._outcome = ("cache", len(audio))
+                LOG.info("synthesize done voice=%s from cache bytes=%d", voice, len(audio))
+                return
+
+        splitter = SentenceSplitter()
+        sentences = splitter.add(text) + splitter.finish()
+        if len(sentences) > 1:
+            await self._fan_out(text, sentences, voice, cache)
+            return
+
+        if not self._breaker.allow():
+            # Known down: empty audio now rather than after the timeouts
+            LOG.warning("Kokoro breaker %s, failing fast for voice=%s", self._breaker.state, voice)
+            await self._emit_empty_audio()
+            return
+
+        url = f"{self._kokoro_url}/v1/audio/speech"
+        payload = speech_payload(text, voice, self._model)
+        started = time.monotonic()
+
+        try:
+            async with self._client.stream("POST", url, json=payload) as resp:
+                self._breaker.record(resp.status_code)
+                if resp.status_code != 200:
+                    count_backend_error(resp.status_code)
+                    body = (await resp.aread()).decode("utf-8", "replace")
+                    LOG.error(
+                        "Kokoro returned HTTP %s for voice=%s: %s",
+                        resp.status_code, voice, body[:300],
                     )
+                    await self._emit_empty_audio()
+                    return
+
+                await self.write_event(
+                    AudioStart(
+                        rate=SAMPLE_RATE_HZ,
+                        width=SAMPLE_WIDTH_BYTES,
+                        channels=CHANNELS,
+                    ).event()
+                )
+
+                reframer = AudioReframer(self._frame_ms)
+                kept: Optional[list[bytes]] = [] if cache is not None else None
+                buffer = ReadAhead(self._read_ahead_bytes)
+                writer = asyncio.create_task(self._play(buffer, reframer, kept))
+                first_byte: Optional[float] = None
+                try:
+                    async for data in resp.aiter_bytes():
+                        if first_byte is None:
+                            first_byte = time.monotonic() - started
+                            metrics.observe("wyoming_backend_first_byte_seconds", first_byte)
+                            self._warmer.observe(None, first_byte)
+                        await buffer.put(data)
+                        if writer.done():
+                            break  # HA went away; the await below says why
+                except BaseException:
+                    writer.cancel()
+                    raise
+                finally:
+                    buffer.close()
+                chunks, bytes_streamed = await writer
+                read_ahead_s = observe_read_ahead(buffer)
+                tail = reframer.flush()
+                if tail:
+                    bytes_streamed += len(tail)
+                    chunks += 1
+                    await self._write_audio(tail)
+                    if kept is not None:
+                        kept.append(tail)
+
+                await self.write_event(AudioStop().event())
+                if kept is not None:
+                    cache.put(self._kokoro_url, voice, text, b"".join(kept))
+                self._outcome = ("backend", bytes_streamed)
+                duration_s = bytes_streamed / (
+                    SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
+                )
+                LOG.info(
+                    "synthesize done voice=%s bytes=%d chunks=%d ~duration=%.2fs "
+                    "read_ahead=%.1fs",
+                    voice, bytes_streamed, chunks, duration_s, read_ahead_s,
+                )
         except httpx.HTTPError as exc:
             LOG.exception("Kokoro request failed: %s", exc)
+            count_backend_error(exc)
+            self._breaker.error(exc)
             await self._emit_empty_audio()
 
+    async def _fan_out(
+        self, text: str, sentences: list[str], voice: str, cache: Optional[PhraseCache]
+    ) -> None:
+        """
+        Synthesize a multi-sentence text as one request per sentence. The
+        first goes out at once and the rest follow with at most
+        pipeline_depth in flight; the writer reassembles their audio in
+        order. First audio comes after one sentence's latency instead of
+        the whole text's, and later sentences synthesize while earlier
+        ones play, so a long reply also finishes sooner. The breaker is
+        consulted per sentence, as for streamed text.
+        """
+        kept: Optional[list[bytes]] = [] if cache is not None else None
+        await self._begin_sentences(voice, kept)
+        for sentence in sentences:
+            self._queue_sentence(sentence)
+        count, chunks, bytes_streamed, read_ahead_s = await self._end_sentences()
+        if kept is not None and not self._skipped:
+            cache.put(self._kokoro_url, voice, text, b"".join(kept))
+        self._outcome = ("sentences" if bytes_streamed else "failed", bytes_streamed)
+        LOG.info(
+            "synthesize done voice=%s sentences=%d bytes=%d chunks=%d ~duration=%.2fs "
+            "read_ahead=%.1fs",
+            voice, count, bytes_streamed, chunks,
+            bytes_streamed / (SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS),
+            read_ahead_s,
+        )
+
+    async def _play(
+        self, buffer: ReadAhead, reframer: AudioReframer, kept: Optional[list[bytes]]
+    ) -> tuple[int, int]:
+        """Write buffer's audio to HA until it closes: (chunks, bytes)."""
+        chunks = bytes_streamed = 0
+        while (data := await buffer.get()) is not None:
+            for frame in reframer.feed(data):
+                bytes_streamed += len(frame)
+                chunks += 1
+                await self._write_audio(frame)
+                if kept is not None:
+                    kept.append(frame)
+        return chunks, bytes_streamed
+
+    async def _replay(self, audio: bytes) -> None:
+        """Send cached PCM as one utterance, framed like a live one."""
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        reframer = AudioReframer(self._frame_ms)
+        for frame in reframer.feed(audio):
+            await self._write_audio(frame)
+        tail = reframer.flush()
+        if tail:
+            await self._write_audio(tail)
+        await self.write_event(AudioStop().event())
+
+    async def _write_audio(self, audio: bytes) -> None:
+        await self.write_event(
+            AudioChunk(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+                audio=audio,
+            ).event()
+        )
+
     async def _emit_empty_audio(self) -> None:
         """Send a minimal AudioStart/AudioStop pair so HA doesn't hang."""
         await self.write_event(
@@ -221,6 +671,148 @@ async def main() -> None:
         default="af_heart",
         help="Voice to use when client does not specify one",
     )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=10,
+        help="Most concurrent connections to the backend (default: 10)",
+    )
+    parser.add_argument(
+        "--max-keepalive",
+        type=int,
+        default=5,
+        help="Idle connections kept open for reuse (default: 5)",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=60.0,
+        help="Seconds an idle connection is kept (default: 60)",
+    )
+    parser.add_argument(
+        "--frame-ms",
+        type=int,
+        default=60,
+        help="Duration of each AudioChunk sent to HA; 0 forwards backend "
+        "chunks as they arrive (default: 60)",
+    )
+    parser.add_argument(
+        "--read-ahead-s",
+        type=float,
+        default=30,
+        help="Audio to buffer between the backend and HA, so a slow "
+        "satellite doesn't hold up the backend (default: 30)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep synthesized phrases here and replay repeats (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=64,
+        help="Phrase cache size bound, least recently used out first (default: 64)",
+    )
+    parser.add_argument(
+        "--cache-max-chars",
+        type=int,
+        default=200,
+        help="Only cache texts up to this long (default: 200)",
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=7,
+        help="Re-synthesize cached phrases older than this (default: 7)",
+    )
+    parser.add_argument(
+        "--hot-phrases",
+        help='File of phrases ("text" or "voice|text" per line) to prefetch '
+        "into the cache at startup",
+    )
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=2,
+        help="Sentence requests in flight at once, for streamed text and "
+        "multi-sentence replies (default: 2)",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Negotiate HTTP/2 with an https backend (needs the h2 package)",
+    )
+    parser.add_argument(
+        "--warm-on",
+        default="",
+        help="Comma-separated warm-up triggers: connect, describe (default: none)",
+    )
+    parser.add_argument(
+        "--warm-interval",
+        type=float,
+        default=0,
+        help="Warm up whenever the backend has been idle this many seconds; "
+        "keep it under the backend's keep-alive (default: 0, off)",
+    )
+    parser.add_argument(
+        "--warm-hours",
+        default="0-24",
+        help="Local hours START-END in which --warm-interval applies (default: 0-24)",
+    )
+    parser.add_argument(
+        "--warm-file",
+        help="Warm up whenever this file is touched (e.g. on a wake word)",
+    )
+    parser.add_argument(
+        "--warm-debounce",
+        type=float,
+        default=60,
+        help="Skip warm-ups within this many seconds of the last warm-up or "
+        "request (default: 60)",
+    )
+    parser.add_argument(
+        "--cold-ms",
+        type=float,
+        default=2000,
+        help="Count a request as cold if its first audio took longer than this, "
+        "when the backend doesn't say (default: 2000)",
+    )
+    parser.add_argument(
+        "--health-interval",
+        type=float,
+        default=10,
+        help="Seconds between backend /health probes; 0 disables them (default: 10)",
+    )
+    parser.add_argument(
+        "--health-timeout",
+        type=float,
+        default=2,
+        help="Seconds a /health probe may take before it counts as failed (default: 2)",
+    )
+    parser.add_argument(
+        "--breaker-failures",
+        type=int,
+        default=3,
+        help="Consecutive backend failures that open its circuit breaker (default: 3)",
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=30,
+        help="Seconds an open breaker fails fast before letting a trial request "
+        "through (default: 30)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics over HTTP on this port (default: 0, off)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Address for --metrics-port (default: 127.0.0.1)",
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -241,21 +833,133 @@ async def main() -> None:
             f"--default-voice {args.default_voice!r} must be one of {voices}"
         )
 
+    cache = None
+    if args.cache_dir:
+        cache = PhraseCache(
+            Path(args.cache_dir),
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            max_chars=args.cache_max_chars,
+            ttl=args.cache_ttl_days * 86400,
+        )
+        LOG.info("phrase cache %s holds %d", args.cache_dir, len(cache))
+    phrases = []
+    if args.hot_phrases:
+        if cache is None:
+            raise SystemExit("--hot-phrases needs --cache-dir")
+        phrases = load_phrases(Path(args.hot_phrases), args.default_voice)
+
+    triggers = {t.strip() for t in args.warm_on.split(",") if t.strip()}
+    if triggers - WARM_TRIGGERS:
+        raise SystemExit(f"--warm-on: unknown trigger(s) {sorted(triggers - WARM_TRIGGERS)}")
+    if args.warm_interval:
+        triggers.add("schedule")
+    if args.warm_file:
+        triggers.add("file")
+    hours = parse_hours(args.warm_hours)
+    if args.breaker_failures < 1:
+        raise SystemExit("--breaker-failures must be at least 1")
+    if args.read_ahead_s <= 0:
+        raise SystemExit("--read-ahead-s must be positive")
+    if args.pipeline_depth < 1:
+        raise SystemExit("--pipeline-depth must be at least 1")
+
     LOG.info(
         "starting wyoming-kokoro uri=%s kokoro_url=%s voices=%s default=%s",
         args.uri, args.kokoro_url, voices, args.default_voice,
     )
 
+    # Generous read timeout: Kokoro is fast (~0.05x realtime warm),
+    # but the first request after container start can take ~5s while
+    # the model loads from disk into VRAM. httpx applies it per chunk.
+    try:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0),
+            limits=httpx.Limits(
+                max_connections=args.max_connections,
+                max_keepalive_connections=args.max_keepalive,
+                keepalive_expiry=args.keepalive_expiry,
+            ),
+            http2=args.http2,
+        )
+    except ImportError as exc:
+        raise SystemExit(f"--http2: {exc}")
+
+    kokoro_url = args.kokoro_url.rstrip("/")
+
+    async def warm() -> str:
+        # No warm-up endpoint and nothing to load; a word through the
+        # same path as a request, timed like one
+        started = time.monotonic()
+        resp = await client.post(
+            f"{kokoro_url}/v1/audio/speech",
+            json=speech_payload("Ready.", args.default_voice, args.model),
+        )
+        resp.raise_for_status()
+        return warmer.classify(None, time.monotonic() - started)
+
+    warmer = Warmer(warm, triggers, args.warm_debounce, args.cold_ms / 1000)
+    breaker = CircuitBreaker("kokoro", args.breaker_failures, args.breaker_cooldown)
+
     server = AsyncServer.from_uri(args.uri)
-    await server.run(
-        partial(
-            KokoroTTSHandler,
-            kokoro_url=args.kokoro_url,
-            voices=voices,
-            default_voice=args.default_voice,
-            model=args.model,
-        ),
+    run = asyncio.ensure_future(
+        server.run(
+            partial(
+                KokoroTTSHandler,
+                kokoro_url=args.kokoro_url,
+                voices=voices,
+                default_voice=args.default_voice,
+                model=args.model,
+                client=client,
+                frame_ms=args.frame_ms,
+                read_ahead_bytes=int(
+                    args.read_ahead_s * SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
+                ),
+                cache=cache,
+                pipeline_depth=args.pipeline_depth,
+                warmer=warmer,
+                breaker=breaker,
+            ),
+        )
     )
+    # systemd stops us with SIGTERM; cancel the server so the pool closes
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, run.cancel)
+
+    async def fetch(backend: str, voice: str, text: str) -> bytes:
+        resp = await client.post(
+            f"{backend}/v1/audio/speech",
+            json=speech_payload(text, voice, args.model),
+        )
+        resp.raise_for_status()
+        return resp.content
+
+    # In the background so Describe doesn't wait on the container
+    background = []
+    if phrases:
+        background.append(asyncio.ensure_future(
+            prefetch(cache, [(kokoro_url, voice, text) for voice, text in phrases], fetch)
+        ))
+    if args.warm_interval:
+        background.append(asyncio.ensure_future(warmer.keep_warm(args.warm_interval, hours)))
+    if args.warm_file:
+        background.append(asyncio.ensure_future(warmer.watch(Path(args.warm_file))))
+    if args.health_interval:
+        background.append(asyncio.ensure_future(probe_health(
+            client, f"{kokoro_url}/health", breaker, args.health_interval, args.health_timeout,
+        )))
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = await serve_metrics(args.metrics_host, args.metrics_port)
+    try:
+        await run
+    except asyncio.CancelledError:
+        LOG.info("shutting down")
+    finally:
+        for task in background:
+            task.cancel()
+        warmer.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        await client.aclose()
 
 
 if __name__ == "__main__":
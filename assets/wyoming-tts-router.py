@@ -0,0 +1,969 @@
+#!/usr/bin/env python3
+"""Wyoming TTS router with hedged requests across several backends.
+
+Built on the same plumbing as wyoming-f5-tts.py and wyoming-kokoro.py
+(wyoming_common.py, which must be importable), but instead of one
+backend it knows several OpenAI-compatible /v1/audio/speech servers
+(F5-TTS on :8880, Kokoro-FastAPI on :8881) and a per-voice route
+through them.
+
+Pipeline:
+
+  HA (Wyoming Synthesize, voice V)
+    -> route for V: [(backend, backend voice), ...] in preference order
+    -> POST the primary; if it hasn't produced its first audio byte
+       within its hedge delay (or fails before that), POST the next one
+       as well. First backend to produce audio wins; the others are
+       hung up on once they reach their first byte (or the hedge
+       clamp), which goes into their latency window.
+    -> forward the winner's PCM as Wyoming AudioStart/AudioChunk/AudioStop,
+       re-cut into --frame-ms chunks as in the single-backend bridges
+
+Why: a cold (model parked in host RAM or unloaded) or queued F5 can keep
+HA waiting up to the 60s read timeout. Kokoro answers in well under a
+second, so losing some prosody on the odd utterance beats a satellite
+that hangs. Hedging rather than plain failover means a slow-but-alive
+primary still wins when it's only a little late.
+
+Hedge delays adapt: each backend keeps a window of first-byte
+latencies, and the delay before hedging away from it is their p95 times
+--hedge-factor, clamped to [--hedge-min-ms, --hedge-max-ms]. So a
+primary that's usually quick gets hedged soon after it's later than
+usual, and one that's routinely slow (long texts, a busy GPU) isn't
+hedged on every request. Losing a race doesn't hide how slow a backend
+was: the loser is left to run, off the request path, until its first
+byte or --hedge-max-ms after it started, whichever comes first, and that
+time goes into its window before it's hung up on. (Only its wait at the
+moment it lost would be set by the hedge delay itself; a loser cut off
+at the clamp is at least that slow, which gives the same delay.)
+--hedge-max-ms is the latency budget. Until a backend has --hedge-warmup
+samples the delay is --hedge-ms.
+
+Routes:
+  --backend f5=http://127.0.0.1:8880 --backend kokoro=http://127.0.0.1:8881
+  --route nature=f5:nature,kokoro:af_heart
+  --route af_heart=kokoro:af_heart,f5:nature
+The advertised voices are the route names. All backends must stream
+s16le mono 24 kHz PCM (both of ours do); once one has won, the stream is
+committed, so a mid-utterance failure ends the audio early rather than
+switching voices halfway through.
+
+Connections: one pooled httpx.AsyncClient per process shared by all
+backends, as in the single-backend bridges.
+
+Read-ahead (--read-ahead-s): the winner's stream is drained into a
+ReadAhead buffer by one task and written to HA by another, as in the
+single-backend bridges, so a slow satellite doesn't keep the winning
+backend busy; the high-water metrics are labelled by backend.
+
+Breakers: each backend has the single-backend bridges' CircuitBreaker,
+fed by its /health probe and by the races themselves. A backend whose
+breaker is open is left out of the race, so with F5 down "nature" goes
+straight to Kokoro instead of hedging after the delay every time; with
+every backend on a route open, HA gets empty audio at once.
+
+Streaming text input (SynthesizeStart/SynthesizeChunk) is not
+advertised, so HA sends the router one plain Synthesize: a race has to
+be decided on a whole request, and the single-backend bridges are the
+ones to use for streamed LLM replies.
+
+Phrase cache (--cache-dir, --hot-phrases): as in the single-backend
+bridges, keyed by the route's primary (backend, voice). Only audio from
+the primary is stored or replayed, so a hedge win never turns into a
+sticky change of voice.
+
+Warm-ups (--warm-on, --warm-interval, --warm-file, as in the
+single-backend bridges) go to every backend at once: POST
+/v1/audio/warmup where the backend has it (tts-server), a one-word
+synthesis where it doesn't. A warm primary is a race that never needs
+its hedge. wyoming_backend_state_total counts the winner of each race
+as warm or cold, labelled by backend.
+
+Metrics: the single-backend bridges' --metrics-port series, with the
+winning backend's name as the source and first-byte and error series
+labelled by backend.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+from wyoming.audio import AudioChunk, AudioStart, AudioStop
+from wyoming.event import Event
+from wyoming.info import Attribution, Describe, Info, TtsProgram, TtsVoice
+from wyoming.server import AsyncEventHandler, AsyncServer
+from wyoming.tts import Synthesize
+
+from wyoming_common import (
+    CHANNELS,
+    SAMPLE_RATE_HZ,
+    SAMPLE_WIDTH_BYTES,
+    WARM_TRIGGERS,
+    AudioReframer,
+    CircuitBreaker,
+    PhraseCache,
+    ReadAhead,
+    Warmer,
+    count_backend_error,
+    load_phrases,
+    metrics,
+    observe_read_ahead,
+    observe_synthesis,
+    parse_hours,
+    prefetch,
+    probe_health,
+    serve_metrics,
+)
+
+LOG = logging.getLogger("wyoming-tts-router")
+
+
+def speech_payload(text: str, voice: str, model: str) -> dict:
+    return {
+        "model": model,
+        "input": text,
+        "voice": voice,
+        "response_format": "pcm",
+        "stream": True,
+        "speed": 1.0,
+    }
+
+
+class BackendError(Exception):
+    """A backend failed before producing any audio."""
+
+
+@dataclass
+class Backend:
+    """One OpenAI-compatible TTS server and its recent first-byte latencies."""
+
+    name: str
+    url: str
+    model: str
+    breaker: Optional[CircuitBreaker] = None
+    window: int = 50
+    first_byte: deque = field(default_factory=deque)
+    wins: int = 0
+    losses: int = 0
+    failures: int = 0
+
+    def record(self, seconds: float) -> None:
+        self.first_byte.append(seconds)
+        while len(self.first_byte) > self.window:
+            self.first_byte.popleft()
+
+    def p95(self) -> float:
+        values = sorted(self.first_byte)
+        return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+    def summary(self) -> str:
+        latency = f"p95={self.p95():.2f}s" if self.first_byte else "p95=-"
+        return (
+            f"{self.name}: {latency} wins={self.wins} "
+            f"losses={self.losses} failures={self.failures}"
+        )
+
+
+@dataclass
+class HedgePolicy:
+    """Turns a backend's latency window into a hedge delay (seconds)."""
+
+    initial: float
+    minimum: float
+    maximum: float
+    factor: float
+    warmup: int
+
+    def delay(self, backend: Backend) -> float:
+        if len(backend.first_byte) < self.warmup:
+            return self.initial
+        return min(max(backend.p95() * self.factor, self.minimum), self.maximum)
+
+
+@dataclass
+class Attempt:
+    """A request that has produced its first audio chunk."""
+
+    backend: Backend
+    voice: str
+    response: httpx.Response
+    chunks: AsyncIterator[bytes]
+    first: bytes
+    first_byte: float
+
+
+class RouterHandler(AsyncEventHandler):
+    """Per-connection Wyoming handler that races Synthesize across backends."""
+
+    def __init__(
+        self,
+        *args,
+        backends: dict[str, Backend],
+        routes: dict[str, list[tuple[str, str]]],
+        default_voice: str,
+        policy: HedgePolicy,
+        client: httpx.AsyncClient,
+        frame_ms: int,
+        read_ahead_bytes: int,
+        cache: Optional[PhraseCache],
+        warmer: Warmer,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self._backends = backends
+        self._routes = routes
+        self._default_voice = default_voice
+        self._policy = policy
+        self._client = client
+        self._frame_ms = frame_ms
+        self._read_ahead_bytes = read_ahead_bytes
+        self._cache = cache
+        self._warmer = warmer
+        self._info = self._build_info()
+        # Race losers still running to their first byte (see _settle)
+        self._settling: set[asyncio.Task] = set()
+        # HA only connects when it has something to say (or to Describe)
+        warmer.poke("connect")
+        # Where the current request's audio came from (the winning
+        # backend, or the cache), and how much of it
+        self._outcome: tuple[str, int] = ("failed", 0)
+
+    def _build_info(self) -> Info:
+        attribution = Attribution(
+            name="wyoming-tts-router",
+            url="https://github.com/rhasspy/wyoming",
+        )
+        return Info(
+            tts=[
+                TtsProgram(
+                    name="tts-router",
+                    description="Hedged F5-TTS/Kokoro via local Wyoming router",
+                    attribution=attribution,
+                    installed=True,
+                    version="0.1.0",
+                    voices=[
+                        TtsVoice(
+                            name=voice,
+                            description="Routed voice: " + " -> ".join(
+                                f"{b}:{v}" for b, v in route
+                            ),
+                            attribution=attribution,
+                            installed=True,
+                            version=None,
+                            languages=["en"],
+                        )
+                        for voice, route in self._routes.items()
+                    ],
+                ),
+            ],
+        )
+
+    async def handle_event(self, event: Event) -> bool:
+        if Describe.is_type(event.type):
+            LOG.debug("describe -> info")
+            self._warmer.poke("describe")
+            await self.write_event(self._info.event())
+            return True
+
+        if Synthesize.is_type(event.type):
+            request = Synthesize.from_event(event)
+            voice = self._default_voice
+            if request.voice is not None and request.voice.name in self._routes:
+                voice = request.voice.name
+            started = time.monotonic()
+            self._outcome = ("failed", 0)
+            metrics.inc("wyoming_synthesize_active")
+            try:
+                await self._synthesize(request.text, voice)
+            finally:
+                metrics.inc("wyoming_synthesize_active", -1)
+            observe_synthesis(voice, started, len(request.text), *self._outcome)
+            return True
+
+        # Unhandled event types: keep the connection alive and ignore.
+        return True
+
+    async def _open(
+        self, backend: Backend, voice: str, text: str, quality: Optional[str]
+    ) -> Attempt:
+        """POST to one backend and wait for its first audio chunk."""
+        payload = speech_payload(text, voice, backend.model)
+        if quality is not None:
+            payload["quality"] = quality
+        request = self._client.build_request(
+            "POST", f"{backend.url}/v1/audio/speech", json=payload
+        )
+        started = time.monotonic()
+        try:
+            resp = await self._client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            count_backend_error(exc, backend=backend.name)
+            backend.breaker.error(exc)
+            raise BackendError(f"{type(exc).__name__}: {exc}") from exc
+        backend.breaker.record(resp.status_code)
+        try:
+            if resp.status_code != 200:
+                count_backend_error(resp.status_code, backend=backend.name)
+                body = (await resp.aread()).decode("utf-8", "replace")
+                raise BackendError(f"HTTP {resp.status_code}: {body[:300]}")
+            chunks = resp.aiter_bytes()
+            async for chunk in chunks:
+                if chunk:
+                    return Attempt(
+                        backend, voice, resp, chunks, chunk, time.monotonic() - started
+                    )
+            raise BackendError("stream ended without audio")
+        except httpx.HTTPError as exc:
+            count_backend_error(exc, backend=backend.name)
+            backend.breaker.error(exc)
+            await resp.aclose()
+            raise BackendError(f"{type(exc).__name__}: {exc}") from exc
+        except BaseException:
+            await resp.aclose()
+            raise
+
+    async def _race(
+        self, text: str, route: list[tuple[str, str]], quality: Optional[str] = None
+    ) -> Optional[Attempt]:
+        """
+        Launch the route's backends one after another until one produces
+        audio: the next starts when the newest has gone its hedge delay
+        without a first byte, or right away when every running one failed.
+        Backends whose breaker is open are skipped, so a dead primary
+        costs nothing and the fallback is asked straight away.
+        """
+        waiting = list(route)
+        running: dict[asyncio.Task, tuple[Backend, float]] = {}
+        winner: Optional[Attempt] = None
+
+        def launch() -> None:
+            while waiting:
+                name, voice = waiting.pop(0)
+                backend = self._backends[name]
+                if not backend.breaker.allow():
+                    LOG.info("skipping %s: breaker %s", name, backend.breaker.state)
+                    continue
+                task = asyncio.create_task(self._open(backend, voice, text, quality))
+                running[task] = (backend, time.monotonic())
+                return
+
+        launch()
+        try:
+            while running and winner is None:
+                timeout = None
+                if waiting:
+                    newest, started = list(running.values())[-1]
+                    deadline = started + self._policy.delay(newest)
+                    timeout = max(deadline - time.monotonic(), 0)
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    LOG.info(
+                        "hedging: no audio from %s after %.2fs, trying %s",
+                        newest.name, time.monotonic() - started, waiting[0][0],
+                    )
+                    launch()
+                    continue
+                for task in done:
+                    backend, started = running.pop(task)
+                    if task.exception() is not None:
+                        backend.failures += 1
+                        LOG.warning("%s failed: %s", backend.name, task.exception())
+                        continue
+                    attempt = task.result()
+                    if winner is not None:
+                        # Tied in the same wakeup; keep the earlier one
+                        await attempt.response.aclose()
+                        backend.record(attempt.first_byte)
+                        backend.losses += 1
+                        continue
+                    backend.record(attempt.first_byte)
+                    backend.wins += 1
+                    winner = attempt
+                if winner is None and not running and waiting:
+                    launch()
+        finally:
+            for task, (backend, started) in running.items():
+                backend.losses += 1
+                if winner is None:
+                    # We were cancelled (HA went away): nobody to settle for
+                    task.cancel()
+                    continue
+                settle = asyncio.create_task(self._settle(task, backend, started))
+                self._settling.add(settle)
+                settle.add_done_callback(self._settling.discard)
+            if winner is None and running:
+                await asyncio.gather(*running, return_exceptions=True)
+        return winner
+
+    async def _settle(self, task: asyncio.Task, backend: Backend, started: float) -> None:
+        """
+        Let a backend that lost a race reach its first byte, record how
+        long that took, and hang up. One still silent --hedge-max-ms after
+        it started is cancelled and recorded at that: it's at least that
+        slow, and anything slower clamps to the same hedge delay.
+        """
+        budget = started + self._policy.maximum - time.monotonic()
+        done, _ = await asyncio.wait([task], timeout=max(budget, 0))
+        if not done:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            backend.record(time.monotonic() - started)
+            LOG.debug("%s lost, no audio after %.2fs", backend.name, time.monotonic() - started)
+            return
+        if task.exception() is not None:
+            return  # Failed after losing; _open has counted it
+        attempt = task.result()
+        await attempt.response.aclose()
+        backend.record(attempt.first_byte)
+        LOG.debug("%s lost, first byte after %.2fs", backend.name, attempt.first_byte)
+
+    async def _synthesize(self, text: str, voice: str) -> None:
+        LOG.info("synthesize voice=%s len=%d", voice, len(text))
+        # Only the primary's audio is cached: replaying a hedge winner
+        # would keep the fallback voice long after the primary recovered
+        primary = self._routes[voice][0]
+        cache = self._cache if self._cache is not None and self._cache.cacheable(text) else None
+        if cache is not None:
+            audio = cache.get(*primary, text)
+            if audio is not None:
+                await self._replay(audio)
+                self._outcome = ("cache", len(audio))
+                LOG.info(
+                    "synthesize done voice=%s via %s:%s from cache bytes=%d",
+                    voice, *primary, len(audio),
+                )
+                return
+
+        started = time.monotonic()
+        # Cached audio is kept for a week: pin the quality so tts-server's
+        # auto can't store a degraded take (other backends ignore it)
+        attempt = await self._race(
+            text, self._routes[voice], "high" if cache is not None else None
+        )
+        if attempt is None:
+            LOG.error("all backends failed for voice=%s", voice)
+            await self._emit_empty_audio()
+            return
+
+        first_byte = time.monotonic() - started
+        metrics.observe(
+            "wyoming_backend_first_byte_seconds", attempt.first_byte, backend=attempt.backend.name
+        )
+        self._warmer.observe(
+            attempt.response.headers.get("X-TTS-Model-State"),
+            attempt.first_byte,
+            backend=attempt.backend.name,
+        )
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        reframer = AudioReframer(self._frame_ms)
+        kept: Optional[list[bytes]] = None
+        if cache is not None and (attempt.backend.name, attempt.voice) == primary:
+            kept = []
+        buffer = ReadAhead(self._read_ahead_bytes)
+        writer = asyncio.create_task(self._play(buffer, reframer, kept))
+        try:
+            await buffer.put(attempt.first)
+            async for data in attempt.chunks:
+                await buffer.put(data)
+                if writer.done():
+                    break  # HA went away; the await below says why
+        except httpx.HTTPError as exc:
+            # Already committed to this backend's voice; end early with
+            # what's buffered
+            LOG.error("%s failed mid-stream: %s", attempt.backend.name, exc)
+            count_backend_error(exc, backend=attempt.backend.name)
+            attempt.backend.breaker.error(exc)
+            kept = None
+        except BaseException:
+            writer.cancel()
+            raise
+        finally:
+            buffer.close()
+            await attempt.response.aclose()
+        chunks, bytes_streamed = await writer
+        read_ahead_s = observe_read_ahead(buffer, backend=attempt.backend.name)
+        tail = reframer.flush()
+        if tail:
+            bytes_streamed += len(tail)
+            chunks += 1
+            await self._write_audio(tail)
+            if kept is not None:
+                kept.append(tail)
+
+        await self.write_event(AudioStop().event())
+        if kept is not None:
+            cache.put(*primary, text, b"".join(kept))
+        self._outcome = (attempt.backend.name, bytes_streamed)
+        duration_s = bytes_streamed / (SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS)
+        LOG.info(
+            "synthesize done voice=%s via %s:%s first_byte=%.2fs bytes=%d "
+            "chunks=%d ~duration=%.2fs read_ahead=%.1fs",
+            voice, attempt.backend.name, attempt.voice, first_byte,
+            bytes_streamed, chunks, duration_s, read_ahead_s,
+        )
+        LOG.debug("backends: %s", "; ".join(b.summary() for b in self._backends.values()))
+
+    async def _play(
+        self, buffer: ReadAhead, reframer: AudioReframer, kept: Optional[list[bytes]]
+    ) -> tuple[int, int]:
+        """Write buffer's audio to HA until it closes: (chunks, bytes)."""
+        chunks = bytes_streamed = 0
+        while (data := await buffer.get()) is not None:
+            for frame in reframer.feed(data):
+                bytes_streamed += len(frame)
+                chunks += 1
+                await self._write_audio(frame)
+                if kept is not None:
+                    kept.append(frame)
+        return chunks, bytes_streamed
+
+    async def _replay(self, audio: bytes) -> None:
+        """Send cached PCM as one utterance, framed like a live one."""
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        reframer = AudioReframer(self._frame_ms)
+        for frame in reframer.feed(audio):
+            await self._write_audio(frame)
+        tail = reframer.flush()
+        if tail:
+            await self._write_audio(tail)
+        await self.write_event(AudioStop().event())
+
+    async def _write_audio(self, audio: bytes) -> None:
+        await self.write_event(
+            AudioChunk(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+                audio=audio,
+            ).event()
+        )
+
+    async def _emit_empty_audio(self) -> None:
+        """Send a minimal AudioStart/AudioStop pair so HA doesn't hang."""
+        await self.write_event(
+            AudioStart(
+                rate=SAMPLE_RATE_HZ,
+                width=SAMPLE_WIDTH_BYTES,
+                channels=CHANNELS,
+            ).event()
+        )
+        await self.write_event(AudioStop().event())
+
+
+def parse_backends(specs: list[str]) -> dict[str, Backend]:
+    """--backend name=url[#model]; model defaults to the name."""
+    backends = {}
+    for spec in specs:
+        name, sep, rest = spec.partition("=")
+        url, _, model = rest.partition("#")
+        if not sep or not name.strip() or not url.strip():
+            raise SystemExit(f"--backend {spec!r}: expected name=url")
+        name = name.strip()
+        backends[name] = Backend(name, url.strip().rstrip("/"), model.strip() or name)
+    if not backends:
+        raise SystemExit("at least one --backend is required")
+    return backends
+
+
+def parse_routes(specs: list[str], backends: dict[str, Backend]) -> dict[str, list[tuple[str, str]]]:
+    """--route voice=backend:voice,backend:voice (preference order)."""
+    routes = {}
+    for spec in specs:
+        voice, sep, rest = spec.partition("=")
+        route = []
+        for hop in rest.split(","):
+            name, _, backend_voice = hop.strip().partition(":")
+            if name not in backends:
+                raise SystemExit(f"--route {spec!r}: unknown backend {name!r}")
+            route.append((name, backend_voice or voice.strip()))
+        if not sep or not voice.strip() or not route:
+            raise SystemExit(f"--route {spec!r}: expected voice=backend:voice,...")
+        routes[voice.strip()] = route
+    if not routes:
+        raise SystemExit("at least one --route is required")
+    return routes
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--uri",
+        default="tcp://0.0.0.0:10220",
+        help="Wyoming URI to listen on (default: tcp://0.0.0.0:10220)",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        default=[],
+        help="name=url[#model] of an OpenAI-compatible TTS server (repeatable)",
+    )
+    parser.add_argument(
+        "--route",
+        action="append",
+        default=[],
+        help="voice=backend:voice,backend:voice in preference order (repeatable)",
+    )
+    parser.add_argument(
+        "--default-voice",
+        help="Route to use when client does not specify one (default: first --route)",
+    )
+    parser.add_argument(
+        "--hedge-ms",
+        type=float,
+        default=1500,
+        help="Hedge delay until a backend has latency history (default: 1500)",
+    )
+    parser.add_argument(
+        "--hedge-min-ms",
+        type=float,
+        default=300,
+        help="Lower clamp on the adaptive hedge delay (default: 300)",
+    )
+    parser.add_argument(
+        "--hedge-max-ms",
+        type=float,
+        default=2500,
+        help="Upper clamp on the adaptive hedge delay (default: 2500)",
+    )
+    parser.add_argument(
+        "--hedge-factor",
+        type=float,
+        default=1.5,
+        help="Hedge after this multiple of the backend's p95 first byte (default: 1.5)",
+    )
+    parser.add_argument(
+        "--hedge-warmup",
+        type=int,
+        default=5,
+        help="Latency samples before the hedge delay adapts (default: 5)",
+    )
+    parser.add_argument(
+        "--frame-ms",
+        type=int,
+        default=60,
+        help="Duration of each AudioChunk sent to HA; 0 forwards backend "
+        "chunks as they arrive (default: 60)",
+    )
+    parser.add_argument(
+        "--read-ahead-s",
+        type=float,
+        default=30,
+        help="Audio to buffer between the backend and HA, so a slow "
+        "satellite doesn't hold up the backend (default: 30)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep synthesized phrases here and replay repeats (default: no cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=64,
+        help="Phrase cache size bound, least recently used out first (default: 64)",
+    )
+    parser.add_argument(
+        "--cache-max-chars",
+        type=int,
+        default=200,
+        help="Only cache texts up to this long (default: 200)",
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=7,
+        help="Re-synthesize cached phrases older than this (default: 7)",
+    )
+    parser.add_argument(
+        "--hot-phrases",
+        help='File of phrases ("text" or "voice|text" per line, voice being '
+        "a route) to prefetch into the cache at startup",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=10,
+        help="Most concurrent connections per backend (default: 10)",
+    )
+    parser.add_argument(
+        "--max-keepalive",
+        type=int,
+        default=5,
+        help="Idle connections kept open for reuse (default: 5)",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=60.0,
+        help="Seconds an idle connection is kept (default: 60)",
+    )
+    parser.add_argument(
+        "--warm-on",
+        default="",
+        help="Comma-separated warm-up triggers: connect, describe (default: none)",
+    )
+    parser.add_argument(
+        "--warm-interval",
+        type=float,
+        default=0,
+        help="Warm up whenever the backend has been idle this many seconds; "
+        "keep it under the backend's keep-alive (default: 0, off)",
+    )
+    parser.add_argument(
+        "--warm-hours",
+        default="0-24",
+        help="Local hours START-END in which --warm-interval applies (default: 0-24)",
+    )
+    parser.add_argument(
+        "--warm-file",
+        help="Warm up whenever this file is touched (e.g. on a wake word)",
+    )
+    parser.add_argument(
+        "--warm-debounce",
+        type=float,
+        default=60,
+        help="Skip warm-ups within this many seconds of the last warm-up or "
+        "request (default: 60)",
+    )
+    parser.add_argument(
+        "--cold-ms",
+        type=float,
+        default=2000,
+        help="Count a request as cold if its first audio took longer than this, "
+        "when the backend doesn't say (default: 2000)",
+    )
+    parser.add_argument(
+        "--health-interval",
+        type=float,
+        default=10,
+        help="Seconds between backend /health probes; 0 disables them (default: 10)",
+    )
+    parser.add_argument(
+        "--health-timeout",
+        type=float,
+        default=2,
+        help="Seconds a /health probe may take before it counts as failed (default: 2)",
+    )
+    parser.add_argument(
+        "--breaker-failures",
+        type=int,
+        default=3,
+        help="Consecutive backend failures that open its circuit breaker (default: 3)",
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=30,
+        help="Seconds an open breaker fails fast before letting a trial request "
+        "through (default: 30)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics over HTTP on this port (default: 0, off)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Address for --metrics-port (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=args.log_level,
+        format="%(asctime)s %(name)s %(levelname)s %(message)s",
+    )
+
+    backends = parse_backends(args.backend)
+    routes = parse_routes(args.route, backends)
+    default_voice = args.default_voice or next(iter(routes))
+    if default_voice not in routes:
+        raise SystemExit(
+            f"--default-voice {default_voice!r} must be one of {list(routes)}"
+        )
+    cache = None
+    if args.cache_dir:
+        cache = PhraseCache(
+            Path(args.cache_dir),
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            max_chars=args.cache_max_chars,
+            ttl=args.cache_ttl_days * 86400,
+        )
+        LOG.info("phrase cache %s holds %d", args.cache_dir, len(cache))
+    phrases = []
+    if args.hot_phrases:
+        if cache is None:
+            raise SystemExit("--hot-phrases needs --cache-dir")
+        for voice, text in load_phrases(Path(args.hot_phrases), default_voice):
+            if voice not in routes:
+                raise SystemExit(f"--hot-phrases: no route for voice {voice!r}")
+            phrases.append((*routes[voice][0], text))
+
+    triggers = {t.strip() for t in args.warm_on.split(",") if t.strip()}
+    if triggers - WARM_TRIGGERS:
+        raise SystemExit(f"--warm-on: unknown trigger(s) {sorted(triggers - WARM_TRIGGERS)}")
+    if args.warm_interval:
+        triggers.add("schedule")
+    if args.warm_file:
+        triggers.add("file")
+    hours = parse_hours(args.warm_hours)
+    if args.breaker_failures < 1:
+        raise SystemExit("--breaker-failures must be at least 1")
+    if args.read_ahead_s <= 0:
+        raise SystemExit("--read-ahead-s must be positive")
+    for backend in backends.values():
+        backend.breaker = CircuitBreaker(
+            backend.name, args.breaker_failures, args.breaker_cooldown
+        )
+
+    policy = HedgePolicy(
+        initial=args.hedge_ms / 1000,
+        minimum=args.hedge_min_ms / 1000,
+        maximum=args.hedge_max_ms / 1000,
+        factor=args.hedge_factor,
+        warmup=args.hedge_warmup,
+    )
+
+    LOG.info(
+        "starting wyoming-tts-router uri=%s backends=%s routes=%s default=%s",
+        args.uri, {b.name: b.url for b in backends.values()}, routes, default_voice,
+    )
+
+    # Same generous read timeout as the bridges: a backend that's slow to
+    # start is handled by hedging, not by giving up on it early.
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(connect=5.0, read=60.0, write=5.0, pool=5.0),
+        limits=httpx.Limits(
+            max_connections=args.max_connections * len(backends),
+            max_keepalive_connections=args.max_keepalive * len(backends),
+            keepalive_expiry=args.keepalive_expiry,
+        ),
+    )
+
+    # One voice per backend for warm-ups that have to synthesize something
+    warm_voices: dict[str, str] = {}
+    for route in routes.values():
+        for name, voice in route:
+            warm_voices.setdefault(name, voice)
+    no_warmup: set[str] = set()
+
+    async def warm_one(backend: Backend, voice: str) -> str:
+        if backend.name not in no_warmup:
+            resp = await client.post(f"{backend.url}/v1/audio/warmup")
+            if resp.status_code not in (404, 405):
+                resp.raise_for_status()
+                return f"{backend.name}={resp.json()['state']}"
+            no_warmup.add(backend.name)
+        started = time.monotonic()
+        resp = await client.post(
+            f"{backend.url}/v1/audio/speech",
+            json=speech_payload("Ready.", voice, backend.model),
+        )
+        resp.raise_for_status()
+        return f"{backend.name}={warmer.classify(None, time.monotonic() - started)}"
+
+    async def warm() -> str:
+        states = await asyncio.gather(
+            *(warm_one(backends[name], voice) for name, voice in warm_voices.items())
+        )
+        return " ".join(states)
+
+    warmer = Warmer(warm, triggers, args.warm_debounce, args.cold_ms / 1000)
+
+    server = AsyncServer.from_uri(args.uri)
+    run = asyncio.ensure_future(
+        server.run(
+            partial(
+                RouterHandler,
+                backends=backends,
+                routes=routes,
+                default_voice=default_voice,
+                policy=policy,
+                client=client,
+                frame_ms=args.frame_ms,
+                read_ahead_bytes=int(
+                    args.read_ahead_s * SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS
+                ),
+                cache=cache,
+                warmer=warmer,
+            ),
+        )
+    )
+    # systemd stops us with SIGTERM; cancel the server so the pool closes
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, run.cancel)
+
+    async def fetch(name: str, voice: str, text: str) -> bytes:
+        backend = backends[name]
+        resp = await client.post(
+            f"{backend.url}/v1/audio/speech",
+            # high quality so auto can't cache a degraded take for a week
+            json={**speech_payload(text, voice, backend.model), "quality": "high"},
+        )
+        resp.raise_for_status()
+        return resp.content
+
+    # In the background: the primary may be cold, and Describe shouldn't wait
+    background = []
+    if phrases:
+        background.append(asyncio.ensure_future(prefetch(cache, phrases, fetch)))
+    if args.warm_interval:
+        background.append(asyncio.ensure_future(warmer.keep_warm(args.warm_interval, hours)))
+    if args.warm_file:
+        background.append(asyncio.ensure_future(warmer.watch(Path(args.warm_file))))
+    if args.health_interval:
+        for backend in backends.values():
+            background.append(asyncio.ensure_future(probe_health(
+                client, f"{backend.url}/health", backend.breaker,
+                args.health_interval, args.health_timeout,
+            )))
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = await serve_metrics(args.metrics_host, args.metrics_port)
+    try:
+        await run
+    except asyncio.CancelledError:
+        LOG.info("shutting down")
+    finally:
+        for task in background:
+            task.cancel()
+        warmer.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        for backend in backends.values():
+            LOG.info("backend %s", backend.summary())
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
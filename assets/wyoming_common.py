@@ -0,0 +1,688 @@
+"""Plumbing shared by the Wyoming TTS bridges.
+
+wyoming-f5-tts.py, wyoming-kokoro.py and wyoming-tts-router.py all sit
+between Home Assistant and OpenAI-compatible /v1/audio/speech servers
+streaming s16le mono 24 kHz PCM. What differs between them is the
+request shape and how a reply is put together; what doesn't lives
+here:
+
+- AudioReframer: backend reads re-cut into fixed-duration AudioChunks
+- ReadAhead: the buffer between the backend reader and the HA writer
+- PhraseCache, load_phrases, prefetch: the on-disk PCM phrase cache
+- Warmer: warm-up triggers and warm/cold accounting
+- CircuitBreaker, probe_health: failing fast on a dead backend
+- Metrics and the wyoming_* series, serve_metrics, observe_synthesis,
+  count_backend_error: the --metrics-port endpoint
+
+Each bridge is deployed as a single store file, so hosts/skaia/voice.nix
+ships this module in a directory of its own and puts that on
+PYTHONPATH. Run from a checkout (wyoming-bench.py does), the scripts
+find it next to them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+LOG = logging.getLogger("wyoming-common")
+
+# F5-TTS and Kokoro both stream this natively (their vocoders fix it),
+# and the bridges forward it unchanged
+SAMPLE_RATE_HZ = 24000
+SAMPLE_WIDTH_BYTES = 2  # s16le
+CHANNELS = 1
+
+
+class AudioReframer:
+    """
+    Re-cut a PCM byte stream into fixed-duration, sample-aligned frames.
+
+    aiter_bytes() hands back whatever the socket read produced: TCP-sized
+    fragments (each one an AudioChunk event with its own JSON header) or
+    odd-length buffers that split an s16le sample across two events.
+    Bytes are copied into one preallocated frame buffer through
+    memoryviews, so there is no bytes concatenation per fragment; a full
+    frame is copied out once when it's emitted. frame_ms=0 passes chunks
+    through unchanged.
+    """
+
+    def __init__(self, frame_ms: int) -> None:
+        self._sample_bytes = SAMPLE_WIDTH_BYTES * CHANNELS
+        self._frame_bytes = SAMPLE_RATE_HZ * frame_ms // 1000 * self._sample_bytes
+        self._buffer = memoryview(bytearray(self._frame_bytes))
+        self._filled = 0
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Frames completed by data (possibly none)."""
+        if not self._frame_bytes:
+            return [data] if data else []
+        frames = []
+        view = memoryview(data)
+        while view:
+            if not self._filled and len(view) >= self._frame_bytes:
+                # Whole frame straight from the input, no staging copy
+                frames.append(bytes(view[: self._frame_bytes]))
+                view = view[self._frame_bytes :]
+                continue
+            n = min(len(view), self._frame_bytes - self._filled)
+            self._buffer[self._filled : self._filled + n] = view[:n]
+            self._filled += n
+            view = view[n:]
+            if self._filled == self._frame_bytes:
+                frames.append(bytes(self._buffer))
+                self._filled = 0
+        return frames
+
+    def flush(self) -> bytes:
+        """The short last frame, trimmed to whole samples."""
+        whole = self._filled - self._filled % self._sample_bytes
+        if whole != self._filled:
+            LOG.warning("dropping %d byte(s) of a partial sample", self._filled - whole)
+        tail = bytes(self._buffer[:whole])
+        self._filled = 0
+        return tail
+
+
+class ReadAhead:
+    """
+    Bounded audio buffer between a backend reader and the Wyoming writer.
+
+    Writing an AudioChunk waits on HA's socket. With the read and the
+    write in one loop, a slow satellite paced the backend read, and the
+    TTS server's generator (and its GPU slot) stayed busy for as long as
+    playback took. The reader puts what the backend sends in here and
+    only waits once max_bytes are buffered, so the backend normally
+    drains at full speed while a separate writer task catches up.
+    high_water is the most it ever held and full counts the puts that
+    had to wait. Once close()d, get() returns None after the rest, and
+    put() drops data (the writer gave up).
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._chunks: deque[bytes] = deque()
+        self._bytes = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+        self._drained = asyncio.Event()
+        self.high_water = 0
+        self.full = 0
+
+    async def put(self, data: bytes) -> None:
+        if self._bytes >= self._max_bytes and not self._closed:
+            self.full += 1
+            while self._bytes >= self._max_bytes and not self._closed:
+                self._drained.clear()
+                await self._drained.wait()
+        if self._closed:
+            return
+        self._chunks.append(data)
+        self._bytes += len(data)
+        self.high_water = max(self.high_water, self._bytes)
+        self._ready.set()
+
+    async def get(self) -> Optional[bytes]:
+        while not self._chunks:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        data = self._chunks.popleft()
+        self._bytes -= len(data)
+        self._drained.set()
+        return data
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+        self._drained.set()
+
+
+def observe_read_ahead(buffer: ReadAhead, **labels) -> float:
+    """Report a finished buffer's high-water mark, in seconds of audio."""
+    seconds = buffer.high_water / (SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS)
+    metrics.observe("wyoming_read_ahead_high_water_seconds", seconds, **labels)
+    if buffer.full:
+        metrics.inc("wyoming_read_ahead_full_total", buffer.full, **labels)
+    return seconds
+
+
+class PhraseCache:
+    """
+    Bounded on-disk PCM cache keyed by (backend, voice, text).
+
+    HA says the same few things over and over ("Turned off the light");
+    a hit is replayed straight from disk instead of a backend round
+    trip. One raw PCM file per phrase, named by a hash of the key and
+    written via rename so a crash can't leave a truncated entry.
+    Least-recently-used entries go once the directory exceeds max_bytes
+    (recency is tracked in memory; after a restart, oldest-written goes
+    first), and entries older than ttl are dropped so a changed voice
+    reference doesn't keep replaying stale audio forever. Only texts up to
+    max_chars are cached: long one-off answers would just churn it.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_chars: int, ttl: float) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._max_chars = max_chars
+        self._ttl = ttl
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        directory.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        existing = []
+        for path in directory.glob("*.pcm"):
+            stat = path.stat()
+            if now - stat.st_mtime > ttl:
+                path.unlink(missing_ok=True)
+            else:
+                existing.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._bytes += size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(backend: str, voice: str, text: str) -> str:
+        return hashlib.sha256(f"{backend}\0{voice}\0{text}".encode()).hexdigest()
+
+    def cacheable(self, text: str) -> bool:
+        return len(text) <= self._max_chars
+
+    def __contains__(self, key: tuple[str, str, str]) -> bool:
+        return self._key(*key) in self._entries
+
+    def get(self, backend: str, voice: str, text: str) -> Optional[bytes]:
+        key = self._key(backend, voice, text)
+        if key in self._entries:
+            path = self._directory / f"{key}.pcm"
+            try:
+                if time.time() - path.stat().st_mtime <= self._ttl:
+                    audio = path.read_bytes()
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return audio
+            except OSError as exc:
+                LOG.warning("cache entry %s unreadable: %s", key, exc)
+            self._drop(key)
+        self.misses += 1
+        return None
+
+    def put(self, backend: str, voice: str, text: str, audio: bytes) -> None:
+        if not audio or len(audio) > self._max_bytes:
+            return
+        key = self._key(backend, voice, text)
+        path = self._directory / f"{key}.pcm"
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(audio)
+            os.replace(tmp, path)
+        except OSError as exc:
+            LOG.warning("cache write failed: %s", exc)
+            return
+        self._bytes += len(audio) - self._entries.pop(key, 0)
+        self._entries[key] = len(audio)
+        self._evict()
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key, 0)
+        (self._directory / f"{key}.pcm").unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+
+
+def load_phrases(path: Path, default_voice: str) -> list[tuple[str, str]]:
+    """Hot phrases, one per line as "text" or "voice|text"; # comments."""
+    phrases = []
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        voice, sep, text = line.partition("|")
+        if not sep:
+            voice, text = default_voice, line
+        phrases.append((voice.strip(), text.strip()))
+    return phrases
+
+
+async def prefetch(
+    cache: PhraseCache,
+    phrases: list[tuple[str, str, str]],
+    fetch: Callable[[str, str, str], Awaitable[bytes]],
+) -> None:
+    """Synthesize the (backend, voice, text) phrases missing from the cache."""
+    fetched = 0
+    for backend, voice, text in phrases:
+        if (backend, voice, text) in cache:
+            continue
+        try:
+            cache.put(backend, voice, text, await fetch(backend, voice, text))
+            fetched += 1
+        except httpx.HTTPError as exc:
+            LOG.warning("prefetch failed voice=%s text=%r: %s", voice, text, exc)
+    LOG.info("hot phrases: fetched %d of %d, cache holds %d", fetched, len(phrases), len(cache))
+
+
+class Metrics:
+    """
+    Minimal Prometheus registry, modelled on tts-server.py's.
+
+    The bridges run from a bare python3.withPackages env, so rather than
+    add prometheus_client for a few series we render the text format
+    ourselves. Everything runs on the event loop, so unlike tts-server's
+    there's no locking.
+    """
+
+    def __init__(self) -> None:
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._values: dict[tuple, float] = {}
+        self._hists: dict[tuple, list[float]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._meta[name] = ("counter", help_text)
+
+    def gauge(self, name: str, help_text: str) -> None:
+        self._meta[name] = ("gauge", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...]) -> None:
+        self._meta[name] = ("histogram", help_text)
+        self._buckets[name] = buckets
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self._buckets[name]
+        # Per-bucket counts, then sum and count
+        hist = self._hists.setdefault(key, [0.0] * (len(buckets) + 2))
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+    @staticmethod
+    def _labels(pairs) -> str:
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind != "histogram":
+                for (n, pairs), value in self._values.items():
+                    if n == name:
+                        lines.append(f"{name}{self._labels(pairs)} {value}")
+                continue
+            for (n, pairs), hist in self._hists.items():
+                if n != name:
+                    continue
+                for bound, count in zip(self._buckets[name], hist):
+                    le = self._labels(pairs + (("le", bound),))
+                    lines.append(f"{name}_bucket{le} {count}")
+                inf = self._labels(pairs + (("le", "+Inf"),))
+                lines.append(f"{name}_bucket{inf} {hist[-1]}")
+                lines.append(f"{name}_sum{self._labels(pairs)} {hist[-2]}")
+                lines.append(f"{name}_count{self._labels(pairs)} {hist[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.counter("wyoming_warmups_total", "Warm-up requests sent to the backend, by trigger")
+metrics.counter("wyoming_warmups_debounced_total", "Warm-up triggers dropped by the debounce")
+metrics.counter("wyoming_warmup_failures_total", "Warm-up requests that failed, by trigger")
+metrics.counter(
+    "wyoming_backend_state_total",
+    "Synthesis requests by whether the backend was warm or cold when they arrived",
+)
+metrics.gauge("wyoming_breaker_state", "1 for the state each backend's circuit breaker is in")
+metrics.counter("wyoming_breaker_transitions_total", "Circuit breaker state changes, by new state")
+metrics.counter("wyoming_breaker_rejected_total", "Requests failed fast because the breaker was open")
+metrics.counter("wyoming_health_probe_failures_total", "Backend /health probes that failed")
+metrics.histogram(
+    "wyoming_read_ahead_high_water_seconds",
+    "Most audio buffered between the backend and HA, per utterance",
+    (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+metrics.counter(
+    "wyoming_read_ahead_full_total",
+    "Backend reads that waited because the read-ahead buffer was full",
+)
+metrics.histogram(
+    "wyoming_backend_first_byte_seconds",
+    "Time from sending a synthesis request to the backend's first audio byte",
+    (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+metrics.histogram(
+    "wyoming_synthesis_seconds",
+    "Time from Synthesize (or SynthesizeStart) to AudioStop, by where the audio came from",
+    (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0),
+)
+metrics.histogram(
+    "wyoming_audio_seconds",
+    "Seconds of audio sent to HA per request, by where it came from",
+    (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 60.0),
+)
+metrics.counter(
+    "wyoming_backend_errors_total",
+    "Failed backend requests, by HTTP status or exception type",
+)
+metrics.gauge("wyoming_synthesize_active", "Synthesize requests being handled right now")
+metrics.set("wyoming_synthesize_active", 0)
+metrics.counter(
+    "wyoming_synthesize_total",
+    "Synthesize requests, by voice (other: not advertised) and where the audio came from",
+)
+metrics.counter("wyoming_synthesize_characters_total", "Characters of text synthesized, by voice")
+metrics.counter("wyoming_synthesize_audio_seconds_total", "Seconds of audio sent to HA, by voice")
+
+
+async def serve_metrics(host: str, port: int) -> asyncio.AbstractServer:
+    """Answer every HTTP request on host:port with metrics.render()."""
+
+    async def scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = metrics.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: %d\r\n"
+                b"Connection: close\r\n\r\n" % len(body) + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(scrape, host, port)
+
+
+def count_backend_error(error: int | str | Exception, **labels) -> None:
+    """wyoming_backend_errors_total by HTTP status, else exception type."""
+    if isinstance(error, httpx.HTTPStatusError):
+        error = error.response.status_code
+    elif isinstance(error, Exception):
+        error = type(error).__name__
+    metrics.inc("wyoming_backend_errors_total", status=str(error), **labels)
+
+
+def observe_synthesis(
+    voice: str, started: float, chars: int, source: str, audio_bytes: int
+) -> None:
+    """
+    Per-request series for one finished Synthesize (or streamed text).
+    source says where the audio came from (cache, backend, stream, ...);
+    "failed" is a request that got empty audio.
+    """
+    audio_s = audio_bytes / (SAMPLE_RATE_HZ * SAMPLE_WIDTH_BYTES * CHANNELS)
+    metrics.observe("wyoming_synthesis_seconds", time.monotonic() - started, source=source)
+    metrics.observe("wyoming_audio_seconds", audio_s, source=source)
+    metrics.inc("wyoming_synthesize_total", voice=voice, source=source)
+    metrics.inc("wyoming_synthesize_characters_total", chars, voice=voice)
+    metrics.inc("wyoming_synthesize_audio_seconds_total", audio_s, voice=voice)
+
+
+def parse_hours(spec: str) -> tuple[int, int]:
+    """"7-23" -> (7, 23): local hours [start, end); "22-6" wraps midnight."""
+    start, sep, end = spec.partition("-")
+    try:
+        hours = int(start), int(end)
+    except ValueError:
+        hours = (-1, -1)
+    if not sep or not (0 <= hours[0] <= 23 and 0 <= hours[1] <= 24):
+        raise SystemExit(f"--warm-hours {spec!r}: expected START-END, e.g. 7-23")
+    return hours
+
+
+# Warm-up triggers that come from HA itself; --warm-interval and
+# --warm-file add "schedule" and "file"
+WARM_TRIGGERS = {"connect", "describe"}
+
+
+class Warmer:
+    """
+    Send the backend a cheap warm-up ahead of the requests that need it.
+
+    The first request after an idle spell pays for the backend bringing
+    its model back: seconds from host RAM for F5-TTS, 5-10s from
+    nothing. poke() is called when a request looks likely soon (HA
+    connecting or sending Describe, a touched signal file) and by the
+    keep_warm() schedule; the warm callable runs in the background, so
+    nothing waits on it. A poke within debounce seconds of the previous
+    warm-up or real request is dropped, since either left the backend
+    warm. Real requests report what they found through observe(), which
+    feeds wyoming_backend_state_total: the warm share of that is how we
+    tell whether the triggers fire early enough.
+    """
+
+    def __init__(
+        self,
+        warm: Callable[[], Awaitable[str]],
+        triggers: set[str],
+        debounce: float,
+        cold_after: float,
+    ) -> None:
+        self._warm = warm
+        self._triggers = triggers
+        self._debounce = debounce
+        self._cold_after = cold_after
+        self._last = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+
+    def poke(self, trigger: str) -> None:
+        if trigger not in self._triggers:
+            return
+        now = time.monotonic()
+        if now - self._last < self._debounce or (self._task and not self._task.done()):
+            metrics.inc("wyoming_warmups_debounced_total", trigger=trigger)
+            return
+        self._last = now
+        self._task = asyncio.ensure_future(self._run(trigger))
+
+    async def _run(self, trigger: str) -> None:
+        metrics.inc("wyoming_warmups_total", trigger=trigger)
+        try:
+            state = await self._warm()
+        except (httpx.HTTPError, ValueError, KeyError) as exc:
+            metrics.inc("wyoming_warmup_failures_total", trigger=trigger)
+            LOG.warning("warm-up (%s) failed: %s", trigger, exc)
+            return
+        LOG.info("warm-up (%s): backend was %s", trigger, state)
+
+    def classify(self, reported: Optional[str], seconds: Optional[float]) -> Optional[str]:
+        """
+        warm or cold: what the backend reported (tts-server's model
+        state) if it did, else whether it took longer than cold_after to
+        answer. None when there's neither.
+        """
+        if reported:
+            return "warm" if reported == "warm" else "cold"
+        if seconds is None:
+            return None
+        return "cold" if seconds > self._cold_after else "warm"
+
+    def observe(self, reported: Optional[str], seconds: Optional[float], **labels) -> None:
+        """A real request reached the backend; count whether it was warm."""
+        self._last = time.monotonic()
+        state = self.classify(reported, seconds)
+        if state is not None:
+            metrics.inc("wyoming_backend_state_total", state=state, **labels)
+
+    async def keep_warm(self, interval: float, hours: tuple[int, int]) -> None:
+        """
+        Don't let the backend sit idle longer than interval during hours.
+        Set interval under the backend's keep-alive and the model stays
+        put while people are about, and unloads overnight as before.
+        """
+        start, end = hours
+        while True:
+            idle = time.monotonic() - self._last
+            hour = time.localtime().tm_hour
+            awake = start <= hour < end if start <= end else hour >= start or hour < end
+            if idle < interval:
+                wait = interval - idle
+            elif awake:
+                self.poke("schedule")
+                wait = 1.0  # _last has moved on, unless a warm-up was running
+            else:
+                wait = 60.0  # outside hours: look at the clock again later
+            await asyncio.sleep(max(wait, 1.0))
+
+    async def watch(self, path: Path, poll: float = 0.25) -> None:
+        """Warm up whenever path's mtime changes (e.g. `touch` on wake word)."""
+
+        def mtime() -> Optional[int]:
+            try:
+                return path.stat().st_mtime_ns
+            except OSError:
+                return None
+
+        seen = mtime()
+        while True:
+            await asyncio.sleep(poll)
+            current = mtime()
+            if current is not None and current != seen:
+                self.poke("file")
+            seen = current
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for one backend.
+
+    With the backend down, every Synthesize would otherwise sit through
+    connect and read timeouts before HA gets its empty audio, one
+    utterance after another. After `failures` consecutive failures
+    (transport errors and 5xx answers; a 503 is admission control
+    shedding load, so the backend is alive) the breaker opens and
+    allow() says no at once. After `cooldown` seconds it goes half-open
+    and lets a single trial request through: success closes it, failure
+    opens it again. A trial that never reports back (HA hung up) is
+    written off after another cooldown. The health probe closes it as
+    soon as /health answers again, so recovery doesn't wait for a
+    request to risk it.
+    """
+
+    def __init__(self, name: str, failures: int, cooldown: float) -> None:
+        self.name = name
+        self._threshold = failures
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at: Optional[float] = None
+        self.state = ""
+        self._move("closed", "startup")
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == "open" and now - self._opened_at >= self._cooldown:
+            self._move("half-open", f"{self._cooldown:.0f}s cooldown over")
+        if self.state == "closed":
+            return True
+        if self.state == "half-open" and (
+            self._trial_at is None or now - self._trial_at >= self._cooldown
+        ):
+            self._trial_at = now
+            return True
+        metrics.inc("wyoming_breaker_rejected_total", backend=self.name)
+        return False
+
+    def success(self) -> None:
+        self._failures = 0
+        if self.state != "closed":
+            self._move("closed", "request succeeded")
+
+    def failure(self, reason: str) -> None:
+        self._failures += 1
+        if self.state == "half-open" or (
+            self.state == "closed" and self._failures >= self._threshold
+        ):
+            self._move("open", reason)
+        elif self.state == "open":
+            self._opened_at = time.monotonic()
+
+    def record(self, status: int) -> None:
+        """Count an HTTP answer."""
+        if status >= 500 and status != 503:
+            self.failure(f"HTTP {status}")
+        else:
+            self.success()
+
+    def error(self, exc: httpx.HTTPError) -> None:
+        """Count an exception; status errors were already seen by record()."""
+        if isinstance(exc, httpx.TransportError):
+            self.failure(f"{type(exc).__name__}: {exc}")
+
+    def healthy(self) -> None:
+        """The health probe got an answer; requests alone decide when closed."""
+        if self.state != "closed":
+            self._failures = 0
+            self._move("closed", "health probe answered")
+
+    def _move(self, state: str, reason: str) -> None:
+        if self.state:
+            level = logging.INFO if state == "closed" else logging.WARNING
+            LOG.log(level, "breaker %s: %s -> %s (%s)", self.name, self.state, state, reason)
+        self.state = state
+        self._trial_at = None
+        if state == "open":
+            self._opened_at = time.monotonic()
+        for name in ("closed", "open", "half-open"):
+            metrics.set("wyoming_breaker_state", int(name == state), backend=self.name, state=name)
+        metrics.inc("wyoming_breaker_transitions_total", backend=self.name, state=state)
+
+
+async def probe_health(
+    client: httpx.AsyncClient,
+    url: str,
+    breaker: CircuitBreaker,
+    interval: float,
+    timeout: float,
+) -> None:
+    """GET url every interval seconds and tell breaker how it went."""
+    while True:
+        try:
+            resp = await client.get(url, timeout=timeout)
+        except httpx.HTTPError as exc:
+            metrics.inc("wyoming_health_probe_failures_total", backend=breaker.name)
+            breaker.failure(f"health probe: {type(exc).__name__}")
+        else:
+            if resp.status_code == 200:
+                breaker.healthy()
+            else:
+                metrics.inc("wyoming_health_probe_failures_total", backend=breaker.name)
+                breaker.failure(f"health probe: HTTP {resp.status_code}")
+        await asyncio.sleep(interval)
@@ -161,6 +161,7 @@
         # Or build specific test: nix build .#checks.x86_64-linux.observability
         checks = {
           observability = import ./tests/observability.nix { inherit pkgs; };
+          tts-stack = import ./tests/tts-stack.nix { inherit pkgs; };
         };
 
         # Development environment
@@ -2,8 +2,11 @@
 #
 # Provides:
 # - High-quality neural TTS via F5-TTS in Docker container
-# - GPU-accelerated (RTX 4090) with automatic VRAM unloading after idle
+# - GPU-accelerated (RTX 4090) with automatic VRAM unloading after idle:
+#   parked in host RAM first (fast to bring back), fully unloaded later
 # - OpenAI-compatible API at tts.home.arpa
+# - Admission control (bounded per-priority queues, 503/429 + Retry-After
+#   under load) and Prometheus metrics at /metrics (scraped below)
 #
 # Usage from LAN:
 #   curl http://tts.home.arpa/v1/audio/speech \
@@ -11,16 +14,26 @@
 #     -d '{"input": "Hello world", "voice": "nature"}' \
 #     --output speech.mp3
 #
+# Benchmarks (thread budget / worker sweeps, see assets/tts-bench.py):
+#   docker exec tts python3 /app/tts-bench.py cpu
+#   docker exec tts python3 /app/tts-bench.py batch   # throughput mode speedup
+#   Leak hunting: set TTS_DEBUG_MEMORY = "1" below, then
+#   docker exec tts python3 /app/tts-bench.py soak    # load/unload cycles
+#
 # Adding voices:
 #   Place in /var/lib/tts/voices/:
 #   - {name}.wav  - 5-15 second reference audio
 #   - {name}.txt  - exact transcript of the audio
+#   Then `docker exec tts python3 /app/tts-bench.py voice` cuts a shorter
+#   clip per voice (faster inference) into the hf-cache volume; the
+#   server uses it until the originals change.
 
 { config, pkgs, ... }:
 
 let
   # TTS server script (runs inside container)
   ttsServerScript = pkgs.writeText "tts-server.py" (builtins.readFile ../../assets/tts-server.py);
+  ttsBenchScript = pkgs.writeText "tts-bench.py" (builtins.readFile ../../assets/tts-bench.py);
 
   # Default voice: bundled F5-TTS example (nature/mother nature voice)
   # This provides a working default without any manual setup
@@ -44,6 +57,7 @@ in
     volumes = [
       # Mount TTS server script
       "${ttsServerScript}:/app/tts-server.py:ro"
+      "${ttsBenchScript}:/app/tts-bench.py:ro"
       # Voice reference files
       "/var/lib/tts/voices:/voices:ro"
       # HuggingFace cache for model weights (persist across restarts)
@@ -54,9 +68,32 @@ in
     environment = {
       TTS_HOST = "0.0.0.0";
       TTS_PORT = "8880";
-      TTS_KEEP_ALIVE = "300"; # 5 minutes idle -> unload from VRAM
+      TTS_KEEP_ALIVE = "300"; # 5 minutes idle -> offload VRAM to host RAM
+      TTS_HOST_KEEP_ALIVE = "1800"; # 30 minutes idle -> unload entirely
       TTS_VOICE = "nature"; # Default voice
       TTS_VOICES_DIR = "/voices";
+      # One GPU, one synthesis at a time; everything else queues. HA's
+      # streaming requests come in as "interactive" and jump the queue.
+      TTS_MAX_CONCURRENT = "1";
+      TTS_MAX_PER_CLIENT = "2";
+      TTS_QUEUE_CAPACITY = "interactive=8,normal=4,bulk=2";
+      TTS_QUEUE_DEADLINE = "interactive=15,normal=60,bulk=300";
+      # Under queue pressure, auto quality drops bulk/normal work to fewer
+      # flow-matching steps (low=8, medium=16 vs high=32) before any
+      # deadline is missed; interactive only drops when it must.
+      TTS_QUALITY = "auto";
+      # GPU inference; torch picks the device. On a CPU-only host set
+      # TTS_DEVICE = "cpu" and size TTS_CPU_THREADS from `tts-bench.py cpu`;
+      # the worker pool (TTS_WORKERS) then defaults to cores / threads,
+      # and TTS_MAX_CONCURRENT (drop the "1" above) to the pool size.
+      # TTS_CPU_AFFINITY = "1" pins each worker to its own cores.
+      # Short utterances ("OK", "Light turned off") can skip F5 entirely
+      # and go to Kokoro-82M in-process on CPU. Needs kokoro-onnx added to
+      # the pip install below (check it doesn't move numpy under F5 first)
+      # and the kokoro-onnx model-files-v1.0 release in /var/lib/tts/hf-cache:
+      # TTS_KOKORO_MODEL = "/root/.cache/huggingface/hub/kokoro/kokoro-v1.0.onnx";
+      # TTS_KOKORO_VOICES_FILE = "/root/.cache/huggingface/hub/kokoro/voices-v1.0.bin";
+      # TTS_KOKORO_VOICES = "*=af_heart";
     };
 
     # Run our server script instead of default Gradio app
@@ -131,6 +168,21 @@ in
     };
   };
 
+  # Queue depth, shed counts and wait times from the admission controller.
+  # Scraped over loopback, not via nginx.
+  services.prometheus.scrapeConfigs = [
+    {
+      job_name = "tts";
+      scrape_interval = "30s";
+      static_configs = [{
+        targets = [ "127.0.0.1:8880" ];
+        labels = {
+          instance = "skaia";
+        };
+      }];
+    }
+  ];
+
   # Firewall: HTTP is already open for nginx (80/443)
   # No additional ports needed since we proxy through nginx
 }
@@ -4,6 +4,7 @@
 # - Wyoming faster-whisper STT server  on tcp://skaia.home.arpa:10300
 # - Wyoming F5-TTS proxy               on tcp://skaia.home.arpa:10200
 # - Wyoming Kokoro proxy (a/b candidate) on tcp://skaia.home.arpa:10210
+# - Wyoming TTS router (F5, hedged to Kokoro) on tcp://skaia.home.arpa:10220
 #
 # Used by:
 # - Home Assistant's Wyoming integration (Settings -> Devices & Services ->
@@ -11,6 +12,7 @@
 #     STT: skaia.home.arpa:10300
 #     TTS (F5):     skaia.home.arpa:10200
 #     TTS (Kokoro): skaia.home.arpa:10210
+#     TTS (router): skaia.home.arpa:10220
 #   Both TTS endpoints are wired in parallel so we can flip the active
 #   engine in the HA Assist pipeline (Settings -> Voice assistants ->
 #   <pipeline> -> Text-to-speech) without rebuilds. The choice is per
@@ -81,9 +83,10 @@
 # Choices - TTS (F5-TTS proxy):
 # - The actual neural TTS lives in tts.nix as the f5-tts Docker container
 #   on 127.0.0.1:8880 (also exposed via nginx at tts.home.arpa). This
-#   module just runs a thin Python translator that speaks Wyoming on the
-#   wire and HTTP+streaming-PCM to F5-TTS. Source:
-#   assets/wyoming-f5-tts.py.
+#   module runs the Python bridge that speaks Wyoming on the wire and
+#   HTTP+streaming-PCM to F5-TTS. Source: assets/wyoming-f5-tts.py,
+#   with the parts all three bridges share in assets/wyoming_common.py
+#   (on PYTHONPATH, see wyomingCommon).
 # - We talk to F5-TTS over loopback, not via nginx, so we skip a
 #   reverse-proxy hop and avoid getting mixed up in the LAN rate limits.
 # - Voice list is hardcoded ("nature") because we currently only ship one
@@ -92,13 +95,46 @@
 # - Soft dependency on docker-tts.service: we 'after' but not 'requires'
 #   it. If F5-TTS is down, the wrapper still answers Describe and will
 #   surface HTTP errors as silent (empty) audio, which lets HA fail fast
-#   instead of hanging the satellite.
+#   instead of hanging the satellite. A circuit breaker fed by /health
+#   probes every 10s makes that immediate once F5 is known to be down,
+#   rather than paying the timeouts per utterance; the router skips an
+#   open backend and goes straight to the fallback voice.
+# - One pooled keep-alive HTTP client per bridge process (see the
+#   --max-connections/--max-keepalive flags), so an utterance doesn't pay
+#   for a TCP handshake. `wyoming-bench.py pool` measures what that saves.
+# - Streamed text: both bridges advertise Wyoming's streaming synthesis,
+#   so HA hands over LLM replies as they're generated and speech starts
+#   at the first sentence. F5 gets them over one tts-server WebSocket
+#   session; Kokoro gets one request per sentence, pipelined.
+# - Phrase cache: short texts are kept as PCM under /var/cache/<service>
+#   and replayed without a synthesis; the hotPhrases list below is
+#   prefetched at startup (which also loads the F5 model, in the
+#   background). After changing a voice reference, clear it with
+#   `systemctl clean --what=cache wyoming-f5-tts` (entries expire after
+#   a week regardless).
+# - Warm-ups: the bridges ask the backend to load its model ahead of a
+#   request (tts-server: POST /v1/audio/warmup, which returns at once)
+#   when HA connects or sends Describe, debounced to one a minute. HA
+#   connects at SynthesizeStart, while the LLM is still writing, so
+#   that alone hides some of a load. The F5 bridge also keeps the model
+#   on the GPU through the evening (--warm-interval 240, under
+#   TTS_KEEP_ALIVE=300 in tts.nix); outside --warm-hours the keep-alive
+#   hands the VRAM back to Ollama as before. --warm-file is there for a
+#   wake-word hook but nothing local touches one yet.
+# - Metrics: each bridge serves Prometheus text on 127.0.0.1 at its
+#   Wyoming port + 1 (10201, 10211, 10221). wyoming_backend_state_total
+#   counts real requests that found the backend warm vs cold; the warm
+#   share is what tells us whether the triggers above fire early enough.
+#   Prometheus scrapes all three as job "wyoming-tts" (below), so
+#   wyoming_synthesis_seconds vs wyoming_backend_first_byte_seconds
+#   shows whether a slow reply was the bridge or the backend.
 #
 # Choices - TTS (Kokoro proxy, a/b candidate):
-# - Same shape as the F5 proxy: thin Python translator, Wyoming on one
+# - Same shape as the F5 proxy: a Python bridge with Wyoming on one
 #   side, OpenAI-compatible /v1/audio/speech (response_format=pcm) on
-#   the other. Source: assets/wyoming-kokoro.py. Backing container in
-#   hosts/skaia/kokoro.nix on 127.0.0.1:8881.
+#   the other, and the same shared plumbing. Source:
+#   assets/wyoming-kokoro.py. Backing container in hosts/skaia/kokoro.nix
+#   on 127.0.0.1:8881.
 # - Why side-by-side instead of replacing F5: F5 has expressive prosody
 #   but no text normalization frontend (turns "11:39" into "eleventeen
 #   thirty-nine" because it phonemes the literal characters). Kokoro
@@ -110,6 +146,22 @@
 #   changes needed (voice tensors live in the container image).
 # - Soft dependency on docker-kokoro.service: same pattern as F5.
 #
+# Choices - TTS (router):
+# - One Wyoming endpoint in front of both backends. Each advertised voice
+#   maps to an ordered list of (backend, voice); the first is asked, and
+#   if it has no audio within its hedge delay (or errors) the next is
+#   asked too, and whichever speaks first wins. Source:
+#   assets/wyoming-tts-router.py.
+# - "nature" prefers F5 and hedges to Kokoro af_heart, so a cold F5 (model
+#   parked in host RAM after TTS_KEEP_ALIVE, or unloaded) costs a change of
+#   voice instead of a multi-second hang. The Kokoro voices go the other
+#   way round.
+# - Hedge delay adapts to each backend's recent first-byte p95, capped at
+#   --hedge-max-ms; that cap is the longest we wait on a silent primary
+#   before asking the secondary as well.
+# - Point the HA pipeline here instead of 10200/10210 to get failover; the
+#   direct bridges stay up for A/B listening.
+#
 # Future additions in this file:
 # - openWakeWord server, IFF we decide to do wake-word centrally rather
 #   than on-device. Atom Echo currently does it on-device; not needed.
@@ -123,11 +175,37 @@ let
   wyomingKokoro = pkgs.writeText "wyoming-kokoro.py"
     (builtins.readFile ../../assets/wyoming-kokoro.py);
 
-  # Shared Python env for the Wyoming bridges. Both scripts only need
-  # wyoming + httpx; using one env keeps the closure smaller.
+  wyomingTtsRouter = pkgs.writeText "wyoming-tts-router.py"
+    (builtins.readFile ../../assets/wyoming-tts-router.py);
+
+  # The plumbing the three bridges share. Each script above is a lone
+  # store file, so the module gets a directory of its own, put on
+  # PYTHONPATH below.
+  wyomingCommon = pkgs.writeTextDir "wyoming_common.py"
+    (builtins.readFile ../../assets/wyoming_common.py);
+
+  # Phrases HA says over and over (intent responses, errors). Each bridge
+  # synthesizes any it doesn't have yet into its phrase cache at startup
+  # and replays them from disk afterwards. Must match HA's text exactly;
+  # everything else HA says short enough gets cached on first use anyway.
+  # "voice|text" pins a voice, otherwise the bridge's default is used.
+  hotPhrases = pkgs.writeText "tts-hot-phrases.txt" ''
+    Turned on the light
+    Turned off the light
+    Turned on the lights
+    Turned off the lights
+    Done
+    Sorry, I couldn't understand that
+    Sorry, I am not aware of any device called that
+  '';
+
+  # Shared Python env for the Wyoming bridges. All three scripts need
+  # wyoming + httpx, and the F5 bridge websockets for streamed text
+  # (tts-server's /v1/audio/stream); using one env keeps the closure smaller.
   wyomingTtsEnv = pkgs.python3.withPackages (ps: [
     ps.wyoming
     ps.httpx
+    ps.websockets
   ]);
 
   # CUDA-enabled wyoming-faster-whisper. We override the C++ ctranslate2
@@ -195,6 +273,7 @@ in
       description = "Wyoming protocol bridge to local F5-TTS server";
       wantedBy = [ "multi-user.target" ];
       after = [ "network.target" "docker-tts.service" ];
+      environment.PYTHONPATH = "${wyomingCommon}";
 
       serviceConfig = {
         ExecStart = ''
@@ -203,8 +282,15 @@ in
             --f5-url http://127.0.0.1:8880 \
             --voices nature \
             --default-voice nature \
+            --cache-dir /var/cache/wyoming-f5-tts \
+            --hot-phrases ${hotPhrases} \
+            --warm-on connect,describe \
+            --warm-interval 240 \
+            --warm-hours 17-23 \
+            --metrics-port 10201 \
             --log-level INFO
         '';
+        CacheDirectory = "wyoming-f5-tts";
         Restart = "on-failure";
         RestartSec = "5s";
 
@@ -225,6 +311,7 @@ in
       description = "Wyoming protocol bridge to local Kokoro-FastAPI server";
       wantedBy = [ "multi-user.target" ];
       after = [ "network.target" "docker-kokoro.service" ];
+      environment.PYTHONPATH = "${wyomingCommon}";
 
       serviceConfig = {
         ExecStart = ''
@@ -233,8 +320,54 @@ in
             --kokoro-url http://127.0.0.1:8881 \
             --voices af_heart,af_bella,af_sarah,am_michael,am_adam,bf_emma \
             --default-voice af_heart \
+            --cache-dir /var/cache/wyoming-kokoro \
+            --hot-phrases ${hotPhrases} \
+            --warm-on connect \
+            --metrics-port 10211 \
+            --log-level INFO
+        '';
+        CacheDirectory = "wyoming-kokoro";
+        Restart = "on-failure";
+        RestartSec = "5s";
+
+        DynamicUser = true;
+        ProtectSystem = "strict";
+        ProtectHome = true;
+        PrivateTmp = true;
+        NoNewPrivileges = true;
+        RestrictNamespaces = true;
+        RestrictRealtime = true;
+        LockPersonality = true;
+        MemoryDenyWriteExecute = true;
+        SystemCallArchitectures = "native";
+      };
+    };
+
+    wyoming-tts-router = {
+      description = "Wyoming TTS router hedging F5-TTS with Kokoro";
+      wantedBy = [ "multi-user.target" ];
+      after = [ "network.target" "docker-tts.service" "docker-kokoro.service" ];
+      environment.PYTHONPATH = "${wyomingCommon}";
+
+      serviceConfig = {
+        ExecStart = ''
+          ${wyomingTtsEnv}/bin/python3 ${wyomingTtsRouter} \
+            --uri tcp://0.0.0.0:10220 \
+            --backend f5=http://127.0.0.1:8880 \
+            --backend kokoro=http://127.0.0.1:8881 \
+            --route nature=f5:nature,kokoro:af_heart \
+            --route af_heart=kokoro:af_heart,f5:nature \
+            --route am_michael=kokoro:am_michael,f5:nature \
+            --default-voice nature \
+            --hedge-ms 1500 \
+            --hedge-max-ms 2500 \
+            --cache-dir /var/cache/wyoming-tts-router \
+            --hot-phrases ${hotPhrases} \
+            --warm-on connect,describe \
+            --metrics-port 10221 \
             --log-level INFO
         '';
+        CacheDirectory = "wyoming-tts-router";
         Restart = "on-failure";
         RestartSec = "5s";
 
@@ -252,10 +385,46 @@ in
     };
   };
 
+  # Per-bridge synthesis latency (first byte, total, audio length),
+  # backend errors by status, in-flight requests and per-voice counts,
+  # plus warm-up, breaker and read-ahead state. Next to the "tts" job
+  # (tts.nix) this splits voice latency between bridge and backend.
+  # Scraped over loopback; the metrics ports aren't opened below.
+  services.prometheus.scrapeConfigs = [
+    {
+      job_name = "wyoming-tts";
+      scrape_interval = "30s";
+      static_configs = [
+        {
+          targets = [ "127.0.0.1:10201" ];
+          labels = {
+            instance = "skaia";
+            bridge = "f5";
+          };
+        }
+        {
+          targets = [ "127.0.0.1:10211" ];
+          labels = {
+            instance = "skaia";
+            bridge = "kokoro";
+          };
+        }
+        {
+          targets = [ "127.0.0.1:10221" ];
+          labels = {
+            instance = "skaia";
+            bridge = "router";
+          };
+        }
+      ];
+    }
+  ];
+
   # Wyoming protocol - HA Yellow needs to reach STT and TTS on the LAN.
   networking.firewall.allowedTCPPorts = [
     10200 # F5-TTS Wyoming bridge
     10210 # Kokoro Wyoming bridge
+    10220 # Hedged TTS router
     10300 # faster-whisper STT
   ];
 }
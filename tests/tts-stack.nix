@@ -0,0 +1,218 @@
+# NixOS integration test for the TTS serving path
+#
+# Runs assets/tts-server.py with its stub model (TTS_STUB_MODEL: a tone
+# generator, no torch or GPU) and a deliberately small PCM ring,
+# validating that:
+# - The server starts and answers /health
+# - A queued request granted a slot just as its deadline fires keeps
+#   the slot instead of being shed with it
+# - A client that hangs up on a streamed reply mid-chunk doesn't leave
+#   its chunks in the ring: the next streamed request still finishes
+# - assets/wyoming-tts-router.py hedges a slow "F5" (stub with a long
+#   first byte) to a fast "Kokoro" (a second stub instance), and the F5
+#   server still answers after losing the race
+#
+# Run with: nix flake check
+# Or directly: nix build .#checks.x86_64-linux.tts-stack
+
+{ pkgs, ... }:
+
+let
+  python = pkgs.python3.withPackages (ps: with ps; [
+    fastapi
+    uvicorn
+    numpy
+    soundfile
+    pydantic
+    websockets
+    wyoming
+    httpx
+  ]);
+
+  ttsServerScript = pkgs.writeText "tts-server.py" (builtins.readFile ../assets/tts-server.py);
+  wyomingTtsRouter = pkgs.writeText "wyoming-tts-router.py"
+    (builtins.readFile ../assets/wyoming-tts-router.py);
+  # As in hosts/skaia/voice.nix: the router imports it from PYTHONPATH
+  wyomingCommon = pkgs.writeTextDir "wyoming_common.py"
+    (builtins.readFile ../assets/wyoming_common.py);
+
+  # One Synthesize through a Wyoming server; prints the PCM byte count
+  wyomingSynthesize = pkgs.writeText "wyoming-synthesize.py" ''
+    import asyncio
+    import sys
+
+    from wyoming.audio import AudioChunk, AudioStop
+    from wyoming.client import AsyncTcpClient
+    from wyoming.tts import Synthesize
+
+
+    async def main(port, text):
+        size = 0
+        async with AsyncTcpClient("127.0.0.1", port) as client:
+            await client.write_event(Synthesize(text=text).event())
+            while True:
+                event = await client.read_event()
+                if event is None or AudioStop.is_type(event.type):
+                    break
+                if AudioChunk.is_type(event.type):
+                    size += len(event.payload)
+        print(size)
+
+
+    asyncio.run(main(int(sys.argv[1]), sys.argv[2]))
+  '';
+
+  # Admission at the deadline: on Python 3.12+ wait_for can time out
+  # after the future resolved in the same loop iteration. Swaps in a
+  # wait_for that does exactly that, so the race fires every time.
+  admissionRace = pkgs.writeText "admission-race.py" ''
+    import asyncio
+    import importlib.util
+    import sys
+
+    spec = importlib.util.spec_from_file_location("tts_server", sys.argv[1])
+    tts = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tts)
+
+
+    async def main():
+        admission = tts.AdmissionController(
+            1, 4, {"interactive": 4}, {"interactive": 5.0}, 1.0
+        )
+        holder = await admission.acquire("interactive", "a")
+
+        async def grant_then_time_out(future, timeout):
+            admission.release(holder)
+            await future
+            raise asyncio.TimeoutError
+
+        asyncio.wait_for = grant_then_time_out
+        ticket = await admission.acquire("interactive", "b")
+        admission.release(ticket)
+        assert admission.active == 0, f"Slot leaked: active={admission.active}"
+
+
+    asyncio.run(main())
+  '';
+
+  # Reference clip for the default voice: the stub model only needs it
+  # to exist and decode
+  voices = pkgs.runCommand "tts-test-voices" { nativeBuildInputs = [ pkgs.sox ]; } ''
+    mkdir -p $out
+    sox -n -r 24000 -c 1 -b 16 $out/nature.wav synth 3 sine 220
+    echo "Some call me nature, others call me mother nature." > $out/nature.txt
+  '';
+
+  ttsEnvironment = {
+    TTS_HOST = "127.0.0.1";
+    TTS_VOICES_DIR = "${voices}";
+    TTS_WARMUP = "0";
+    # ~5s of audio: a single abandoned chunk is enough to wedge it
+    TTS_RING_MB = "0.25";
+  };
+in
+pkgs.testers.nixosTest {
+  name = "tts-stack";
+
+  nodes.machine = { config, pkgs, lib, ... }: {
+    # "F5": a full second to the first byte, so the router hedges
+    systemd.services.tts = {
+      wantedBy = [ "multi-user.target" ];
+      environment = ttsEnvironment // {
+        TTS_PORT = "8880";
+        TTS_VOICE_CACHE = "/var/lib/tts/voices";
+        TTS_WEIGHTS_CACHE = "/var/lib/tts";
+        TTS_STUB_MODEL = "first=1,rtf=0.02,cps=15";
+      };
+      serviceConfig = {
+        ExecStart = "${python}/bin/python3 ${ttsServerScript}";
+        StateDirectory = "tts";
+      };
+    };
+
+    # "Kokoro": the same stub, answering at once
+    systemd.services.tts-fast = {
+      wantedBy = [ "multi-user.target" ];
+      environment = ttsEnvironment // {
+        TTS_PORT = "8881";
+        TTS_VOICE_CACHE = "/var/lib/tts-fast/voices";
+        TTS_WEIGHTS_CACHE = "/var/lib/tts-fast";
+        TTS_STUB_MODEL = "first=0.02,rtf=0.02,cps=15";
+      };
+      serviceConfig = {
+        ExecStart = "${python}/bin/python3 ${ttsServerScript}";
+        StateDirectory = "tts-fast";
+      };
+    };
+
+    systemd.services.wyoming-tts-router = {
+      wantedBy = [ "multi-user.target" ];
+      environment.PYTHONPATH = "${wyomingCommon}";
+      serviceConfig.ExecStart = ''
+        ${python}/bin/python3 ${wyomingTtsRouter} \
+          --uri tcp://127.0.0.1:10220 \
+          --backend f5=http://127.0.0.1:8880 \
+          --backend kokoro=http://127.0.0.1:8881#tts-1 \
+          --route nature=f5:nature,kokoro:nature \
+          --hedge-ms 300 \
+          --log-level DEBUG
+      '';
+    };
+
+    environment.systemPackages = [ pkgs.curl ];
+
+    # VM tuning for faster tests
+    virtualisation = {
+      memorySize = 1024;
+      cores = 2;
+    };
+  };
+
+  testScript = ''
+    import json
+
+    # ~30s of audio at the stub's 15 characters per second
+    long_text = "This sentence keeps going for quite a while so the stream has many chunks. " * 6
+    body = json.dumps({"input": long_text, "stream": True, "response_format": "pcm"})
+    speech = "curl -sfN localhost:8880/v1/audio/speech -H 'Content-Type: application/json' -d @/tmp/long.json"
+
+    machine.start()
+    machine.succeed(f"echo '{body}' > /tmp/long.json")
+
+    with subtest("TTS server starts"):
+        machine.wait_for_unit("tts.service")
+        machine.wait_for_open_port(8880)
+        machine.wait_until_succeeds("curl -sf localhost:8880/health", timeout=30)
+
+    with subtest("A slot granted at the deadline isn't leaked"):
+        machine.succeed("${python}/bin/python3 ${admissionRace} ${ttsServerScript}")
+
+    with subtest("Abandoned stream doesn't wedge the ring"):
+        # head exits after the first bytes and curl dies on the closed pipe
+        machine.succeed(f"({speech} || true) | head -c 1000 > /dev/null")
+        machine.sleep(1)
+        size = machine.succeed(f"{speech} --max-time 30 | wc -c").strip()
+        # 30s of 16-bit mono at 24kHz, less whatever silence trimming took
+        assert int(size) > 1000000, f"Second stream cut short: {size} bytes"
+
+    with subtest("Router hedges to Kokoro and F5 survives losing"):
+        machine.wait_for_unit("tts-fast.service")
+        machine.wait_for_unit("wyoming-tts-router.service")
+        machine.wait_for_open_port(8881)
+        machine.wait_for_open_port(10220)
+        # The loser runs on to its first byte and is then hung up on
+        # mid-stream; twice, so F5 is warm and gets there the second time
+        for _ in range(2):
+            size = machine.succeed(
+                f"${python}/bin/python3 ${wyomingSynthesize} 10220 '{long_text}'"
+            ).strip()
+            assert int(size) > 1000000, f"Routed reply cut short: {size} bytes"
+        machine.wait_until_succeeds(
+            "journalctl -u wyoming-tts-router | grep -q 'f5 lost, first byte'", timeout=10
+        )
+        size = machine.succeed(f"{speech} --max-time 30 | wc -c").strip()
+        assert int(size) > 1000000, f"F5 stream after a lost race cut short: {size} bytes"
+
+    machine.log("TTS stack integration test passed!")
+  '';
+}